@@ -0,0 +1,292 @@
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+TREND_MONTHS = 12
+
+
+def _amount(money: Any) -> float:
+    """Amount of a ``{'currency', 'amount'}`` money object, NaN when missing."""
+    amount = money.get('amount') if isinstance(money, dict) else money
+    try:
+        return float(amount)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def _round(value: float, digits: int = 3) -> Optional[float]:
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+
+class ValueAnalytics:
+    """
+    Value metrics of every stored bundle, computed with NumPy over flat arrays.
+
+    Tiers and books of all bundles are flattened into parallel arrays
+    (``tier_*`` and ``book_*``) indexed by the position of their bundle, so
+    each metric is a handful of vectorized operations over the whole
+    dataset instead of a Python loop per bundle:
+
+    - Books unlock at the cheapest tier that lists them. Sorting books by
+      (bundle, unlock price) turns "MSRP unlocked at tier t" into a cumulative
+      sum lookup with ``searchsorted``.
+    - Per-book MSRPs are rarely published; missing ones get an equal share of
+      the bundle MSRP not covered by the known ones (``msrp_estimated``).
+    - A book is a duplicate when its machine_name appears in another stored
+      bundle; its MSRP is the discount already paid for by owners of the
+      other bundle.
+    - The purchase-price trend is the monthly mean average purchase price
+      of all bundles by start date.
+
+    Instances are immutable and describe one data version.
+    """
+
+    def __init__(self, rows: Sequence[Any], data_version: int = 0) -> None:
+        self.data_version = data_version
+        self.bundle_ids: List[str] = [row.id for row in rows]
+        self._index = {bundle_id: position for position, bundle_id in enumerate(self.bundle_ids)}
+        count = len(rows)
+
+        self.msrp_total = np.array([_amount(row.msrp_total) for row in rows], dtype=float)
+        self.start_month = np.array(
+            [row.start_date_datetime.year * 12 + row.start_date_datetime.month - 1
+             if row.start_date_datetime else -1 for row in rows],
+            dtype=np.int64,
+        )
+
+        tier_bundle: List[int] = []
+        tier_price: List[float] = []
+        tier_app: List[float] = []
+        tier_identifier: List[str] = []
+        book_bundle: List[int] = []
+        book_unlock: List[float] = []
+        book_msrp: List[float] = []
+        book_code: List[int] = []
+        # machine_name -> código entero, para comparar libros entre bundles
+        self.book_names: Dict[str, int] = {}
+        nan = float('nan')
+        for position, row in enumerate(rows):
+            prices: Dict[str, float] = {}
+            for tier in row.price_tiers or []:
+                if not isinstance(tier, dict):
+                    continue
+                price = _amount(tier.get('price'))
+                if not np.isfinite(price):
+                    continue
+                identifier = str(tier.get('identifier'))
+                prices[identifier] = price
+                tier_bundle.append(position)
+                tier_price.append(price)
+                tier_app.append(_amount(tier.get('average_purchase_price')))
+                tier_identifier.append(identifier)
+            for book in row.book_list or []:
+                if not isinstance(book, dict):
+                    continue
+                unlock = min((prices[tier] for tier in book.get('tiers') or [] if tier in prices), default=None)
+                # Sin tier (p. ej. donaciones a ONGs) no forma parte del valor comprado
+                if unlock is None:
+                    continue
+                msrp = book.get('msrp')
+                book_bundle.append(position)
+                book_unlock.append(unlock)
+                book_msrp.append(nan if msrp is None else _amount(msrp))
+                book_code.append(self.book_names.setdefault(str(book.get('machine_name')), len(self.book_names)))
+
+        self.tier_bundle = np.array(tier_bundle, dtype=np.int64)
+        self.tier_price = np.array(tier_price, dtype=float)
+        self.tier_identifier = np.array(tier_identifier, dtype=object)
+        self.book_bundle = np.array(book_bundle, dtype=np.int64)
+        self.book_unlock = np.array(book_unlock, dtype=float)
+        self.book_code = np.array(book_code, dtype=np.int64)
+
+        # Precio medio de compra: es el mismo en todos los tiers del bundle
+        self.average_purchase_price = np.full(count, np.nan)
+        app = np.array(tier_app, dtype=float)
+        valid = np.isfinite(app)
+        self.average_purchase_price[self.tier_bundle[valid]] = app[valid]
+
+        self._fill_book_msrp(np.array(book_msrp, dtype=float), count)
+        self._compute_tiers(count)
+        self._compute_duplicates(count)
+        self._compute_trend()
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.bundle_ids)
+
+    def _fill_book_msrp(self, msrp: np.ndarray, count: int) -> None:
+        missing = ~np.isfinite(msrp)
+        known_total = np.bincount(self.book_bundle, weights=np.where(missing, 0.0, msrp), minlength=count)
+        missing_count = np.bincount(self.book_bundle, weights=missing.astype(float), minlength=count)
+        remaining = np.clip(np.nan_to_num(self.msrp_total) - known_total, 0, None)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            share = np.where(missing_count > 0, remaining / missing_count, np.nan)
+        self.book_msrp = np.where(missing, share[self.book_bundle], msrp)
+        self.book_msrp_estimated = missing
+        self.msrp_estimated = missing_count > 0
+
+    def _compute_tiers(self, count: int) -> None:
+        span = float(max(self.tier_price.max(initial=0), self.book_unlock.max(initial=0))) + 1.0
+
+        # Libros ordenados por (bundle, precio de desbloqueo) y su MSRP acumulado
+        book_order = np.lexsort((self.book_unlock, self.book_bundle))
+        book_keys = self.book_bundle[book_order] * span + self.book_unlock[book_order]
+        cumulative = np.concatenate(([0.0], np.cumsum(np.nan_to_num(self.book_msrp[book_order]))))
+
+        tier_keys = self.tier_bundle * span + self.tier_price
+        first = np.searchsorted(book_keys, self.tier_bundle * span, side='left')
+        last = np.searchsorted(book_keys, tier_keys, side='right')
+        self.tier_books = last - first
+        self.tier_msrp = cumulative[last] - cumulative[first]
+
+        # Valor marginal frente al tier anterior (más barato) del mismo bundle
+        order = np.lexsort((self.tier_price, self.tier_bundle))
+        previous_msrp = np.zeros_like(self.tier_msrp)
+        previous_price = np.zeros_like(self.tier_price)
+        previous_books = np.zeros_like(self.tier_books)
+        if order.size > 1:
+            same_bundle = self.tier_bundle[order[1:]] == self.tier_bundle[order[:-1]]
+            targets = order[1:][same_bundle]
+            sources = order[:-1][same_bundle]
+            previous_msrp[targets] = self.tier_msrp[sources]
+            previous_price[targets] = self.tier_price[sources]
+            previous_books[targets] = self.tier_books[sources]
+        self.tier_order = order
+        self.tier_marginal_msrp = self.tier_msrp - previous_msrp
+        self.tier_marginal_price = self.tier_price - previous_price
+        self.tier_marginal_books = self.tier_books - previous_books
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.tier_ratio = np.where(self.tier_price > 0, self.tier_msrp / self.tier_price, np.nan)
+            self.tier_marginal_value = np.where(
+                self.tier_marginal_price > 0, self.tier_marginal_msrp / self.tier_marginal_price, np.nan,
+            )
+
+        self.max_price = np.full(count, np.nan)
+        self.min_price = np.full(count, np.nan)
+        if self.tier_price.size:
+            np.fmax.at(self.max_price, self.tier_bundle, self.tier_price)
+            positive = self.tier_price > 0
+            np.fmin.at(self.min_price, self.tier_bundle[positive], self.tier_price[positive])
+
+    def _compute_duplicates(self, count: int) -> None:
+        # Bundles distintos por libro: un libro repetido dentro del mismo
+        # bundle no es un duplicado
+        pairs = np.unique(self.book_code * max(count, 1) + self.book_bundle)
+        bundles_per_book = np.bincount(pairs // max(count, 1), minlength=len(self.book_names))
+        self.book_duplicate = bundles_per_book[self.book_code] > 1
+        duplicate_msrp = np.where(self.book_duplicate, np.nan_to_num(self.book_msrp), 0.0)
+        self.duplicate_books = np.bincount(self.book_bundle, weights=self.book_duplicate.astype(float), minlength=count)
+        self.duplicate_msrp = np.bincount(self.book_bundle, weights=duplicate_msrp, minlength=count)
+        self.books_total = np.bincount(self.book_bundle, minlength=count)
+        self.books_msrp = np.bincount(self.book_bundle, weights=np.nan_to_num(self.book_msrp), minlength=count)
+
+    def _compute_trend(self) -> None:
+        valid = (self.start_month >= 0) & np.isfinite(self.average_purchase_price)
+        months, inverse = np.unique(self.start_month[valid], return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(months))
+        sums = np.bincount(inverse, weights=self.average_purchase_price[valid], minlength=len(months))
+        self.trend_months = months
+        self.trend_counts = counts
+        self.trend_mean = sums / np.maximum(counts, 1)
+        # Percentil de cada bundle entre todos los precios medios de compra
+        values = np.sort(self.average_purchase_price[np.isfinite(self.average_purchase_price)])
+        with np.errstate(invalid='ignore'):
+            ranks = np.searchsorted(values, self.average_purchase_price, side='right')
+        self.app_percentile = np.where(
+            np.isfinite(self.average_purchase_price) & (values.size > 0),
+            ranks / max(values.size, 1) * 100,
+            np.nan,
+        )
+
+    def for_bundle(self, bundle_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the analytics document of one bundle, or None if it is unknown."""
+        position = self._index.get(bundle_id)
+        if position is None:
+            return None
+        with self._lock:
+            cached = self._results.get(bundle_id)
+        if cached is None:
+            cached = self._document(position)
+            with self._lock:
+                self._results[bundle_id] = cached
+        return cached
+
+    def _document(self, position: int) -> Dict[str, Any]:
+        tiers = self.tier_order[self.tier_bundle[self.tier_order] == position]
+        books_msrp = float(self.books_msrp[position])
+        duplicate_msrp = float(self.duplicate_msrp[position])
+        top_price = self.max_price[position]
+        msrp_total = self.msrp_total[position]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            unique_ratio = (books_msrp - duplicate_msrp) / top_price
+            min_price_ratio = msrp_total / self.min_price[position]
+            max_price_ratio = msrp_total / top_price
+
+        app = self.average_purchase_price[position]
+        month = self.start_month[position]
+        trend = []
+        month_mean = None
+        if month >= 0:
+            window = (self.trend_months <= month) & (self.trend_months > month - TREND_MONTHS)
+            for month_code, mean, count in zip(
+                self.trend_months[window], self.trend_mean[window], self.trend_counts[window],
+            ):
+                trend.append({
+                    'month': f'{month_code // 12:04d}-{month_code % 12 + 1:02d}',
+                    'mean_average_purchase_price': _round(mean, 2),
+                    'bundles': int(count),
+                })
+                if month_code == month:
+                    month_mean = float(mean)
+
+        return {
+            'bundle_id': self.bundle_ids[position],
+            'data_version': self.data_version,
+            'msrp_total': _round(msrp_total, 2),
+            'msrp_estimated': bool(self.msrp_estimated[position]),
+            'min_price': _round(self.min_price[position], 2),
+            'max_price': _round(top_price, 2),
+            'msrp_to_min_price': _round(min_price_ratio),
+            'msrp_to_max_price': _round(max_price_ratio),
+            'tiers': [
+                {
+                    'identifier': self.tier_identifier[index],
+                    'price': _round(self.tier_price[index], 2),
+                    'books': int(self.tier_books[index]),
+                    'msrp': _round(self.tier_msrp[index], 2),
+                    'msrp_to_price': _round(self.tier_ratio[index]),
+                    'marginal_books': int(self.tier_marginal_books[index]),
+                    'marginal_msrp': _round(self.tier_marginal_msrp[index], 2),
+                    'marginal_price': _round(self.tier_marginal_price[index], 2),
+                    'marginal_value_per_dollar': _round(self.tier_marginal_value[index]),
+                }
+                for index in tiers
+            ],
+            'purchase_price': {
+                'average_purchase_price': _round(app, 2),
+                'percentile': _round(self.app_percentile[position], 1),
+                'month_mean': _round(month_mean, 2),
+                'vs_month_mean': _round(app / month_mean) if month_mean else None,
+                'trend': trend,
+            },
+            'duplicates': {
+                'books': int(self.books_total[position]),
+                'duplicate_books': int(self.duplicate_books[position]),
+                'duplicate_msrp': _round(duplicate_msrp, 2),
+                'unique_msrp': _round(books_msrp - duplicate_msrp, 2),
+                'unique_msrp_to_max_price': _round(unique_ratio),
+                'shared_with': self._shared_with(position),
+            },
+        }
+
+    def _shared_with(self, position: int, limit: int = 10) -> List[Dict[str, Any]]:
+        """Other bundles containing this bundle's duplicate books, most shared first."""
+        mask = (self.book_bundle == position) & self.book_duplicate
+        if not mask.any():
+            return []
+        shared = np.isin(self.book_code, self.book_code[mask]) & (self.book_bundle != position)
+        others, counts = np.unique(self.book_bundle[shared], return_counts=True)
+        order = np.argsort(-counts, kind='stable')[:limit]
+        return [{'bundle_id': self.bundle_ids[others[index]], 'books': int(counts[index])} for index in order]
@@ -0,0 +1,166 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class ByteLRUCache:
+    """
+    In-process LRU cache of pre-serialized response bodies bounded by total bytes.
+
+    Entries are evicted least-recently-used first until the sum of the stored
+    bodies fits in ``max_bytes``. Values larger than the whole budget are never
+    stored. Concurrent misses for the same key share a single loader call
+    (single-flight), so a cold key only hits the database once.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: 'OrderedDict[Hashable, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.loads = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Returns the cached body for ``key`` and marks it as recently used."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: bytes) -> None:
+        """Stores ``value`` under ``key``, evicting old entries to respect the byte budget."""
+        size = len(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = value
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        """Removes ``key`` from the cache if present."""
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+
+    def clear(self) -> None:
+        """Drops every entry (metrics are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Optional[bytes]]],
+    ) -> Optional[bytes]:
+        """
+        Returns the cached body for ``key`` or loads it with ``loader``.
+
+        Only one ``loader`` runs per key at a time; other callers missing the
+        same key await its result. ``None`` results (e.g. not found) are
+        returned to every waiter but not cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self.loads += 1
+            value = await loader()
+            if value is not None:
+                self.put(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Evita el warning "exception was never retrieved" si nadie esperaba
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss/byte counters for monitoring."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'current_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'loads': self.loads,
+                'inflight': len(self._inflight),
+            }
+
+
+class VersionedCache(Generic[T]):
+    """
+    Holds one value derived from the whole database for the current data version.
+
+    ``build(rows, data_version)`` runs at most once per version: concurrent
+    requests that find a stale version wait for a single rebuild, which runs
+    in a worker thread so the event loop keeps serving other requests.
+    """
+
+    def __init__(self, build: Callable[[Any, int], T]) -> None:
+        self._build = build
+        self._value: Optional[T] = None
+        self._version: Optional[int] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.builds = 0
+
+    async def get(self, data_version: int, load_rows: Callable[[], Awaitable[Any]]) -> T:
+        """
+        Returns the value for ``data_version``, building it if needed.
+
+        Args:
+            data_version: Current data version of the database.
+            load_rows: Coroutine function returning the input of ``build``.
+        """
+        if self._value is not None and self._version == data_version:
+            return self._value
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._value is not None and self._version == data_version:
+                return self._value
+            rows = await load_rows()
+            value = await asyncio.to_thread(self._build, rows, data_version)
+            self._value, self._version = value, data_version
+            self.builds += 1
+            return value
+
+    def stats(self) -> Dict[str, Any]:
+        return {'data_version': self._version, 'builds': self.builds}
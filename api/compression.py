@@ -0,0 +1,180 @@
+import gzip
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.cache import ByteLRUCache
+from api.versioning import DATA_VERSION_HEADER
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/xml',
+    'text/',
+)
+
+
+def _build_encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    """Returns the available encoders in server preference order."""
+    encoders: Dict[str, Callable[[bytes], bytes]] = {}
+    if brotli is not None:
+        encoders['br'] = lambda body: brotli.compress(body, quality=5)
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=10)
+        encoders['zstd'] = compressor.compress
+    encoders['gzip'] = lambda body: gzip.compress(body, compresslevel=6, mtime=0)
+    return encoders
+
+
+ENCODERS = _build_encoders()
+
+
+def negotiate_encoding(accept_encoding: str, available: List[str]) -> Optional[str]:
+    """
+    Picks the best encoding from an ``Accept-Encoding`` header.
+
+    Client q-values win; ties are broken by the order of ``available``.
+    ``identity`` and unknown codings are ignored, ``q=0`` excludes a coding
+    and ``*`` applies to every coding not explicitly listed.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[token] = quality
+
+    best: Optional[Tuple[float, int, str]] = None
+    for position, encoding in enumerate(available):
+        quality = weights.get(encoding, weights.get('*', 0.0))
+        if quality <= 0:
+            continue
+        candidate = (quality, -position, encoding)
+        if best is None or candidate > best:
+            best = candidate
+    return best[2] if best else None
+
+
+class CompressionMiddleware:
+    """
+    Negotiated gzip/brotli/zstd compression for buffered responses.
+
+    Only single-chunk responses are compressed; streaming responses (exports,
+    server-sent events) pass through untouched so they are never buffered.
+    Bodies tagged with ``X-Data-Version`` are compressed once per
+    (URL, encoding, version) and then served from a byte-bounded LRU cache.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        cache_max_bytes: int = 32 * 1024 * 1024,
+        cache: Optional[ByteLRUCache] = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders = ENCODERS
+        self.cache = cache if cache is not None else ByteLRUCache(cache_max_bytes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get('accept-encoding', ''), list(self.encoders))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, scope, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-request state: holds the start message until the body is known."""
+
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self.downstream = send
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self.downstream(message)
+            return
+
+        if message['type'] == 'http.response.start':
+            headers = Headers(raw=message['headers'])
+            content_type = headers.get('content-type', '')
+            if (
+                message['status'] != 200
+                or 'content-encoding' in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+                or content_type.startswith('text/event-stream')
+            ):
+                self.passthrough = True
+                await self.downstream(message)
+                return
+            self.start_message = message
+            return
+
+        if message['type'] != 'http.response.body' or self.start_message is None:
+            await self.downstream(message)
+            return
+
+        body = message.get('body', b'')
+        if message.get('more_body', False) or len(body) < self.middleware.minimum_size:
+            # Respuesta en streaming o demasiado pequeña: se envía sin tocar
+            self.passthrough = True
+            await self.downstream(self.start_message)
+            await self.downstream(message)
+            return
+
+        compressed = self._compress(body)
+        headers = MutableHeaders(raw=self.start_message['headers'])
+        headers['Content-Encoding'] = self.encoding
+        headers['Content-Length'] = str(len(compressed))
+        headers.add_vary_header('Accept-Encoding')
+        await self.downstream(self.start_message)
+        await self.downstream({'type': 'http.response.body', 'body': compressed})
+
+    def _compress(self, body: bytes) -> bytes:
+        headers = Headers(raw=self.start_message['headers'])
+        version = headers.get(DATA_VERSION_HEADER)
+        encoder = self.middleware.encoders[self.encoding]
+        if version is None:
+            return encoder(body)
+
+        query = self.scope.get('query_string', b'').decode('latin-1')
+        key = (self.scope['path'], query, self.encoding, version)
+        cached = self.middleware.cache.get(key)
+        if cached is None:
+            cached = encoder(body)
+            self.middleware.cache.put(key, cached)
+        return cached
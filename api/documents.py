@@ -0,0 +1,55 @@
+"""
+Pre-serialized bundle responses, materialized at ETL time.
+
+The ETL's last stage renders every bundle once into its ``/bundles/{id}``
+body (``full``) and its ranking-entry body (``summary``) and stores them in
+``bundle_document`` under the final data version (see
+``spider.database.documents``). Read endpoints return those bytes as they
+are while the data version matches, and fall back to the ORM path otherwise
+(e.g. before the first materialization).
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Response
+
+from api.versioning import DATA_VERSION_HEADER
+from spider.utils import json_codec
+
+JSON_MEDIA_TYPE = 'application/json'
+
+
+def document_response(body: bytes, version: int) -> Response:
+    """A stored document as a raw JSON response (no model validation or re-encoding)."""
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers={DATA_VERSION_HEADER: str(version)})
+
+
+def join_documents(bodies: Sequence[bytes]) -> bytes:
+    """A JSON array of stored documents."""
+    return b'[' + b','.join(bodies) + b']'
+
+
+def ranking_body(kind: str, computed_at: Optional[datetime], entries: List[Tuple[int, Optional[float], bytes]]) -> bytes:
+    """
+    Serializes a ``BundleRankingResponse`` around stored ``summary`` documents.
+
+    Args:
+        kind: Ranking kind.
+        computed_at: When the ranking was computed.
+        entries: ``(position, score, summary body)`` in ranking order.
+    """
+    head: Dict[str, Any] = {'kind': kind, 'computed_at': computed_at.isoformat() if computed_at else None}
+    parts = [
+        b'{"position":%d,"score":%s,"bundle":%s}' % (position, json_codec.dumps_bytes(score), body)
+        for position, score, body in entries
+    ]
+    # Mismo orden de campos que BundleRankingResponse: kind, computed_at, entries
+    return json_codec.dumps_bytes(head)[:-1] + b',"entries":' + join_documents(parts) + b'}'
+
+
+def changes_body(since: int, next_version: int, changes: Sequence[bytes], deleted: Sequence[bytes]) -> bytes:
+    """Serializes a ``BundleChangesResponse`` around stored ``full`` documents and tombstone bodies."""
+    # Mismo orden de campos que BundleChangesResponse: since, next_version, changes, deleted
+    return b'{"since":%d,"next_version":%d,"changes":%s,"deleted":%s}' % (
+        since, next_version, join_documents(changes), join_documents(deleted),
+    )
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from starlette.requests import Request
+
+from spider.utils.events import ChangeEvent, ChangeHub
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_SECONDS = 15.0
+RETRY_MILLISECONDS = 3000
+# How often the data version is polled for changes made outside this process
+VERSION_POLL_SECONDS = 2.0
+
+
+def format_sse(event: ChangeEvent) -> bytes:
+    """Encodes a change event as a Server-Sent Events frame."""
+    data = json.dumps(event.data, ensure_ascii=False, separators=(',', ':'), default=str)
+    return f'id: {event.id}\nevent: {event.type}\ndata: {data}\n\n'.encode('utf-8')
+
+
+async def _poll_version(fetch_version: Callable[[], Awaitable[int]]) -> Optional[int]:
+    try:
+        return await fetch_version()
+    except Exception as exc:
+        logger.debug('Could not read the data version for /events: %s', exc)
+        return None
+
+
+async def stream_change_events(
+    hub: ChangeHub,
+    request: Request,
+    last_event_id: Optional[int] = None,
+    fetch_version: Optional[Callable[[], Awaitable[int]]] = None,
+    poll_seconds: float = VERSION_POLL_SECONDS,
+    forward_events: bool = True,
+) -> AsyncIterator[bytes]:
+    """
+    Yields SSE frames for a single client until it disconnects.
+
+    A comment line is sent every ``KEEPALIVE_SECONDS`` so proxies keep the
+    connection open. If the client falls behind and its queue overflows, the
+    stream ends; the browser reconnects with ``Last-Event-ID`` and resumes.
+
+    The hub only sees changes persisted in this process. With
+    ``fetch_version``, the data version is also polled every
+    ``poll_seconds``; a bump not announced by a hub event (an ETL run from
+    the CLI or another worker) is sent as a ``reset`` event so the client
+    reloads.
+
+    Hub events carry the working database's version. When the API reads a
+    published snapshot instead, pass ``forward_events=False``: those events
+    announce rows the API cannot serve yet, so they are not sent and the
+    only frames are a ``reset`` each time ``fetch_version`` (the published
+    version) moves.
+    """
+    subscription = hub.subscribe(last_event_id) if forward_events else None
+    known_version = await _poll_version(fetch_version) if fetch_version else None
+    timeout = min(KEEPALIVE_SECONDS, poll_seconds) if fetch_version else KEEPALIVE_SECONDS
+    last_sent = time.monotonic()
+    try:
+        yield f'retry: {RETRY_MILLISECONDS}\n\n'.encode('utf-8')
+        while True:
+            if subscription is None:
+                await asyncio.sleep(timeout)
+                event = None
+            else:
+                event = await subscription.get(timeout=timeout)
+            if event is not None:
+                version = event.data.get('data_version')
+                if isinstance(version, int) and (known_version is None or version > known_version):
+                    known_version = version
+                last_sent = time.monotonic()
+                yield format_sse(event)
+                continue
+            if (subscription is not None and subscription.closed) or await request.is_disconnected():
+                break
+            if fetch_version is not None:
+                version = await _poll_version(fetch_version)
+                if version is not None and known_version is not None and version != known_version:
+                    last_sent = time.monotonic()
+                    reset = ChangeEvent(id=hub.last_event_id, type='reset', data={'data_version': version})
+                    yield format_sse(reset)
+                if version is not None:
+                    known_version = version
+            if time.monotonic() - last_sent >= KEEPALIVE_SECONDS:
+                last_sent = time.monotonic()
+                yield b': keepalive\n\n'
+    finally:
+        if subscription is not None:
+            subscription.close()
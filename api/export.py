@@ -0,0 +1,81 @@
+import csv
+import io
+from enum import Enum
+from typing import AsyncIterator, Optional, Set, Type
+
+from pydantic import BaseModel
+from sqlalchemy import Select
+
+from spider.utils import json_codec
+
+EXPORT_BATCH_SIZE = 500
+
+
+class ExportFormat(str, Enum):
+    ndjson = 'ndjson'
+    csv = 'csv'
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: 'application/x-ndjson',
+    ExportFormat.csv: 'text/csv; charset=utf-8',
+}
+
+
+def _csv_value(value):
+    """Nested structures are embedded as JSON text; None becomes an empty cell."""
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json_codec.dumps(value)
+    return value
+
+
+async def stream_export(
+    session_factory,
+    statement: Select,
+    schema: Type[BaseModel],
+    fmt: ExportFormat,
+    exclude: Optional[Set[str]] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Streams the rows of ``statement`` as NDJSON lines or CSV records.
+
+    Rows are fetched through a server-side cursor (``stream_scalars`` with
+    ``yield_per``) and flushed every ``batch_size`` rows, so memory stays
+    bounded by one batch no matter how large the table is. The session is
+    owned by the generator because it must outlive the endpoint call.
+    """
+    exclude = exclude or set()
+    fields = [name for name in schema.model_fields if name not in exclude]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt is ExportFormat.csv else None
+    if writer:
+        writer.writerow(fields)
+
+    async with session_factory() as session:
+        rows = await session.stream_scalars(statement.execution_options(yield_per=batch_size))
+        pending = 0
+        async for row in rows:
+            # Solo se leen los campos exportados (las columnas diferidas no se tocan);
+            # los campos calculados por la API (images) no existen en la fila
+            item = schema.model_validate({name: getattr(row, name, None) for name in fields})
+            if writer:
+                data = item.model_dump(mode='json', include=set(fields))
+                writer.writerow([_csv_value(data.get(name)) for name in fields])
+            else:
+                buffer.write(item.model_dump_json(exclude=exclude))
+                buffer.write('\n')
+            pending += 1
+            if pending >= batch_size:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+                # Libera las instancias ya enviadas del identity map
+                session.expunge_all()
+                pending = 0
+
+    remaining = buffer.getvalue()
+    if remaining:
+        yield remaining.encode('utf-8')
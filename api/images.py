@@ -0,0 +1,25 @@
+from fastapi.staticfiles import StaticFiles
+from starlette.types import Scope
+
+# The ETL localizes the stored bundle documents with the same map
+from spider.database.images import IMAGES_URL_PREFIX, ImageMap
+
+# Subdirectorio donde ImageMirror guarda archivos direccionados por contenido
+MIRROR_SUBDIR = 'bundles/'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """
+    StaticFiles that marks mirrored images as immutable.
+
+    Mirrored files are named after the SHA-256 of their content, so a URL
+    always serves the same bytes and browsers/CDNs may cache it for a year
+    without revalidating. Other files keep the default validation headers.
+    """
+
+    async def get_response(self, path: str, scope: Scope):
+        response = await super().get_response(path, scope)
+        if path.replace('\\', '/').startswith(MIRROR_SUBDIR) and response.status_code in (200, 304):
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
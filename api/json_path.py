@@ -0,0 +1,38 @@
+import re
+
+_SEGMENT = re.compile(r'([^.\[\]"]+)((?:\[\d+\])*)')
+
+
+def to_sqlite_json_path(path: str) -> str:
+    """
+    Converts a dotted path such as ``data.books.mosaic[0].products`` into a
+    SQLite JSON path (``$."data"."books"."mosaic"[0]."products"``).
+
+    Every key is quoted so labels containing characters like ``|`` or ``-``
+    are matched literally. A leading ``$`` or ``$.`` is accepted and an empty
+    path selects the whole document.
+
+    Raises:
+        ValueError: If the path is malformed.
+    """
+    path = path.strip()
+    if path.startswith('$'):
+        path = path[1:]
+    if path.startswith('.'):
+        path = path[1:]
+
+    parts = ['$']
+    leading_index = re.match(r'((?:\[\d+\])+)\.?', path)
+    if leading_index:
+        parts.append(leading_index.group(1))
+        path = path[leading_index.end():]
+    if not path:
+        return ''.join(parts)
+
+    for segment in path.split('.'):
+        match = _SEGMENT.fullmatch(segment)
+        if not match:
+            raise ValueError(f'Invalid path segment: {segment!r}')
+        key, indexes = match.groups()
+        parts.append(f'."{key}"{indexes}')
+    return ''.join(parts)
@@ -1,87 +1,118 @@
+import asyncio
 from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional
 
-from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from sqlalchemy import nulls_last, select
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import Session
+from sqlalchemy import LargeBinary, and_, cast, func, nulls_last, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
 import logging
 
-from spider.database.session import get_session_factory as build_session_factory
-from spider.database.persistence import (
-    persist_bundles,
-    remove_outdated_bundles,
-    persist_landing_page_raw_data,
+from spider.database.session import (
+    get_async_read_engine,
+    get_async_read_session_factory as build_async_session_factory,
+    get_session_factory as build_write_session_factory,
 )
-from spider.core.spider import HumbleSpider
-from spider.core.errors import HumbleSpiderError
-from spider.database.models import Bundle, LandingPageRawData
+from spider.database.models import (
+    Bundle,
+    BundleDocument,
+    BundleRanking,
+    BundleSignature,
+    BundleTombstone,
+    EtlJob,
+    EtlRun,
+    ImageAsset,
+    LandingPageRawData,
+)
+from spider.database.rankings import RANKING_KINDS
 from spider.config.settings import get_settings
+from spider.utils import json_codec
+from spider.utils.events import change_hub
 
 logger = logging.getLogger(__name__)
 
+from api.cache import ByteLRUCache, VersionedCache
+from api.compression import CompressionMiddleware
+from api.documents import changes_body, document_response, join_documents, ranking_body
+from api.events import stream_change_events
+from api.images import ImageMap, ImmutableStaticFiles
+from api.export import MEDIA_TYPES, ExportFormat, stream_export
+from api.json_path import to_sqlite_json_path
+from api.publishing import PublishedDatabase
+from api.read_model import ReadModel, ReadModelRefresher
+from api.responses import CodecJSONResponse
+from api.metrics import (
+    PROMETHEUS_CONTENT_TYPE,
+    MetricsMiddleware,
+    MetricsRegistry,
+    cache_collector,
+    install_db_hooks,
+)
 from api.schemas import (
+    BundleAnalyticsResponse,
+    BundleChangesResponse,
+    BundleRankingEntryResponse,
+    BundleRankingResponse,
     BundleResponse,
+    BundleSummaryResponse,
+    BundleTombstoneResponse,
+    SimilarBundlesResponse,
+    ETLJobResponse,
+    ETLRunReportResponse,
     ETLRunResponse,
     LandingPageRawDataResponse,
+    LandingPageRawDataSummaryResponse,
 )
+from api.versioning import DATA_VERSION_HEADER, fetch_data_version
 
 settings = get_settings()
-SessionFactory = None
-AsyncSessionFactory = None
+# Catalog reads go to the published snapshot when DB_PUBLISH_DIR is set, otherwise to db_path
+published = PublishedDatabase(settings)
+etl_runner = None
+analytics_cache = None
+similarity_cache = None
+read_model: Optional[ReadModelRefresher] = None
+
+# Snapshots are immutable once written, so serialized bodies never go stale.
+raw_data_cache = ByteLRUCache(settings.raw_data_cache_max_bytes)
+compression_cache = ByteLRUCache(settings.compression_cache_max_bytes)
+image_cache = VersionedCache(ImageMap)
 
-def get_async_engine():
-    """Creates the async engine for FastAPI using SQLite."""
-    from pathlib import Path
-    db_path = Path(settings.db_path)
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-    uri = f'sqlite+aiosqlite:///{db_path.absolute()}'
-    return create_async_engine(uri, echo=settings.sql_echo, future=True)
+metrics = MetricsRegistry()
+metrics.add_collector(cache_collector({'raw_data': raw_data_cache, 'compression': compression_cache}))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan to initialize async resources."""
-    global AsyncSessionFactory
-    async_engine = get_async_engine()
-    
-    # Create tables if they don't exist using the async engine
-    from spider.database.models import Base
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all, checkfirst=True)
-    
-    # Ensure columns exist (works better with sync)
-    from spider.database.persistence import ensure_columns, ensure_landing_page_raw_data_table
-    from sqlalchemy import create_engine
-    from pathlib import Path
-    db_path = Path(settings.db_path)
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-    sync_engine = create_engine(
-        f'sqlite:///{db_path.absolute()}',
-        echo=settings.sql_echo,
-        future=True,
-        connect_args={'check_same_thread': False}
-    )
-    try:
-        ensure_columns(sync_engine)
-        ensure_landing_page_raw_data_table(sync_engine)
-    finally:
-        sync_engine.dispose()
-    
-    AsyncSessionFactory = async_sessionmaker(
-        async_engine,
-        class_=AsyncSession,
-        expire_on_commit=False
-    )
+    global read_model
+    # Schema checks of the working database run once per process on the shared sync engine
+    build_async_session_factory(settings)
+    refresh_task = None
+    if settings.read_model_enabled:
+        read_model = ReadModelRefresher(lambda: published.session_factory()(), settings.read_model_refresh_seconds)
+        try:
+            # First snapshot before serving; on failure the endpoints use the DB until a refresh succeeds
+            await asyncio.to_thread(read_model.build)
+        except Exception:
+            logger.exception('Could not build the read model at startup')
+        refresh_task = asyncio.create_task(read_model.run(current_data_version))
     yield
-    await async_engine.dispose()
+    if refresh_task is not None:
+        refresh_task.cancel()
+    await get_async_read_engine(settings).dispose()
+    if published.path is not None:
+        await get_async_read_engine(published.current).dispose()
 
 app = FastAPI(
     title='Humble Bundle ETL API',
     version='1.0.0',
     description='API v1.0 - Scraper original de Humble Bundle. Trigger ETL and query stored bundles.',
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=CodecJSONResponse,
 )
 
 allowed_origins = [
@@ -100,55 +131,135 @@ app.add_middleware(
     allow_headers=['*'],
 )
 
-# Montar directorio de imágenes estáticas (local development)
-import os
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_size,
+    cache=compression_cache,
+)
+
+# Outermost, so latency and response sizes include compression
+if settings.metrics_enabled:
+    install_db_hooks(metrics)
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# Montar directorio de imágenes estáticas (lo llena la etapa de imágenes del ETL)
 from pathlib import Path
 
-# Usar ruta relativa al directorio del proyecto
-images_dir = Path(__file__).parent.parent / "images"
+images_dir = Path(settings.images_dir)
 # Crear directorios si no existen
 images_dir.mkdir(parents=True, exist_ok=True)
 (images_dir / "bundles").mkdir(parents=True, exist_ok=True)
 (images_dir / "books").mkdir(parents=True, exist_ok=True)
 
-app.mount("/images", StaticFiles(directory=str(images_dir)), name="images")
+app.mount("/images", ImmutableStaticFiles(directory=str(images_dir)), name="images")
 
 
-def get_db():
-    global SessionFactory
-    if SessionFactory is None:
-        SessionFactory = build_session_factory(settings)
-    session = SessionFactory()
-    try:
-        yield session
-    finally:
-        session.close()
+def get_async_session_factory():
+    """Returns the async session factory of the database the catalog is read from."""
+    return published.async_session_factory()
 
 
 async def get_async_db():
     """Async session for async endpoints."""
-    global AsyncSessionFactory
-    if AsyncSessionFactory is None:
-        async_engine = get_async_engine()
-        AsyncSessionFactory = async_sessionmaker(
-            async_engine,
-            class_=AsyncSession,
-            expire_on_commit=False
-        )
-    async with AsyncSessionFactory() as session:
+    async with get_async_session_factory()() as session:
         try:
             yield session
         finally:
             await session.close()
 
 
+async def get_async_etl_db():
+    """Async session on the working database, where ETL jobs and runs are recorded."""
+    async with build_async_session_factory(settings)() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def current_data_version() -> int:
+    async with get_async_session_factory()() as session:
+        return await fetch_data_version(session)
+
+
+def read_snapshot() -> Optional[ReadModel]:
+    """Current in-memory snapshot, or None when the read model is disabled or not built yet."""
+    return read_model.current if read_model is not None else None
+
+
 @app.get('/health', tags=['health'])
 async def healthcheck():
-    return {'status': 'ok', 'database': settings.db_path}
+    return {'status': 'ok', 'database': settings.db_path, 'published': published.stats()}
+
+
+@app.get('/health/cache', tags=['health'])
+async def cache_stats():
+    """Hit/miss/byte counters of the in-process response caches."""
+    return {
+        'raw_data': raw_data_cache.stats(),
+        'compression': compression_cache.stats(),
+        'images': image_cache.stats(),
+        'read_model': read_model.stats() if read_model is not None else {'enabled': False},
+    }
+
+
+async def load_image_map(db: AsyncSession, version: int) -> ImageMap:
+    """Origin URL -> mirrored copy map for ``version``, rebuilt when the data changes."""
+    async def load_rows():
+        result = await db.execute(select(ImageAsset.source_url, ImageAsset.path, ImageAsset.variants))
+        return result.all()
+
+    return await image_cache.get(version, load_rows)
+
+
+async def load_document(db: AsyncSession, version: int, where: tuple, join: Optional[tuple] = None, kind: str = 'full') -> Optional[bytes]:
+    """
+    Body of a bundle document stored for ``version`` by the ETL, or None.
+
+    None means the documents were not materialized for this version (or the
+    bundle does not exist); callers then render the response from the ORM.
+    """
+    query = select(BundleDocument.body)
+    if join is not None:
+        query = query.join(*join)
+    result = await db.execute(
+        query.filter(BundleDocument.data_version == version, BundleDocument.kind == kind, *where)
+    )
+    return result.scalar_one_or_none()
+
+
+@app.get('/metrics', tags=['health'], include_in_schema=False)
+async def prometheus_metrics():
+    """Per-route latency, response size and DB usage in Prometheus text format."""
+    return Response(content=metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
 
 
 @app.get('/bundles/featured', response_model=BundleResponse, tags=['bundles'])
-async def get_featured_bundle(db: AsyncSession = Depends(get_async_db)):
+async def get_featured_bundle(response: Response, db: AsyncSession = Depends(get_async_db)):
+    """Gets the featured bundle, materialized by the ETL ranking stage."""
+    snapshot = read_snapshot()
+    if snapshot is not None and snapshot.featured is not None:
+        return document_response(snapshot.featured.body, snapshot.data_version)
+    version = await fetch_data_version(db)
+    response.headers[DATA_VERSION_HEADER] = str(version)
+    body = await load_document(
+        db, version,
+        join=(BundleRanking, BundleRanking.bundle_id == BundleDocument.bundle_id),
+        where=(BundleRanking.kind == 'featured', BundleRanking.position == 1),
+    )
+    if body is not None:
+        return document_response(body, version)
+    images = await load_image_map(db, version)
+    result = await db.execute(
+        select(Bundle)
+        .join(BundleRanking, BundleRanking.bundle_id == Bundle.id)
+        .filter(BundleRanking.kind == 'featured', BundleRanking.position == 1)
+    )
+    bundle = result.scalar_one_or_none()
+    if bundle:
+        return images.localize(BundleResponse.model_validate(bundle))
+
+    # Sin rankings materializados (ETL anterior a la etapa de rankings)
     result = await db.execute(
         select(Bundle).order_by(
             nulls_last(Bundle.msrp_total.desc()),
@@ -158,96 +269,534 @@ async def get_featured_bundle(db: AsyncSession = Depends(get_async_db)):
     bundle = result.scalar_one_or_none()
     if not bundle:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='No bundles stored')
-    return bundle
+    return images.localize(BundleResponse.model_validate(bundle))
+
+
+@app.get('/bundles/rankings/{kind}', response_model=BundleRankingResponse, tags=['bundles'])
+async def get_bundle_ranking(kind: str, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """
+    Gets a leaderboard precomputed at ETL time.
+
+    Available kinds: featured, best_value (MSRP / cheapest tier price),
+    ending_soon, best_selling and newest.
+    """
+    if kind not in RANKING_KINDS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'Unknown ranking. Available: {", ".join(RANKING_KINDS)}',
+        )
+    snapshot = read_snapshot()
+    if snapshot is not None and kind in snapshot.rankings:
+        return document_response(snapshot.rankings[kind], snapshot.data_version)
+    version = await fetch_data_version(db)
+    response.headers[DATA_VERSION_HEADER] = str(version)
+    result = await db.execute(
+        select(BundleRanking.position, BundleRanking.score, BundleRanking.computed_at, BundleDocument.body)
+        .outerjoin(BundleDocument, and_(
+            BundleDocument.bundle_id == BundleRanking.bundle_id,
+            BundleDocument.data_version == version,
+            BundleDocument.kind == 'summary',
+        ))
+        .filter(BundleRanking.kind == kind)
+        .order_by(BundleRanking.position)
+    )
+    documents = result.all()
+    if all(row.body is not None for row in documents):
+        computed_at = documents[0].computed_at if documents else None
+        body = ranking_body(kind, computed_at, [(row.position, row.score, row.body) for row in documents])
+        return document_response(body, version)
+
+    images = await load_image_map(db, version)
+    result = await db.execute(
+        select(BundleRanking, Bundle)
+        .join(Bundle, Bundle.id == BundleRanking.bundle_id)
+        .filter(BundleRanking.kind == kind)
+        .order_by(BundleRanking.position)
+    )
+    rows = result.all()
+    return BundleRankingResponse(
+        kind=kind,
+        computed_at=rows[0][0].computed_at if rows else None,
+        entries=[
+            BundleRankingEntryResponse(
+                position=ranking.position,
+                score=ranking.score,
+                bundle=images.localize(BundleSummaryResponse.model_validate(bundle)),
+            )
+            for ranking, bundle in rows
+        ],
+    )
 
 
 @app.get('/bundles', response_model=list[BundleResponse], tags=['bundles'])
-async def list_bundles(db: AsyncSession = Depends(get_async_db)):
+async def list_bundles(response: Response, db: AsyncSession = Depends(get_async_db)):
+    snapshot = read_snapshot()
+    if snapshot is not None:
+        return document_response(snapshot.list_body, snapshot.data_version)
+    version = await fetch_data_version(db)
+    response.headers[DATA_VERSION_HEADER] = str(version)
+    result = await db.execute(
+        select(BundleDocument.body)
+        .join(Bundle, Bundle.id == BundleDocument.bundle_id)
+        .filter(BundleDocument.data_version == version, BundleDocument.kind == 'full')
+        .order_by(Bundle.end_date_datetime.desc())
+    )
+    bodies = result.scalars().all()
+    if bodies:
+        return document_response(join_documents(bodies), version)
+
+    images = await load_image_map(db, version)
     result = await db.execute(
         select(Bundle).order_by(Bundle.end_date_datetime.desc())
     )
     bundles = result.scalars().all()
-    return bundles
+    return [images.localize(BundleResponse.model_validate(bundle)) for bundle in bundles]
+
+
+@app.get('/bundles/changes', response_model=BundleChangesResponse, tags=['bundles'])
+async def list_bundle_changes(
+    response: Response,
+    since: int = Query(0, ge=0, description='next_version of the previous call (0: whole catalog)'),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Incremental feed for clients that mirror the bundle catalog.
+
+    Returns the bundles changed after data version ``since`` (same bodies as
+    ``GET /bundles``, oldest change first) and the tombstones of the bundles
+    deleted after it. Pass ``next_version`` as ``since`` on the next call.
+    A change can be delivered twice (apply changes as upserts by id), never
+    skipped. ``since`` ahead of the current data version (e.g. after a
+    snapshot rollback) answers 409: resync from ``since=0``.
+    """
+    version = await fetch_data_version(db)
+    if since > version:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f'since={since} is ahead of data version {version}; resync from since=0',
+        )
+    response.headers[DATA_VERSION_HEADER] = str(version)
+    # Versions are read before the rows: rows committed later carry a newer row_version
+    changed = Bundle.row_version > since if since else True
+    deleted = []
+    if since:
+        result = await db.execute(
+            select(BundleTombstone).filter(BundleTombstone.version > since).order_by(BundleTombstone.version)
+        )
+        deleted = [BundleTombstoneResponse.model_validate(row) for row in result.scalars()]
+
+    result = await db.execute(
+        select(BundleDocument.body)
+        .select_from(Bundle)
+        .outerjoin(BundleDocument, and_(
+            BundleDocument.bundle_id == Bundle.id,
+            BundleDocument.data_version == version,
+            BundleDocument.kind == 'full',
+        ))
+        .filter(changed)
+        .order_by(Bundle.row_version, Bundle.id)
+    )
+    bodies = result.scalars().all()
+    if all(body is not None for body in bodies):
+        body = changes_body(since, version, bodies, [row.model_dump_json().encode('utf-8') for row in deleted])
+        return document_response(body, version)
+
+    images = await load_image_map(db, version)
+    result = await db.execute(select(Bundle).filter(changed).order_by(Bundle.row_version, Bundle.id))
+    return BundleChangesResponse(
+        since=since,
+        next_version=version,
+        changes=[images.localize(BundleResponse.model_validate(bundle)) for bundle in result.scalars()],
+        deleted=deleted,
+    )
 
 
 @app.get('/bundles/{bundle_id}', response_model=BundleResponse, tags=['bundles'])
-async def get_bundle(bundle_id: str, db: AsyncSession = Depends(get_async_db)):
+async def get_bundle(bundle_id: str, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Gets a bundle by its UUID."""
+    snapshot = read_snapshot()
+    if snapshot is not None:
+        entry = snapshot.by_id.get(bundle_id)
+        if entry is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Bundle not found')
+        return document_response(entry.body, snapshot.data_version)
+    version = await fetch_data_version(db)
+    response.headers[DATA_VERSION_HEADER] = str(version)
+    body = await load_document(db, version, where=(BundleDocument.bundle_id == bundle_id,))
+    if body is not None:
+        return document_response(body, version)
     result = await db.execute(
         select(Bundle).filter(Bundle.id == bundle_id)
     )
     bundle = result.scalar_one_or_none()
     if not bundle:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Bundle not found')
-    return bundle
+    images = await load_image_map(db, version)
+    return images.localize(BundleResponse.model_validate(bundle))
+
+
+def get_analytics_cache():
+    global analytics_cache
+    if analytics_cache is None:
+        # NumPy is only imported once analytics are requested
+        from api.analytics import ValueAnalytics
+        analytics_cache = VersionedCache(ValueAnalytics)
+    return analytics_cache
+
+
+@app.get('/bundles/{bundle_id}/analytics', response_model=BundleAnalyticsResponse, tags=['bundles'])
+async def get_bundle_analytics(
+    bundle_id: str,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    cache=Depends(get_analytics_cache),
+):
+    """
+    Value analytics of a bundle: MSRP/price ratio and marginal value per tier,
+    average purchase price against the monthly trend, and the MSRP of books
+    also sold in other stored bundles.
+
+    Computed for all bundles at once and cached until the data version changes.
+    """
+    version = await fetch_data_version(db)
+    response.headers[DATA_VERSION_HEADER] = str(version)
+
+    async def load_rows():
+        result = await db.execute(
+            select(
+                Bundle.id,
+                Bundle.msrp_total,
+                Bundle.start_date_datetime,
+                Bundle.price_tiers,
+                Bundle.book_list,
+            )
+        )
+        return result.all()
+
+    analytics = await cache.get(version, load_rows)
+    document = analytics.for_bundle(bundle_id)
+    if document is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Bundle not found')
+    return document
+
+
+def get_similarity_cache():
+    global similarity_cache
+    if similarity_cache is None:
+        from api.similarity import SimilarityIndex
+        similarity_cache = VersionedCache(SimilarityIndex)
+    return similarity_cache
+
+
+@app.get('/bundles/{bundle_id}/similar', response_model=SimilarBundlesResponse, tags=['bundles'])
+async def get_similar_bundles(
+    bundle_id: str,
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    min_score: float = Query(0.0, ge=0.0, le=1.0, description='Minimum estimated Jaccard index'),
+    db: AsyncSession = Depends(get_async_db),
+    cache=Depends(get_similarity_cache),
+):
+    """
+    Bundles sharing books with this one, ranked by the estimated Jaccard index
+    of their book sets (machine_names and normalized titles).
+
+    Uses the MinHash signatures stored at persist time, including bundles that
+    already expired (``bundle_id`` is null for those). The LSH index is built
+    once per data version.
+    """
+    version = await fetch_data_version(db)
+    response.headers[DATA_VERSION_HEADER] = str(version)
+
+    async def load_rows():
+        signed = await db.execute(
+            select(
+                BundleSignature.machine_name,
+                Bundle.id.label('bundle_id'),
+                func.coalesce(Bundle.tile_name, BundleSignature.tile_name).label('tile_name'),
+                BundleSignature.signature,
+            ).outerjoin(Bundle, Bundle.machine_name == BundleSignature.machine_name)
+        )
+        # Bundles guardados antes de existir bundle_signature
+        unsigned = await db.execute(
+            select(Bundle.machine_name, Bundle.id.label('bundle_id'), Bundle.tile_name, Bundle.book_list)
+            .outerjoin(BundleSignature, BundleSignature.machine_name == Bundle.machine_name)
+            .where(BundleSignature.machine_name.is_(None))
+        )
+        return signed.all(), unsigned.all()
+
+    index = await cache.get(version, load_rows)
+    result = index.similar(bundle_id, limit=limit, min_score=min_score)
+    if result is None:
+        exists = await db.execute(select(Bundle.id).filter(Bundle.id == bundle_id))
+        if exists.scalar_one_or_none() is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Bundle not found')
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Bundle has no books to compare')
+    return result
 
 
 @app.get('/bundles/by-machine-name/{machine_name}', response_model=BundleResponse, tags=['bundles'])
-async def get_bundle_by_machine_name(machine_name: str, db: AsyncSession = Depends(get_async_db)):
+async def get_bundle_by_machine_name(machine_name: str, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Gets a bundle by its machine_name (backward compatibility)."""
+    snapshot = read_snapshot()
+    if snapshot is not None:
+        entry = snapshot.by_machine_name.get(machine_name)
+        if entry is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Bundle not found')
+        return document_response(entry.body, snapshot.data_version)
+    version = await fetch_data_version(db)
+    response.headers[DATA_VERSION_HEADER] = str(version)
+    body = await load_document(
+        db, version,
+        join=(Bundle, Bundle.id == BundleDocument.bundle_id),
+        where=(Bundle.machine_name == machine_name,),
+    )
+    if body is not None:
+        return document_response(body, version)
     result = await db.execute(
         select(Bundle).filter(Bundle.machine_name == machine_name)
     )
     bundle = result.scalar_one_or_none()
     if not bundle:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Bundle not found')
-    return bundle
+    images = await load_image_map(db, version)
+    return images.localize(BundleResponse.model_validate(bundle))
+
+
+@app.get('/events', tags=['events'])
+async def bundle_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(default=None, alias='Last-Event-ID'),
+):
+    """
+    Server-Sent Events stream of bundle changes.
+
+    Events are ``inserted``, ``updated`` (with the changed fields) and
+    ``expired``, each carrying ``machine_name`` and the resulting
+    ``data_version``. Reconnecting with ``Last-Event-ID`` replays missed
+    events; if they are no longer in the history a ``reset`` event asks the
+    client to reload everything. A ``reset`` is also sent when the data
+    version changes without events from this worker (CLI ETL, other workers).
+    With ``DB_PUBLISH_DIR`` set the stream follows the published snapshot:
+    per-row events are not sent (their rows are not served yet) and a
+    ``reset`` is sent each time a new snapshot is published or rolled back.
+    """
+    try:
+        resume_from = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_from = None
+    return StreamingResponse(
+        stream_change_events(
+            change_hub, request, resume_from,
+            fetch_version=current_data_version,
+            forward_events=not published.enabled,
+        ),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
 
 
-@app.post('/etl/run', response_model=ETLRunResponse, tags=['etl'])
-def trigger_etl(db: Session = Depends(get_db)):
-    """Executes the ETL: downloads bundles and saves to the database."""
-    spider = HumbleSpider()
-    try:
-        records = spider.fetch_bundles()
-    except HumbleSpiderError as exc:
-        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
-
-    remove_outdated_bundles(db)
-    persist_bundles(records, db)
-    
-    # Save landing page raw data
-    raw_data_record = spider.get_raw_data_record()
-    if raw_data_record:
-        persist_landing_page_raw_data(raw_data_record, db)
-    
-    return ETLRunResponse(
-        bundles_processed=len(records),
-        cleanup_ran=True
-    )
-
-
-@app.get('/landing-page-raw-data', response_model=list[LandingPageRawDataResponse], tags=['raw-data'])
-async def list_landing_page_raw_data(db: AsyncSession = Depends(get_async_db)):
-    """Lists all raw data records ordered by descending date."""
+def get_etl_runner():
+    global etl_runner
+    if etl_runner is None:
+        # The ETL stack is imported on first use, not at worker start-up
+        from spider.core.jobs import EtlJobRunner
+        etl_runner = EtlJobRunner(settings, session_factory=build_write_session_factory(settings))
+    return etl_runner
+
+
+@app.post('/etl/run', response_model=ETLRunResponse, status_code=status.HTTP_202_ACCEPTED, tags=['etl'])
+def trigger_etl(runner=Depends(get_etl_runner)):
+    """
+    Enqueues an ETL run and returns its job id right away.
+
+    A database lease guarantees a single ETL across all workers; if one is
+    already running, the call joins it and returns the running job's id.
+    """
+    job, joined = runner.submit()
+    return ETLRunResponse(job_id=job.id, status=job.status, joined=joined)
+
+
+@app.get('/etl/jobs/{job_id}', response_model=ETLJobResponse, tags=['etl'])
+async def get_etl_job(job_id: str, db: AsyncSession = Depends(get_async_etl_db)):
+    """Reports the status of an ETL job with per-stage and per-bundle progress."""
+    result = await db.execute(select(EtlJob).filter(EtlJob.id == job_id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='ETL job not found')
+    return job
+
+
+@app.get('/etl/runs', response_model=list[ETLRunReportResponse], tags=['etl'])
+async def list_etl_runs(
+    limit: int = Query(20, ge=1, le=500),
+    job_id: Optional[str] = Query(None, description='Only runs of this ETL job'),
+    include_report: bool = Query(True, description='Include per-stage timings and fetch stats'),
+    db: AsyncSession = Depends(get_async_etl_db),
+):
+    """
+    ETL run ledger, newest first: wall/CPU time, throughput, bytes downloaded,
+    discards and memory peak of every run, for tracking performance regressions.
+    """
+    statement = select(EtlRun).order_by(EtlRun.started_at.desc()).limit(limit)
+    if job_id:
+        statement = statement.where(EtlRun.job_id == job_id)
+    if not include_report:
+        statement = statement.options(defer(EtlRun.report))
+    result = await db.execute(statement)
+    runs = result.scalars().all()
+    return [
+        ETLRunReportResponse.model_validate(
+            {name: getattr(run, name) for name in ETLRunReportResponse.model_fields if name != 'report'}
+            | {'report': (run.report or {}) if include_report else {}}
+        )
+        for run in runs
+    ]
+
+
+def _export_response(content, fmt: ExportFormat, name: str) -> StreamingResponse:
+    extension = 'ndjson' if fmt is ExportFormat.ndjson else 'csv'
+    return StreamingResponse(
+        content,
+        media_type=MEDIA_TYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{name}.{extension}"'},
+    )
+
+
+@app.get('/export/bundles', tags=['export'])
+async def export_bundles(
+    format: ExportFormat = ExportFormat.ndjson,
+    since: Optional[datetime] = Query(default=None, description='Only bundles verified at or after this date'),
+    include_raw_html: bool = False,
+):
+    """
+    Streams every bundle as NDJSON or CSV.
+
+    Rows are read through a server-side cursor and sent in batches, so memory
+    use stays constant regardless of the table size. ``raw_html`` is left out
+    unless explicitly requested.
+    """
+    statement = select(Bundle).order_by(Bundle.verification_date, Bundle.id)
+    if since is not None:
+        statement = statement.filter(Bundle.verification_date >= since)
+    exclude = set()
+    if not include_raw_html:
+        statement = statement.options(defer(Bundle.raw_html))
+        exclude.add('raw_html')
+    content = stream_export(get_async_session_factory(), statement, BundleResponse, format, exclude=exclude)
+    return _export_response(content, format, 'bundles')
+
+
+@app.get('/export/landing-page-raw-data', tags=['export'])
+async def export_landing_page_raw_data(
+    format: ExportFormat = ExportFormat.ndjson,
+    since: Optional[datetime] = Query(default=None, description='Only snapshots scraped at or after this date'),
+):
+    """Streams every landing-page snapshot as NDJSON or CSV (``json_data`` as JSON text in CSV)."""
+    statement = select(LandingPageRawData).order_by(LandingPageRawData.scraped_date, LandingPageRawData.id)
+    if since is not None:
+        statement = statement.filter(LandingPageRawData.scraped_date >= since)
+    content = stream_export(get_async_session_factory(), statement, LandingPageRawDataResponse, format)
+    return _export_response(content, format, 'landing-page-raw-data')
+
+
+def _serialize_raw_data(raw_data: LandingPageRawData) -> bytes:
+    return LandingPageRawDataResponse.model_validate(raw_data).model_dump_json().encode('utf-8')
+
+
+async def _load_raw_data_bytes(raw_data_id: str, db: AsyncSession) -> bytes | None:
+    """Returns the serialized snapshot from the cache, loading it once on a miss."""
+    async def loader() -> bytes | None:
+        result = await db.execute(
+            select(LandingPageRawData).filter(LandingPageRawData.id == raw_data_id)
+        )
+        raw_data = result.scalar_one_or_none()
+        return _serialize_raw_data(raw_data) if raw_data else None
+
+    return await raw_data_cache.get_or_load(raw_data_id, loader)
+
+
+@app.get('/landing-page-raw-data', response_model=list[LandingPageRawDataSummaryResponse], tags=['raw-data'])
+async def list_landing_page_raw_data(response: Response, db: AsyncSession = Depends(get_async_db)):
+    """
+    Lists raw data records (metadata only) ordered by descending date.
+
+    ``json_data`` is not included; use ``/landing-page-raw-data/{id}`` for a
+    full snapshot or ``/landing-page-raw-data/{id}/extract`` for a subtree.
+    """
+    response.headers[DATA_VERSION_HEADER] = str(await fetch_data_version(db))
     result = await db.execute(
-        select(LandingPageRawData).order_by(LandingPageRawData.scraped_date.desc())
+        select(
+            LandingPageRawData.id,
+            LandingPageRawData.scraped_date,
+            LandingPageRawData.source_url,
+            LandingPageRawData.json_hash,
+            LandingPageRawData.json_version,
+            func.length(cast(LandingPageRawData.json_data, LargeBinary)).label('size_bytes'),
+        ).order_by(LandingPageRawData.scraped_date.desc())
     )
-    raw_data_list = result.scalars().all()
-    return raw_data_list
+    return [LandingPageRawDataSummaryResponse.model_validate(row) for row in result.all()]
 
 
 @app.get('/landing-page-raw-data/latest', response_model=LandingPageRawDataResponse, tags=['raw-data'])
 async def get_latest_landing_page_raw_data(db: AsyncSession = Depends(get_async_db)):
     """Gets the most recent raw data record."""
     result = await db.execute(
-        select(LandingPageRawData).order_by(LandingPageRawData.scraped_date.desc()).limit(1)
+        select(LandingPageRawData.id).order_by(LandingPageRawData.scraped_date.desc()).limit(1)
     )
-    raw_data = result.scalar_one_or_none()
-    if not raw_data:
+    raw_data_id = result.scalar_one_or_none()
+    body = await _load_raw_data_bytes(raw_data_id, db) if raw_data_id else None
+    if body is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='No raw data stored')
-    return raw_data
+    # Mismo contenido que /{id}: el id del snapshot identifica el cuerpo
+    return Response(content=body, media_type='application/json', headers={DATA_VERSION_HEADER: raw_data_id})
 
 
 @app.get('/landing-page-raw-data/{raw_data_id}', response_model=LandingPageRawDataResponse, tags=['raw-data'])
 async def get_landing_page_raw_data(raw_data_id: str, db: AsyncSession = Depends(get_async_db)):
     """Gets a specific raw data record by its ID."""
+    body = await _load_raw_data_bytes(raw_data_id, db)
+    if body is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Raw data not found')
+    # Los snapshots son inmutables: su id basta como versión del cuerpo
+    return Response(content=body, media_type='application/json', headers={DATA_VERSION_HEADER: raw_data_id})
+
+
+@app.get('/landing-page-raw-data/{raw_data_id}/extract', tags=['raw-data'])
+async def extract_landing_page_raw_data(
+    raw_data_id: str,
+    path: str = Query(default='', description='Dotted path, e.g. data.books.mosaic[0].products[3]'),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Returns a subtree of a snapshot's ``json_data``.
+
+    The extraction runs server-side with SQLite ``json_extract``, so only the
+    selected value is read out of the stored document and sent to the client.
+    """
+    try:
+        json_path = to_sqlite_json_path(path)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+
     result = await db.execute(
-        select(LandingPageRawData).filter(LandingPageRawData.id == raw_data_id)
+        select(
+            func.json_type(LandingPageRawData.json_data, json_path),
+            func.json_extract(LandingPageRawData.json_data, json_path),
+        ).filter(LandingPageRawData.id == raw_data_id)
     )
-    raw_data = result.scalar_one_or_none()
-    if not raw_data:
+    row = result.one_or_none()
+    if row is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Raw data not found')
-    return raw_data
-
-
+    value_type, value = row
+    if value_type is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f'Path not found: {path}')
+
+    if value_type in ('object', 'array'):
+        # json_extract ya devuelve el subárbol como texto JSON
+        content = value.encode('utf-8')
+    elif value_type in ('true', 'false'):
+        content = value_type.encode('utf-8')
+    else:
+        content = json_codec.dumps_bytes(value)
+    return Response(content=content, media_type='application/json', headers={DATA_VERSION_HEADER: raw_data_id})
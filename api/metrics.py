@@ -0,0 +1,278 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+QUERY_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}')
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed buckets, rendered in Prometheus text format.
+
+    Observations only touch one bucket counter under a lock; cumulative
+    counts are computed when ``/metrics`` is scraped, not on the hot path.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [contadores por bucket (+Inf al final), suma]
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[labels] = series
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((labels, (list(counts), total[0])) for labels, (counts, total) in self._series.items())
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}')
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_text} {_format_number(total)}')
+            lines.append(f'{self.name}_count{label_text} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """Holds the API metrics and renders them for ``GET /metrics``."""
+
+    def __init__(self) -> None:
+        self.requests = Counter(
+            'http_requests_total', 'HTTP requests by route and status.', ('method', 'route', 'status'),
+        )
+        self.latency = Histogram(
+            'http_request_duration_seconds', 'HTTP request latency by route.', ('method', 'route'),
+        )
+        self.response_size = Histogram(
+            'http_response_size_bytes', 'HTTP response body size by route (after compression).',
+            ('method', 'route'), SIZE_BUCKETS,
+        )
+        self.db_queries = Histogram(
+            'http_request_db_queries', 'Database queries executed per HTTP request.',
+            ('method', 'route'), QUERY_COUNT_BUCKETS,
+        )
+        self.db_query_duration = Histogram(
+            'db_query_duration_seconds', 'Duration of individual database queries by route.',
+            ('route',), QUERY_LATENCY_BUCKETS,
+        )
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """Registers a callable that yields extra exposition lines at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in (self.requests, self.latency, self.response_size, self.db_queries, self.db_query_duration):
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+CACHE_METRICS = (
+    ('current_bytes', 'api_cache_bytes', 'gauge'),
+    ('entries', 'api_cache_entries', 'gauge'),
+    ('hits', 'api_cache_hits_total', 'counter'),
+    ('misses', 'api_cache_misses_total', 'counter'),
+    ('evictions', 'api_cache_evictions_total', 'counter'),
+)
+
+
+def cache_collector(caches: Dict[str, object]) -> Callable[[], List[str]]:
+    """Exposes the counters of named ``ByteLRUCache`` instances."""
+    def collect() -> List[str]:
+        stats = {name: cache.stats() for name, cache in caches.items()}
+        lines = []
+        for key, metric, kind in CACHE_METRICS:
+            lines.append(f'# TYPE {metric} {kind}')
+            for name, values in stats.items():
+                lines.append(f'{metric}{{cache="{_escape(name)}"}} {values[key]}')
+        return lines
+    return collect
+
+
+class RequestStats:
+    """Per-request database counters, filled by the SQLAlchemy event hooks."""
+
+    __slots__ = ('scope', 'db_queries', 'db_seconds')
+
+    def __init__(self, scope: Scope) -> None:
+        self.scope = scope
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar('api_request_stats', default=None)
+_hooks_installed = False
+
+
+def install_db_hooks(registry: MetricsRegistry) -> None:
+    """
+    Counts and times every cursor execution of every engine in the process.
+
+    The hooks are attached to the ``Engine`` class, so they cover the sync
+    engine and the sync core of the aiosqlite engine alike. Queries outside
+    a request (ETL threads) find no ``RequestStats`` and return immediately.
+    """
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    _hooks_installed = True
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _current_stats.get() is not None:
+            conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        starts = conn.info.get('query_start')
+        if stats is None or not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+        registry.db_query_duration.observe(elapsed, (_route_label(stats.scope),))
+
+
+def _route_label(scope: Scope) -> str:
+    # Plantilla de la ruta (/bundles/{bundle_id}), nunca la URL concreta
+    route = scope.get('route')
+    path = getattr(route, 'path', None)
+    if path:
+        return path
+    root = scope.get('root_path', '')
+    app_root = scope.get('app_root_path')
+    if app_root is not None and root != app_root:
+        return root[len(app_root):] or 'unmatched'
+    return 'unmatched'
+
+
+class MetricsMiddleware:
+    """
+    Records latency, response size and DB usage per route and adds ``Server-Timing``.
+
+    Must be the outermost middleware so response sizes are measured after
+    compression. The ``Server-Timing`` header carries the database time and
+    query count accumulated before the response headers were sent (for
+    buffered responses, the whole request) and the total application time.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    'Server-Timing',
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_queries} queries", '
+                    f'app;dur={elapsed_ms:.1f}',
+                )
+            elif message['type'] == 'http.response.body':
+                size += len(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            route = _route_label(scope)
+            labels = (scope['method'], route)
+            registry = self.registry
+            registry.requests.inc((scope['method'], route, str(status_code)))
+            registry.latency.observe(time.perf_counter() - start, labels)
+            registry.response_size.observe(size, labels)
+            registry.db_queries.observe(stats.db_queries, labels)
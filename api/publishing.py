@@ -0,0 +1,117 @@
+"""
+Database file the API reads from, for blue/green publishes (``DB_PUBLISH_DIR``).
+
+Without a publish directory the API reads ``DB_DB_PATH``. With one, it reads
+the immutable snapshot named by ``current.json`` (see
+``spider/database/publish.py``). The pointer is re-read at most every
+``DB_PUBLISH_CHECK_SECONDS``; when it moves, new read-only engines are opened
+on the new file and the next request uses them, while requests already
+running finish on the old one. Engines of the snapshot before the previous
+one are disposed.
+"""
+import asyncio
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from spider.config.settings import Settings
+from spider.database.publish import resolve_published_db
+from spider.database.session import (
+    get_async_read_session_factory,
+    get_read_session_factory,
+    release_read_engines,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PublishedDatabase:
+    """Resolves the published snapshot and hands out read-only session factories for it."""
+
+    def __init__(self, settings: Settings) -> None:
+        self.base = settings
+        self.publish_dir = settings.publish_dir
+        self.check_interval = settings.publish_check_seconds
+        # Settings whose db_path the API reads; path is None while reading db_path itself
+        self.current = settings
+        self.path: Optional[Path] = None
+        self.swaps = 0
+        self._previous: Optional[Settings] = None
+        self._async_factory = None
+        self._sync_factory = None
+        self._checked_at: Optional[float] = None
+        self._warned = False
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.publish_dir)
+
+    def async_session_factory(self):
+        """Async read-only session factory of the current file."""
+        self._check()
+        factory = self._async_factory
+        if factory is None:
+            factory = self._async_factory = get_async_read_session_factory(self.current, check_schema=self.path is None)
+        return factory
+
+    def session_factory(self):
+        """Sync read-only session factory of the current file."""
+        self._check()
+        factory = self._sync_factory
+        if factory is None:
+            factory = self._sync_factory = get_read_session_factory(self.current, check_schema=self.path is None)
+        return factory
+
+    def stats(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'path': str(self.path) if self.path else None,
+            'swaps': self.swaps,
+        }
+
+    def _check(self) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            path = resolve_published_db(self.publish_dir)
+            if path is None:
+                if not self._warned:
+                    logger.warning('Nothing published in %s; reading %s', self.publish_dir, self.current.db_path)
+                    self._warned = True
+                return
+            if path != self.path:
+                self._swap(path)
+
+    def _swap(self, path: Path) -> None:
+        retired, self._previous = self._previous, self.current
+        self.current = self.base.model_copy(update={'db_path': str(path)})
+        self.path = path
+        self._async_factory = None
+        self._sync_factory = None
+        self.swaps += 1
+        logger.info('Reading published snapshot %s', path)
+        # The previous snapshot may still have requests in flight; the one before it is closed
+        if retired is not None and retired.db_path != self.current.db_path and retired is not self.base:
+            _dispose(release_read_engines(retired))
+
+
+def _dispose(engines) -> None:
+    for engine in engines:
+        sync_engine = getattr(engine, 'sync_engine', None)
+        if sync_engine is None:
+            engine.dispose()
+            continue
+        try:
+            asyncio.get_running_loop().create_task(engine.dispose())
+        except RuntimeError:
+            # Outside the event loop (e.g. the read model thread): close the idle pool directly
+            sync_engine.dispose()
@@ -0,0 +1,190 @@
+"""
+Optional in-memory read model of the bundles table (``DB_READ_MODEL_ENABLED``).
+
+The API keeps an immutable snapshot of every bundle, already serialized
+without ``raw_html``, indexed by id and machine_name, ordered by end date and
+with the featured bundle and the rankings resolved. A background task polls
+the data version and builds a new snapshot in a worker thread when it
+changes; the new snapshot replaces the old one with a single reference
+assignment, so a request sees either the old or the new snapshot, never a
+mix. Serving from the snapshot touches no database.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import nulls_last, select
+from sqlalchemy.orm import Session
+
+from api.documents import join_documents, ranking_body
+from api.images import ImageMap
+from api.schemas import BundleResponse, BundleSummaryResponse
+from spider.database.models import Bundle, BundleRanking
+from spider.database.persistence import get_data_version
+
+logger = logging.getLogger(__name__)
+
+# raw_html is hundreds of KB per bundle; read-model responses omit it (null)
+COLUMNS = [
+    getattr(Bundle, name) for name in BundleResponse.model_fields
+    if name != 'raw_html' and hasattr(Bundle, name)
+]
+
+
+class BundleEntry:
+    """One bundle of the snapshot: lookup keys plus its serialized bodies."""
+
+    __slots__ = ('id', 'machine_name', 'end_date', 'body', 'summary')
+
+    def __init__(self, id: str, machine_name: str, end_date: Optional[datetime], body: bytes, summary: bytes) -> None:
+        self.id = id
+        self.machine_name = machine_name
+        self.end_date = end_date
+        self.body = body
+        self.summary = summary
+
+
+class ReadModel:
+    """Immutable snapshot of the bundles of one data version."""
+
+    __slots__ = ('data_version', 'built_at', 'by_id', 'by_machine_name', 'by_end_date', 'featured', 'list_body', 'rankings')
+
+    def __init__(
+        self,
+        data_version: int,
+        entries: List[BundleEntry],
+        featured_id: Optional[str],
+        rankings: Dict[str, bytes],
+    ) -> None:
+        self.data_version = data_version
+        self.built_at = datetime.utcnow()
+        self.by_id: Dict[str, BundleEntry] = {entry.id: entry for entry in entries}
+        self.by_machine_name: Dict[str, BundleEntry] = {entry.machine_name: entry for entry in entries}
+        # Same order as ORDER BY end_date_datetime DESC in SQLite (NULLs last)
+        self.by_end_date: Tuple[BundleEntry, ...] = tuple(sorted(
+            entries, key=lambda entry: (entry.end_date is not None, entry.end_date or datetime.min), reverse=True,
+        ))
+        self.featured: Optional[BundleEntry] = self.by_id.get(featured_id) if featured_id else None
+        self.list_body = join_documents([entry.body for entry in self.by_end_date])
+        self.rankings = rankings
+
+    def stats(self) -> Dict:
+        return {
+            'data_version': self.data_version,
+            'built_at': self.built_at.isoformat(),
+            'bundles': len(self.by_id),
+            'bytes': len(self.list_body) + sum(len(entry.summary) for entry in self.by_id.values()),
+        }
+
+
+def _featured_id(session: Session) -> Optional[str]:
+    """Same selection as ``GET /bundles/featured``: materialized ranking, then MSRP/sales."""
+    featured = session.execute(
+        select(BundleRanking.bundle_id).filter(BundleRanking.kind == 'featured', BundleRanking.position == 1)
+    ).scalar_one_or_none()
+    if featured is not None:
+        return featured
+    return session.execute(
+        select(Bundle.id).order_by(
+            nulls_last(Bundle.msrp_total.desc()),
+            nulls_last(Bundle.bundles_sold_decimal.desc()),
+        ).limit(1)
+    ).scalar_one_or_none()
+
+
+def _render(session: Session, version: int) -> ReadModel:
+    images = ImageMap.load(session, version)
+    entries = []
+    # Loaded in the list endpoint's order, so the stable sort keeps SQLite's order for ties
+    for row in session.execute(select(*COLUMNS).order_by(Bundle.end_date_datetime.desc())):
+        entries.append(BundleEntry(
+            row.id,
+            row.machine_name,
+            row.end_date_datetime,
+            images.localize(BundleResponse.model_validate(row)).model_dump_json().encode('utf-8'),
+            images.localize(BundleSummaryResponse.model_validate(row)).model_dump_json().encode('utf-8'),
+        ))
+    by_id = {entry.id: entry for entry in entries}
+
+    ranking_rows: Dict[str, List] = {}
+    for row in session.execute(select(BundleRanking).order_by(BundleRanking.kind, BundleRanking.position)).scalars():
+        ranking_rows.setdefault(row.kind, []).append(row)
+    rankings = {}
+    for kind, rows in ranking_rows.items():
+        if all(row.bundle_id in by_id for row in rows):
+            rankings[kind] = ranking_body(
+                kind, rows[0].computed_at, [(row.position, row.score, by_id[row.bundle_id].summary) for row in rows],
+            )
+    return ReadModel(version, entries, _featured_id(session), rankings)
+
+
+def build_read_model(session: Session, attempts: int = 3) -> ReadModel:
+    """
+    Loads a snapshot of the current data version.
+
+    The data version is read before and after loading; if an ETL committed
+    in between, the snapshot is loaded again so its rows match its version.
+    """
+    for attempt in range(attempts):
+        version = get_data_version(session)
+        model = _render(session, version)
+        session.rollback()
+        if get_data_version(session) == version or attempt == attempts - 1:
+            return model
+    return model
+
+
+class ReadModelRefresher:
+    """
+    Holds the current snapshot and swaps it when the data version changes.
+
+    ``current`` is None until the first build finishes; endpoints then use
+    the database as usual.
+    """
+
+    def __init__(self, session_factory, interval: float = 2.0) -> None:
+        self.session_factory = session_factory
+        self.interval = interval
+        self.current: Optional[ReadModel] = None
+        self.builds = 0
+        self.last_build_seconds: Optional[float] = None
+
+    def build(self) -> ReadModel:
+        """Builds a new snapshot (blocking) and publishes it."""
+        started = time.perf_counter()
+        with self.session_factory() as session:
+            model = build_read_model(session)
+        self.current = model
+        self.builds += 1
+        self.last_build_seconds = time.perf_counter() - started
+        logger.info('Read model v%s: %s bundles in %.3fs', model.data_version, len(model.by_id), self.last_build_seconds)
+        return model
+
+    async def run(self, fetch_version: Callable) -> None:
+        """
+        Polls the data version every ``interval`` seconds and rebuilds on change.
+
+        Args:
+            fetch_version: Coroutine function returning the current data version.
+        """
+        while True:
+            try:
+                current = self.current
+                if current is None or await fetch_version() != current.data_version:
+                    await asyncio.to_thread(self.build)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Se conserva el snapshot anterior; se reintenta en el siguiente ciclo
+                logger.exception('Could not refresh the read model')
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict:
+        return {
+            'enabled': True,
+            'builds': self.builds,
+            'last_build_seconds': round(self.last_build_seconds, 4) if self.last_build_seconds is not None else None,
+            **(self.current.stats() if self.current is not None else {}),
+        }
@@ -0,0 +1,18 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from spider.utils import json_codec
+
+
+class CodecJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with the shared JSON codec (orjson/msgspec when
+    installed, stdlib otherwise).
+
+    The output matches Starlette's compact JSONResponse: no whitespace and
+    non-ASCII characters left unescaped.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json_codec.dumps_bytes(content)
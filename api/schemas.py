@@ -3,33 +3,151 @@ from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+# Shared with the ETL, which renders the stored bundle documents with them
+from spider.schemas.responses import BundleResponse, BundleSummaryResponse
 
-class BundleResponse(BaseModel):
+
+class BundleTombstoneResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
-    id: str
+    bundle_id: str
     machine_name: str
-    tile_name: Optional[str] = None
-    tile_short_name: Optional[str] = None
-    tile_stamp: Optional[str] = None
-    category: Optional[str] = None
-    product_url: Optional[str] = None
-    start_date_datetime: Optional[datetime] = None
-    end_date_datetime: Optional[datetime] = None
-    duration_days: Optional[float] = None
-    is_active: Optional[bool] = None
-    price_tiers: Optional[List[Dict[str, Any]]] = None
-    book_list: Optional[List[Dict[str, Any]]] = None
-    featured_image: Optional[str] = None
-    tile_logo: Optional[str] = None
+    version: int
+    reason: str
+    deleted_at: datetime
+
+
+class BundleChangesResponse(BaseModel):
+    since: int
+    next_version: int
+    changes: List[BundleResponse]
+    deleted: List[BundleTombstoneResponse]
+
+
+class BundleRankingEntryResponse(BaseModel):
+    position: int
+    score: Optional[float] = None
+    bundle: BundleSummaryResponse
+
+
+class BundleRankingResponse(BaseModel):
+    kind: str
+    computed_at: Optional[datetime] = None
+    entries: List[BundleRankingEntryResponse]
+
+
+class TierAnalyticsResponse(BaseModel):
+    identifier: str
+    price: Optional[float] = None
+    books: int
+    msrp: Optional[float] = None
+    msrp_to_price: Optional[float] = None
+    marginal_books: int
+    marginal_msrp: Optional[float] = None
+    marginal_price: Optional[float] = None
+    marginal_value_per_dollar: Optional[float] = None
+
+
+class PurchasePriceTrendPoint(BaseModel):
+    month: str
+    mean_average_purchase_price: Optional[float] = None
+    bundles: int
+
+
+class PurchasePriceAnalyticsResponse(BaseModel):
+    average_purchase_price: Optional[float] = None
+    percentile: Optional[float] = None
+    month_mean: Optional[float] = None
+    vs_month_mean: Optional[float] = None
+    trend: List[PurchasePriceTrendPoint] = Field(default_factory=list)
+
+
+class SharedBooksEntry(BaseModel):
+    bundle_id: str
+    books: int
+
+
+class DuplicateBooksResponse(BaseModel):
+    books: int
+    duplicate_books: int
+    duplicate_msrp: Optional[float] = None
+    unique_msrp: Optional[float] = None
+    unique_msrp_to_max_price: Optional[float] = None
+    shared_with: List[SharedBooksEntry] = Field(default_factory=list)
+
+
+class BundleAnalyticsResponse(BaseModel):
+    bundle_id: str
+    data_version: int
     msrp_total: Optional[float] = None
-    raw_html: Optional[str] = None
-    verification_date: datetime
+    msrp_estimated: bool
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    msrp_to_min_price: Optional[float] = None
+    msrp_to_max_price: Optional[float] = None
+    tiers: List[TierAnalyticsResponse]
+    purchase_price: PurchasePriceAnalyticsResponse
+    duplicates: DuplicateBooksResponse
+
+
+class SimilarBundleEntry(BaseModel):
+    machine_name: str
+    bundle_id: Optional[str] = None
+    tile_name: Optional[str] = None
+    jaccard: float
+
+
+class SimilarBundlesResponse(BaseModel):
+    bundle_id: str
+    machine_name: str
+    data_version: int
+    candidates: int
+    lookup_ms: float
+    entries: List[SimilarBundleEntry]
 
 
 class ETLRunResponse(BaseModel):
-    bundles_processed: int
-    cleanup_ran: bool
+    job_id: str
+    status: str
+    joined: bool
+
+
+class ETLJobResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    status: str
+    stage: Optional[str] = None
+    stages: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
+    bundles_total: Optional[int] = None
+    bundles_done: Optional[int] = None
+    current_bundle: Optional[str] = None
+    bundles_processed: Optional[int] = None
+    error: Optional[str] = None
+    owner: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    updated_at: datetime
+
+
+class ETLRunReportResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    job_id: Optional[str] = None
+    status: str
+    error: Optional[str] = None
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    wall_seconds: Optional[float] = None
+    cpu_seconds: Optional[float] = None
+    bundles_processed: Optional[int] = None
+    bundles_discarded: Optional[int] = None
+    requests: Optional[int] = None
+    bytes_downloaded: Optional[int] = None
+    peak_memory_bytes: Optional[int] = None
+    report: Dict[str, Any] = Field(default_factory=dict)
 
 
 class LandingPageRawDataResponse(BaseModel):
@@ -43,4 +161,12 @@ class LandingPageRawDataResponse(BaseModel):
     json_version: Optional[str] = None
 
 
+class LandingPageRawDataSummaryResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
 
+    id: str
+    scraped_date: datetime
+    source_url: str
+    json_hash: Optional[str] = None
+    json_version: Optional[str] = None
+    size_bytes: Optional[int] = None
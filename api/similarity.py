@@ -0,0 +1,108 @@
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from spider.database.similarity import compute_bundle_signature
+from spider.utils.minhash import LSH_BANDS, LSH_ROWS, NUM_PERM
+
+# Multiplicador impar de 64 bits para combinar las filas de una banda
+_BAND_MIX = np.uint64(0x9E3779B97F4A7C15)
+_BAND_SHIFT = np.uint64(59)
+
+
+class SimilarityIndex:
+    """
+    In-memory MinHash/LSH index over the book sets of every known bundle.
+
+    Signatures come from ``bundle_signature`` (one row per machine_name,
+    including bundles that already expired); stored bundles without a row
+    yet are signed on the fly. Each signature is split into ``LSH_BANDS``
+    bands hashed to 64-bit keys kept in one sorted array, so a lookup is a
+    single vectorized ``searchsorted`` plus a comparison of the candidate
+    signatures: well under a millisecond regardless of history size.
+
+    Instances are immutable and describe one data version.
+    """
+
+    def __init__(self, rows: Tuple[Sequence[Any], Sequence[Any]], data_version: int = 0) -> None:
+        signature_rows, unsigned_rows = rows
+        self.data_version = data_version
+        self.machine_names: List[str] = []
+        self.bundle_ids: List[Optional[str]] = []
+        self.tile_names: List[Optional[str]] = []
+        blobs: List[bytes] = []
+        for row in signature_rows:
+            self._add(row.machine_name, row.bundle_id, row.tile_name)
+            blobs.append(row.signature)
+        for row in unsigned_rows:
+            computed = compute_bundle_signature(row.book_list)
+            if computed is not None:
+                self._add(row.machine_name, row.bundle_id, row.tile_name)
+                blobs.append(computed[0])
+
+        self.signatures = np.frombuffer(b''.join(blobs), dtype='<u4').reshape(-1, NUM_PERM)
+        self._by_bundle = {bundle_id: position for position, bundle_id in enumerate(self.bundle_ids) if bundle_id}
+
+        bands = self.signatures.reshape(-1, LSH_BANDS, LSH_ROWS).astype(np.uint64)
+        keys = bands[:, :, 0]
+        for row in range(1, LSH_ROWS):
+            keys = keys * _BAND_MIX ^ bands[:, :, row]
+        # Clave compuesta (banda en los 5 bits altos, 59 bits de la clave):
+        # un único array ordenado sirve todas las bandas con un searchsorted
+        band_ids = np.arange(LSH_BANDS, dtype=np.uint64) << _BAND_SHIFT
+        self._keys = (keys >> np.uint64(64 - _BAND_SHIFT)) | band_ids
+        flat = self._keys.ravel()
+        self._order = np.argsort(flat, kind='stable')
+        self._sorted = flat[self._order]
+
+    def _add(self, machine_name: str, bundle_id: Optional[str], tile_name: Optional[str]) -> None:
+        self.machine_names.append(machine_name)
+        self.bundle_ids.append(bundle_id)
+        self.tile_names.append(tile_name)
+
+    def __len__(self) -> int:
+        return len(self.machine_names)
+
+    def __contains__(self, bundle_id: str) -> bool:
+        return bundle_id in self._by_bundle
+
+    def similar(self, bundle_id: str, limit: int = 10, min_score: float = 0.0) -> Optional[Dict[str, Any]]:
+        """
+        Bundles whose book sets overlap with ``bundle_id``, best first.
+
+        Returns None when the bundle is unknown or has no books. Scores are
+        MinHash estimates of the Jaccard index of the book sets (standard
+        error ~0.09); pairs below ~0.3 are rarely LSH candidates.
+        """
+        position = self._by_bundle.get(bundle_id)
+        if position is None:
+            return None
+        started = time.perf_counter()
+        keys = self._keys[position]
+        starts = np.searchsorted(self._sorted, keys, side='left')
+        ends = np.searchsorted(self._sorted, keys, side='right')
+        matches = np.concatenate([self._order[start:end] for start, end in zip(starts.tolist(), ends.tolist())])
+        candidates = np.unique(matches // LSH_BANDS)
+        candidates = candidates[candidates != position]
+        scores = (self.signatures[candidates] == self.signatures[position]).mean(axis=1)
+        keep = scores >= min_score
+        candidates, scores = candidates[keep], scores[keep]
+        best = np.argsort(-scores, kind='stable')[:limit]
+        entries = [
+            {
+                'machine_name': self.machine_names[candidates[index]],
+                'bundle_id': self.bundle_ids[candidates[index]],
+                'tile_name': self.tile_names[candidates[index]],
+                'jaccard': round(float(scores[index]), 3),
+            }
+            for index in best
+        ]
+        return {
+            'bundle_id': bundle_id,
+            'machine_name': self.machine_names[position],
+            'data_version': self.data_version,
+            'candidates': int(candidates.size),
+            'lookup_ms': round((time.perf_counter() - started) * 1000, 3),
+            'entries': entries,
+        }
@@ -0,0 +1,276 @@
+"""
+Static snapshot of the read-only bundle endpoints, for CDN/static hosting.
+
+Renders ``/bundles``, ``/bundles/{id}``, ``/bundles/by-machine-name/{name}``
+and ``/bundles/featured`` into JSON files with precompressed ``.gz`` (and
+``.br`` when brotli is installed) siblings:
+
+    <output>/
+      current -> v<data_version>      symlink to the latest snapshot
+      current.json                    {"data_version": ..., "path": "v<data_version>"}
+      v<data_version>/
+        manifest.json
+        bundles.json
+        bundles/featured.json
+        bundles/<id>.json
+        bundles/by-machine-name/<machine_name>.json
+
+A snapshot is rendered into a hidden temporary directory and renamed into
+place, then the pointers are swapped atomically, so a static host never
+serves a half-written version. Usage::
+
+    python -m api.static_export --output dist/api
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import quote
+
+from sqlalchemy import nulls_last, select
+from sqlalchemy.orm import Session
+
+from api.images import ImageMap
+from api.schemas import BundleResponse
+from spider.config.settings import Settings, get_settings
+from spider.database.models import Bundle, BundleRanking
+from spider.database.persistence import get_data_version
+from spider.database.session import get_read_session_factory
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+POINTER_NAME = 'current.json'
+CURRENT_LINK = 'current'
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+
+class SnapshotWriter:
+    """Writes files under a snapshot directory and records them for the manifest."""
+
+    def __init__(self, root: Path, min_compress_size: int) -> None:
+        self.root = root
+        self.min_compress_size = min_compress_size
+        self.files: Dict[str, Dict[str, Any]] = {}
+
+    def write(self, relative: str, body: bytes) -> None:
+        target = self.root / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(body)
+        entry: Dict[str, Any] = {'bytes': len(body), 'sha256': hashlib.sha256(body).hexdigest()}
+        if len(body) >= self.min_compress_size:
+            encodings = {'gzip': gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)}
+            if brotli is not None:
+                encodings['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+            suffixes = {'gzip': '.gz', 'br': '.br'}
+            for name, compressed in encodings.items():
+                target.with_name(target.name + suffixes[name]).write_bytes(compressed)
+            entry['encodings'] = {name: len(compressed) for name, compressed in encodings.items()}
+        self.files[relative] = entry
+
+
+def _featured_bundle(session: Session) -> Optional[Bundle]:
+    """Same selection as ``GET /bundles/featured``: materialized ranking, then MSRP/sales."""
+    bundle = session.execute(
+        select(Bundle)
+        .join(BundleRanking, BundleRanking.bundle_id == Bundle.id)
+        .filter(BundleRanking.kind == 'featured', BundleRanking.position == 1)
+    ).scalar_one_or_none()
+    if bundle is not None:
+        return bundle
+    return session.execute(
+        select(Bundle).order_by(
+            nulls_last(Bundle.msrp_total.desc()),
+            nulls_last(Bundle.bundles_sold_decimal.desc()),
+        ).limit(1)
+    ).scalar_one_or_none()
+
+
+def render_snapshot(session: Session, root: Path, min_compress_size: int = 1024) -> Dict[str, Any]:
+    """
+    Renders every exported endpoint of the current data version under ``root``.
+
+    Each bundle is serialized once; the same bytes back its detail files
+    and its entry in ``bundles.json``. The data version is read before and
+    after rendering: if an ETL committed meanwhile, ``manifest['consistent']``
+    is False and the caller should render again.
+
+    Returns:
+        The manifest (also written to ``root/manifest.json``).
+    """
+    writer = SnapshotWriter(root, min_compress_size)
+    version = get_data_version(session)
+    images = ImageMap.load(session)
+
+    bodies = []
+    result = session.execute(
+        select(Bundle).order_by(Bundle.end_date_datetime.desc()).execution_options(yield_per=200)
+    )
+    for bundle in result.scalars():
+        body = images.localize(BundleResponse.model_validate(bundle)).model_dump_json().encode('utf-8')
+        bodies.append(body)
+        writer.write(f'bundles/{bundle.id}.json', body)
+        writer.write(f'bundles/by-machine-name/{quote(bundle.machine_name, safe="")}.json', body)
+        session.expunge(bundle)
+    writer.write('bundles.json', b'[' + b','.join(bodies) + b']')
+    del bodies
+
+    featured = _featured_bundle(session)
+    if featured is not None:
+        writer.write(
+            'bundles/featured.json',
+            images.localize(BundleResponse.model_validate(featured)).model_dump_json().encode('utf-8'),
+        )
+
+    consistent = get_data_version(session) == version
+    session.rollback()
+    manifest = {
+        'data_version': version,
+        'generated_at': datetime.utcnow().isoformat(),
+        'consistent': consistent,
+        'featured': featured is not None,
+        'files': writer.files,
+    }
+    (root / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding='utf-8')
+    return manifest
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    fd, temporary = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+        handle.write(content)
+    os.chmod(temporary, 0o644)
+    os.replace(temporary, path)
+
+
+def _point_current(output: Path, version_dir: str, version: int) -> None:
+    """Swaps the ``current`` symlink and ``current.json`` to ``version_dir``."""
+    _write_atomic(output / POINTER_NAME, json.dumps({'data_version': version, 'path': version_dir}))
+    link = output / CURRENT_LINK
+    temporary = output / f'.{CURRENT_LINK}-{os.getpid()}'
+    try:
+        temporary.unlink(missing_ok=True)
+        temporary.symlink_to(version_dir, target_is_directory=True)
+        os.replace(temporary, link)
+    except OSError as exc:
+        # Sin symlinks (p. ej. algunos FS en Windows) queda current.json
+        temporary.unlink(missing_ok=True)
+        logger.warning('Could not update the %s symlink: %s', CURRENT_LINK, exc)
+
+
+def _prune(output: Path, keep: int, current: str) -> None:
+    """Deletes old snapshots, keeping the newest ``keep`` (never ``current``)."""
+    versions = sorted(
+        (path for path in output.glob('v*') if path.is_dir() and path.name[1:].isdigit()),
+        key=lambda path: int(path.name[1:]),
+        reverse=True,
+    )
+    for path in versions[max(keep, 1):]:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _render_consistent(session: Session, output: Path, min_compress_size: int, attempts: int = 3) -> Dict[str, Any]:
+    """Renders into a staging directory until no ETL commits during the render."""
+    for attempt in range(attempts):
+        staging = Path(tempfile.mkdtemp(dir=output, prefix='.staging-'))
+        # mkdtemp crea el directorio con 0700; el servidor estático debe poder leerlo
+        staging.chmod(0o755)
+        try:
+            manifest = render_snapshot(session, staging, min_compress_size)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        if manifest['consistent'] or attempt == attempts - 1:
+            if not manifest['consistent']:
+                logger.warning('Data changed while exporting v%s; publishing it anyway', manifest['data_version'])
+            manifest['staging'] = staging
+            return manifest
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _publish(staging: Path, target: Path) -> None:
+    """Moves a rendered snapshot into place, replacing a previous render of the same version."""
+    if target.exists():
+        retired = target.with_name(f'.retired-{target.name}-{os.getpid()}')
+        os.rename(target, retired)
+        os.rename(staging, target)
+        shutil.rmtree(retired, ignore_errors=True)
+    else:
+        os.rename(staging, target)
+
+
+def export_static_snapshot(
+    output_dir: str,
+    settings: Optional[Settings] = None,
+    force: bool = False,
+    keep: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Exports the current data version under ``output_dir`` and points ``current`` at it.
+
+    A version that was already exported is reused unless ``force`` is set.
+    Only the newest ``keep`` versions are kept (``DB_STATIC_EXPORT_KEEP``).
+
+    Returns:
+        Summary with ``data_version``, ``path``, ``files``, ``bytes`` and ``skipped``.
+    """
+    settings = settings or get_settings()
+    keep = settings.static_export_keep if keep is None else keep
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+
+    with get_read_session_factory(settings)() as session:
+        version = get_data_version(session)
+        target = output / f'v{version}'
+        skipped = target.exists() and not force
+        if skipped:
+            manifest = json.loads((target / MANIFEST_NAME).read_text(encoding='utf-8'))
+        else:
+            manifest = _render_consistent(session, output, settings.compression_min_size)
+            target = output / f'v{manifest["data_version"]}'
+            _publish(manifest['staging'], target)
+            del manifest['staging']
+    version_dir = target.name
+
+    _point_current(output, version_dir, manifest['data_version'])
+    _prune(output, keep, version_dir)
+    return {
+        'data_version': manifest['data_version'],
+        'path': str(target),
+        'files': len(manifest['files']),
+        'bytes': sum(entry['bytes'] for entry in manifest['files'].values()),
+        'skipped': skipped,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Exports the bundle endpoints as precompressed static JSON.')
+    parser.add_argument('--output', help='Output directory (default: DB_STATIC_EXPORT_DIR)')
+    parser.add_argument('--force', action='store_true', help='Re-render a version that was already exported')
+    parser.add_argument('--keep', type=int, help='Snapshots to keep (default: DB_STATIC_EXPORT_KEEP)')
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    output = args.output or settings.static_export_dir
+    if not output:
+        parser.error('--output or DB_STATIC_EXPORT_DIR is required')
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(export_static_snapshot(output, settings, force=args.force, keep=args.keep), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,14 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from spider.database.models import DataVersion
+
+# Header used by read endpoints to tag responses with the data version they
+# were rendered from; version-keyed caches (e.g. compression) rely on it.
+DATA_VERSION_HEADER = 'X-Data-Version'
+
+
+async def fetch_data_version(db: AsyncSession) -> int:
+    """Returns the current published data version (0 if nothing was persisted yet)."""
+    result = await db.execute(select(DataVersion.version).where(DataVersion.id == 1))
+    return result.scalar_one_or_none() or 0
@@ -0,0 +1 @@
+"""Benchmarks reproducibles del API y del ETL."""
@@ -0,0 +1,383 @@
+"""
+Prueba de carga de la API sobre HTTP real.
+
+Siembra una base de datos temporal con ``--bundles`` bundles sintéticos
+(benchmarks.fixtures.seed_database), levanta ``uvicorn api.main:app`` en un
+subproceso con ``--workers`` procesos y lanza una mezcla configurable de
+peticiones con ``--concurrency`` conexiones keep-alive:
+
+    - list: ``GET /bundles``
+    - detail: ``GET /bundles/{id}``
+    - machine_name: ``GET /bundles/by-machine-name/{machine_name}``
+    - featured: ``GET /bundles/featured``
+    - raw_data: ``GET /landing-page-raw-data/latest``
+
+Con ``--rate`` las peticiones siguen un calendario fijo (lazo abierto) y la
+latencia se mide desde el instante programado, no desde el envío, para no
+ocultar las colas cuando el servidor se satura (coordinated omission). Sin
+``--rate`` cada conexión envía la siguiente petición al recibir la anterior.
+
+El informe (JSON) da por endpoint peticiones, throughput, tasa de error y
+latencias p50/p95/p99/max. El generador corre en el mismo intérprete con
+hilos: si su CPU se satura antes que el servidor, repartir la carga en
+varios procesos o máquinas (``--url`` apunta a un servidor ya levantado).
+
+Uso:
+    python -m benchmarks.api_load --bundles 5000 --workers 2 --concurrency 32 --duration 30
+    python -m benchmarks.api_load --rate 200 --mix list=1,detail=60,featured=39
+    python -m benchmarks.api_load --url http://127.0.0.1:5002 --duration 60
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .fixtures import load_corpus, seed_database
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+ENDPOINTS = ('list', 'detail', 'machine_name', 'featured', 'raw_data')
+DEFAULT_MIX = 'list=2,detail=45,machine_name=25,featured=20,raw_data=8'
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Convierte ``'list=1,detail=5'`` en pesos por endpoint."""
+    mix: Dict[str, float] = {}
+    for part in text.split(','):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f'Endpoint desconocido en --mix: {name} (disponibles: {", ".join(ENDPOINTS)})')
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError('--mix necesita al menos un endpoint con peso > 0')
+    return mix
+
+
+class Targets:
+    """Ids y machine_names reales del servidor para las peticiones de detalle."""
+
+    def __init__(self, bundles: List[Dict]) -> None:
+        self.ids = [bundle['id'] for bundle in bundles]
+        self.machine_names = [bundle['machine_name'] for bundle in bundles]
+
+    def path(self, endpoint: str, rng: random.Random) -> str:
+        if endpoint == 'list':
+            return '/bundles'
+        if endpoint == 'detail':
+            return f'/bundles/{rng.choice(self.ids)}'
+        if endpoint == 'machine_name':
+            return f'/bundles/by-machine-name/{urllib.parse.quote(rng.choice(self.machine_names))}'
+        if endpoint == 'featured':
+            return '/bundles/featured'
+        return '/landing-page-raw-data/latest'
+
+
+class Recorder:
+    """Latencias y errores por endpoint, compartidos entre los hilos."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {name: [] for name in ENDPOINTS}
+        self.errors: Dict[str, Dict[str, int]] = {name: {} for name in ENDPOINTS}
+        self.bytes_received = 0
+
+    def record(self, endpoint: str, seconds: float, error: Optional[str], size: int) -> None:
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            self.bytes_received += size
+            if error:
+                errors = self.errors[endpoint]
+                errors[error] = errors.get(error, 0) + 1
+
+
+class Schedule:
+    """Calendario de lazo abierto: la petición n sale en ``start + n / rate``."""
+
+    def __init__(self, rate: float, start: float) -> None:
+        self.rate = rate
+        self.start = start
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def next_slot(self) -> float:
+        with self._lock:
+            slot = self.start + self._next / self.rate
+            self._next += 1
+        return slot
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'max_ms': None, 'mean_ms': None}
+    ordered = sorted(values)
+    if len(ordered) > 1:
+        cuts = statistics.quantiles(ordered, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ordered[0]
+    return {
+        'p50_ms': round(p50 * 1000, 2),
+        'p95_ms': round(p95 * 1000, 2),
+        'p99_ms': round(p99 * 1000, 2),
+        'max_ms': round(ordered[-1] * 1000, 2),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 2),
+    }
+
+
+def _request(connection: http.client.HTTPConnection, path: str, headers: Dict[str, str]) -> Tuple[int, int]:
+    connection.request('GET', path, headers=headers)
+    response = connection.getresponse()
+    body = response.read()
+    return response.status, len(body)
+
+
+def run_load(
+    base_url: str,
+    mix: Dict[str, float],
+    concurrency: int,
+    duration: float,
+    warmup: float = 2.0,
+    rate: Optional[float] = None,
+    accept_encoding: str = 'gzip',
+    timeout: float = 30.0,
+    seed: int = 42,
+) -> Dict:
+    """
+    Lanza la carga contra ``base_url`` y devuelve el informe por endpoint.
+
+    Args:
+        base_url: URL del servidor (``http://host:puerto``).
+        mix: Pesos por endpoint (ver parse_mix()).
+        concurrency: Conexiones keep-alive simultáneas (una por hilo).
+        duration: Segundos medidos, sin contar el calentamiento.
+        warmup: Segundos iniciales cuyas peticiones no se cuentan.
+        rate: Peticiones/s objetivo en total; None para lazo cerrado.
+        accept_encoding: Valor de Accept-Encoding ('' para no comprimir).
+        timeout: Timeout por petición en segundos.
+        seed: Semilla de la elección de endpoints e ids.
+
+    Returns:
+        Diccionario con la configuración, los totales y el detalle por endpoint.
+    """
+    parsed = urllib.parse.urlsplit(base_url)
+    host, port = parsed.hostname, parsed.port or 80
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+
+    connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    connection.request('GET', '/bundles')
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    if response.status != 200:
+        raise RuntimeError(f'GET /bundles devolvió {response.status}')
+    bundles = json.loads(body)
+    if not bundles:
+        raise RuntimeError('El servidor no tiene bundles que consultar')
+    targets = Targets(bundles)
+
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    recorder = Recorder()
+    start = time.perf_counter() + 0.1
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+    schedule = Schedule(rate, start) if rate else None
+
+    def worker(index: int) -> None:
+        rng = random.Random(seed + index)
+        connection = http.client.HTTPConnection(host, port, timeout=timeout)
+        while True:
+            if schedule:
+                slot = schedule.next_slot()
+                if slot >= stop_at:
+                    break
+                delay = slot - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                slot = time.perf_counter()
+                if slot >= stop_at:
+                    break
+            endpoint = rng.choices(names, weights)[0]
+            path = targets.path(endpoint, rng)
+            error = None
+            size = 0
+            try:
+                status, size = _request(connection, path, headers)
+                if status >= 400:
+                    error = str(status)
+            except (OSError, http.client.HTTPException) as exc:
+                error = type(exc).__name__
+                connection.close()
+                connection = http.client.HTTPConnection(host, port, timeout=timeout)
+            # Con calendario, la latencia incluye la espera en cola del cliente
+            elapsed = time.perf_counter() - slot
+            if slot >= measure_from:
+                recorder.record(endpoint, elapsed, error, size)
+        connection.close()
+
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    measured = max(time.perf_counter(), stop_at) - measure_from
+
+    endpoints = {}
+    all_latencies: List[float] = []
+    total_errors = 0
+    for name in names:
+        latencies = recorder.latencies[name]
+        errors = sum(recorder.errors[name].values())
+        all_latencies.extend(latencies)
+        total_errors += errors
+        endpoints[name] = {
+            'requests': len(latencies),
+            'throughput_rps': round(len(latencies) / measured, 1),
+            'errors': recorder.errors[name],
+            'error_rate': round(errors / len(latencies), 4) if latencies else None,
+            **_percentiles(latencies),
+        }
+    return {
+        'config': {
+            'base_url': base_url,
+            'mix': mix,
+            'concurrency': concurrency,
+            'rate': rate,
+            'duration_s': duration,
+            'warmup_s': warmup,
+            'accept_encoding': accept_encoding,
+            'server_bundles': len(bundles),
+        },
+        'total': {
+            'requests': len(all_latencies),
+            'throughput_rps': round(len(all_latencies) / measured, 1),
+            'error_rate': round(total_errors / len(all_latencies), 4) if all_latencies else None,
+            'bytes_received': recorder.bytes_received,
+            'measured_s': round(measured, 2),
+            **_percentiles(all_latencies),
+        },
+        'endpoints': endpoints,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def uvicorn_server(db_path: str, workers: int, port: Optional[int] = None, startup_timeout: float = 60.0) -> Iterator[str]:
+    """
+    Levanta ``uvicorn api.main:app`` sobre ``db_path`` y cede su URL base.
+
+    Args:
+        db_path: Base de datos SQLite que servirá la API (DB_DB_PATH).
+        workers: Procesos de uvicorn.
+        port: Puerto a usar; None para uno libre.
+        startup_timeout: Segundos máximos de espera hasta que /health responda.
+
+    Raises:
+        RuntimeError: Si el servidor no arranca a tiempo.
+    """
+    port = port or _free_port()
+    env = {**os.environ, 'DB_DB_PATH': db_path}
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get('PYTHONPATH')]))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api.main:app', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), '--log-level', 'warning', '--no-access-log'],
+        cwd=REPO_ROOT, env=env,
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f'uvicorn terminó al arrancar (código {process.returncode})')
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+                status, _ = _request(connection, '/health', {})
+                connection.close()
+                if status == 200:
+                    break
+            except OSError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f'uvicorn no respondió en {startup_timeout}s')
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Prueba de carga de la API con percentiles por endpoint.')
+    parser.add_argument('--url', help='Servidor ya levantado; si se indica no se siembra ni se arranca uvicorn')
+    parser.add_argument('--db', default='humble_bundle.db', help='Base de datos con el corpus (solo lectura)')
+    parser.add_argument('--bundles', type=int, default=2000, help='Bundles sintéticos a sembrar')
+    parser.add_argument('--seeded-db', help='Reutilizar (o crear, si no existe) esta base de datos sembrada')
+    parser.add_argument('--workers', type=int, default=1, help='Procesos de uvicorn')
+    parser.add_argument('--port', type=int, help='Puerto de uvicorn (por defecto, uno libre)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Conexiones simultáneas')
+    parser.add_argument('--rate', type=float, help='Peticiones/s objetivo (lazo abierto)')
+    parser.add_argument('--duration', type=float, default=20.0, help='Segundos medidos')
+    parser.add_argument('--warmup', type=float, default=2.0, help='Segundos de calentamiento no medidos')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Pesos por endpoint (por defecto {DEFAULT_MIX})')
+    parser.add_argument('--accept-encoding', default='gzip', help="Accept-Encoding de las peticiones ('' = ninguno)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Archivo JSON donde guardar el informe')
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    def load(base_url: str) -> Dict:
+        return run_load(
+            base_url, mix, args.concurrency, args.duration, args.warmup,
+            args.rate, args.accept_encoding, seed=args.seed,
+        )
+
+    if args.url:
+        result = load(args.url)
+    else:
+        with tempfile.TemporaryDirectory(prefix='hb-load-') as workdir:
+            db_path = args.seeded_db or str(Path(workdir) / 'api.db')
+            if not Path(db_path).exists():
+                started = time.perf_counter()
+                seeded = seed_database(load_corpus(args.db), db_path, args.bundles, args.seed)
+                print(f'Sembrados {seeded["bundles"]} bundles en {time.perf_counter() - started:.1f}s',
+                      file=sys.stderr)
+            with uvicorn_server(db_path, args.workers, args.port) as base_url:
+                result = load(base_url)
+            result['config'].update({'workers': args.workers, 'db_path': db_path})
+
+    document = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(document + '\n')
+    print(document)
+
+
+if __name__ == '__main__':
+    main()
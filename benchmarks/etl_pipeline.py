@@ -0,0 +1,316 @@
+"""
+Microbenchmarks de los caminos críticos del ETL.
+
+Casos medidos:
+    - script_extraction: BeautifulSoup + json.loads del script
+      webpack-bundle-page-data de cada página de detalle guardada.
+    - detail_extraction: ``_extract_price_tiers`` + ``_extract_book_list``
+      sobre el bundleData ya decodificado.
+    - detail_parse_inline / detail_parse_pool@N: ``parse_detail_html`` de
+      cada página en el proceso actual y en un DetailParsePool de N procesos
+      (``--parse-workers``, por defecto un proceso por CPU; el arranque del
+      pool queda fuera de la medida).
+    - normalize: ``HumbleSpider._normalize_products`` (pandas).
+    - validate: ``BundleRecord.model_validate`` por bundle.
+    - persist_insert / persist_update: ``persist_bundles`` sobre una base de
+      datos temporal vacía y, después, sobre las mismas filas ya guardadas.
+
+Los casos de página usan el corpus real; normalize/validate/persist se
+ejecutan para cada escala pedida con productos sintéticos (``--scales``).
+El resultado se escribe como JSON (``--output``) y se puede comparar con
+un resultado anterior (``--compare``).
+
+Uso:
+    python -m benchmarks.etl_pipeline --output bench.json
+    python -m benchmarks.etl_pipeline --scales 10000,100000 --compare bench.json
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from spider.config.settings import Settings
+from spider.core.spider import HumbleSpider
+from spider.database.persistence import persist_bundles
+from spider.database.session import dispose_engines, get_session_factory
+from spider.schemas.bundle import BundleRecord
+from spider.scrapers.bundle_detail_scraper import BundleDetailScraper
+from spider.scrapers.detail_pool import DetailParsePool
+
+from .fixtures import Corpus, decode_detail_script, load_corpus, scale_products, synthetic_items
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SCALES = (1000, 10000)
+
+# setup() -> estado; run(estado) se cronometra; devuelve el número de items
+Case = Tuple[Callable[[], object], Callable[[object], int]]
+
+
+def _time_case(setup: Callable[[], object], run: Callable[[object], int], repeat: int) -> Dict:
+    """Ejecuta ``run`` ``repeat`` veces (con un ``setup`` nuevo cada vez) y resume los tiempos."""
+    samples: List[float] = []
+    items = 0
+    for _ in range(repeat):
+        state = setup()
+        gc.collect()
+        start = time.perf_counter()
+        items = run(state)
+        samples.append(time.perf_counter() - start)
+    median = statistics.median(samples)
+    return {
+        'items': items,
+        'repeat': repeat,
+        'min_s': round(min(samples), 6),
+        'median_s': round(median, 6),
+        'mean_s': round(statistics.fmean(samples), 6),
+        'per_item_us': round(median / items * 1e6, 3) if items else None,
+        'items_per_s': round(items / median, 1) if median else None,
+    }
+
+
+def page_cases(corpus: Corpus, parse_workers: int = 1) -> Dict[str, Case]:
+    """Casos que recorren las páginas de detalle reales (una vez cada una)."""
+    pages = list(set(corpus.detail_pages.values()))
+    scraper = BundleDetailScraper()
+
+    def run_scripts(state) -> int:
+        for html in pages:
+            decode_detail_script(html)
+        return len(pages)
+
+    def setup_details():
+        decoded = (decode_detail_script(html) for html in pages)
+        return [data['bundleData'] for data in decoded if data and 'bundleData' in data]
+
+    def run_details(bundles) -> int:
+        for bundle in bundles:
+            display = bundle.get('tier_display_data', {})
+            scraper._extract_price_tiers(bundle.get('tier_pricing_data', {}), display)
+            scraper._extract_book_list(bundle.get('tier_item_data', {}), display)
+        return len(bundles)
+
+    def setup_pool() -> DetailParsePool:
+        pool = DetailParsePool(parse_workers, chunk_size=max(1, len(pages) // (parse_workers * 4)))
+        # Arranca los procesos (e importa BeautifulSoup en ellos) antes de cronometrar
+        for _ in pool.parse([(None, pages[0])] * parse_workers * pool.chunk_size):
+            pass
+        return pool
+
+    def run_pool(pool: DetailParsePool) -> int:
+        with pool:
+            for _ in pool.parse((None, html) for html in pages):
+                pass
+        return len(pages)
+
+    return {
+        'script_extraction': (lambda: None, run_scripts),
+        'detail_extraction': (setup_details, run_details),
+        'detail_parse_inline': (lambda: DetailParsePool(0), run_pool),
+        f'detail_parse_pool@{parse_workers}': (setup_pool, run_pool),
+    }
+
+
+def scaled_cases(corpus: Corpus, scale: int, include_raw_html: bool, workdir: str) -> Dict[str, Case]:
+    """Casos normalize/validate/persist sobre ``scale`` productos sintéticos."""
+    spider = HumbleSpider()
+    products = scale_products(corpus.products, scale)
+
+    def build_items() -> List[Dict]:
+        return synthetic_items(corpus, products, include_raw_html)
+
+    def run_normalize(state) -> int:
+        return len(spider._normalize_products(products))
+
+    def run_validate(items) -> int:
+        for item in items:
+            BundleRecord.model_validate(item)
+        return len(items)
+
+    records_cache: List[BundleRecord] = []
+
+    def records() -> List[BundleRecord]:
+        if not records_cache:
+            records_cache.extend(BundleRecord.model_validate(item) for item in build_items())
+        return records_cache
+
+    def fresh_database(prefill: bool):
+        directory = tempfile.mkdtemp(prefix='persist-', dir=workdir)
+        factory = get_session_factory(Settings(db_path=str(Path(directory) / 'bench.db')))
+        if prefill:
+            with factory() as session:
+                persist_bundles(records(), session)
+        return factory, records()
+
+    def run_persist(state) -> int:
+        factory, batch = state
+        with factory() as session:
+            persist_bundles(batch, session)
+        return len(batch)
+
+    return {
+        f'normalize@{scale}': (lambda: None, run_normalize),
+        f'validate@{scale}': (build_items, run_validate),
+        f'persist_insert@{scale}': (lambda: fresh_database(False), run_persist),
+        f'persist_update@{scale}': (lambda: fresh_database(True), run_persist),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=REPO_ROOT, check=True, capture_output=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    corpus: Corpus,
+    scales: List[int],
+    repeat: int,
+    only: Optional[List[str]] = None,
+    include_raw_html: bool = False,
+    parse_workers: Optional[int] = None,
+) -> Dict:
+    """
+    Ejecuta todos los casos y devuelve el documento JSON de resultados.
+
+    Args:
+        corpus: Corpus cargado con load_corpus().
+        scales: Números de bundles sintéticos para los casos escalados.
+        repeat: Repeticiones por caso (se reporta la mediana).
+        only: Prefijos de casos a ejecutar (p. ej. ['normalize', 'persist']).
+        include_raw_html: Si True, los bundles sintéticos llevan su raw_html
+            (cientos de KB por bundle: multiplica el tamaño de la BD).
+        parse_workers: Procesos del caso detail_parse_pool. Si es None, uno por CPU.
+
+    Returns:
+        Diccionario con ``meta`` (entorno y corpus) y ``results`` por caso.
+    """
+    parse_workers = parse_workers or os.cpu_count() or 1
+    cases: Dict[str, Case] = dict(page_cases(corpus, parse_workers))
+    results: Dict[str, Dict] = {}
+
+    def selected(name: str) -> bool:
+        return not only or any(name.startswith(prefix) for prefix in only)
+
+    for name, (setup, run) in cases.items():
+        if selected(name):
+            results[name] = _time_case(setup, run, repeat)
+            print(f'{name:<28} {results[name]["median_s"]:10.4f}s', file=sys.stderr)
+
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix='hb-bench-') as workdir:
+            for name, (setup, run) in scaled_cases(corpus, scale, include_raw_html, workdir).items():
+                if selected(name):
+                    # Las escalas grandes son caras: una sola repetición basta
+                    results[name] = _time_case(setup, run, repeat if scale <= 10000 else 1)
+                    print(f'{name:<28} {results[name]["median_s"]:10.4f}s', file=sys.stderr)
+            dispose_engines()
+
+    return {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'corpus': {
+                'source': corpus.source,
+                'products': len(corpus.products),
+                'detail_pages': len(set(corpus.detail_pages.values())),
+                'detail_bytes': corpus.page_bytes,
+            },
+            'scales': scales,
+            'include_raw_html': include_raw_html,
+            'cpu_count': os.cpu_count(),
+            'parse_workers': parse_workers,
+        },
+        'results': results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """
+    Compara la mediana de cada caso con la del baseline.
+
+    Args:
+        current: Resultado de run_benchmarks().
+        baseline: Resultado guardado anteriormente.
+        threshold: Tolerancia relativa (0.1 = 10% más lento es regresión).
+
+    Returns:
+        Lista de filas {case, baseline_s, current_s, ratio, status}.
+    """
+    rows = []
+    for name, result in current['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            rows.append({'case': name, 'baseline_s': None, 'current_s': result['median_s'], 'ratio': None, 'status': 'new'})
+            continue
+        ratio = result['median_s'] / previous['median_s'] if previous['median_s'] else None
+        status = 'same'
+        if ratio is not None and ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio is not None and ratio < 1 - threshold:
+            status = 'improvement'
+        rows.append({
+            'case': name,
+            'baseline_s': previous['median_s'],
+            'current_s': result['median_s'],
+            'ratio': round(ratio, 3) if ratio is not None else None,
+            'status': status,
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Microbenchmarks del pipeline ETL.')
+    parser.add_argument('--db', default='humble_bundle.db', help='Base de datos con el corpus (solo lectura)')
+    parser.add_argument('--scales', default=','.join(str(scale) for scale in DEFAULT_SCALES),
+                        help='Escalas sintéticas separadas por comas (p. ej. 10000,100000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por caso')
+    parser.add_argument('--only', help='Prefijos de casos separados por comas')
+    parser.add_argument('--include-raw-html', action='store_true',
+                        help='Guardar raw_html en los bundles sintéticos')
+    parser.add_argument('--parse-workers', type=int, help='Procesos del caso detail_parse_pool (por defecto, uno por CPU)')
+    parser.add_argument('--output', help='Archivo JSON donde guardar los resultados')
+    parser.add_argument('--compare', help='Resultado JSON anterior contra el que comparar')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Tolerancia relativa para marcar regresiones (por defecto 0.10)')
+    args = parser.parse_args(argv)
+
+    # Los logs de persistencia por bundle distorsionan las medidas
+    logging.basicConfig(level=logging.WARNING)
+
+    scales = [int(scale) for scale in args.scales.split(',') if scale.strip()]
+    only = [prefix.strip() for prefix in args.only.split(',')] if args.only else None
+    result = run_benchmarks(load_corpus(args.db), scales, args.repeat, only, args.include_raw_html, args.parse_workers)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        rows = compare(result, baseline, args.threshold)
+        result['comparison'] = {'baseline': baseline.get('meta', {}), 'threshold': args.threshold, 'cases': rows}
+
+    document = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(document + '\n')
+    print(document)
+
+    if args.compare and any(row['status'] == 'regression' for row in result['comparison']['cases']):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
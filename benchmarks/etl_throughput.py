@@ -0,0 +1,82 @@
+"""
+Mide el throughput de extremo a extremo del ETL contra el mock local.
+
+Levanta benchmarks.mock_humble en un hilo, ejecuta ``run_etl`` completo
+(descarga, normalización, detalles, persistencia, rankings) sobre una base
+de datos temporal y reporta bundles/s, el informe de etl_run (tiempos por
+etapa, latencias, reintentos) y los contadores del servidor.
+
+Uso:
+    python -m benchmarks.etl_throughput --bundles 500 --latency-ms 20 \\
+        --rate-limit-rate 0.05 --retry-after 0 --retries 3
+"""
+
+import argparse
+import json
+import logging
+import tempfile
+from pathlib import Path
+
+from spider.config.settings import Settings
+from spider.core.errors import HumbleSpiderError
+from spider.core.etl import run_etl
+from spider.database.runs import list_etl_runs
+from spider.database.session import dispose_engines, get_session_factory
+
+from .fixtures import load_corpus
+from .mock_humble import MockHumbleServer, add_mock_arguments, config_from_args
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Throughput del ETL contra el mock de Humble Bundle.')
+    add_mock_arguments(parser)
+    parser.add_argument('--retries', type=int, default=3, help='DB_HTTP_RETRIES del spider')
+    parser.add_argument('--backoff', type=float, default=0.1, help='DB_HTTP_BACKOFF_SECONDS del spider')
+    parser.add_argument('--output', help='Archivo JSON donde guardar el resultado')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    corpus = load_corpus(args.db)
+    with tempfile.TemporaryDirectory(prefix='hb-e2e-') as workdir, \
+            MockHumbleServer(corpus, config_from_args(args)) as server:
+        settings = Settings(
+            db_path=str(Path(workdir) / 'etl.db'),
+            humble_base_url=server.base_url,
+            http_retries=args.retries,
+            http_backoff_seconds=args.backoff,
+            etl_trace_memory=False,
+            # Las imágenes del corpus apuntan al CDN real, no al mock
+            image_mirror_enabled=False,
+        )
+        factory = get_session_factory(settings)
+        error = None
+        with factory() as session:
+            try:
+                run_etl(session, settings=settings)
+            except HumbleSpiderError as exc:
+                # La ejecución fallida también queda en etl_run
+                error = str(exc)
+            run = list_etl_runs(session, limit=1)[0]
+        dispose_engines()
+        server_stats = server.stats.snapshot()
+
+    processed = run.bundles_processed or 0
+    document = {
+        'status': run.status,
+        'error': error,
+        'bundles_processed': processed,
+        'wall_seconds': run.wall_seconds,
+        'bundles_per_second': round(processed / run.wall_seconds, 2) if run.wall_seconds else None,
+        'mock': {'config': vars(args), 'stats': server_stats},
+        'report': run.report,
+    }
+    text = json.dumps(document, indent=2, default=str)
+    if args.output:
+        Path(args.output).write_text(text + '\n')
+    print(text)
+    if error:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
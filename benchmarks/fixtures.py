@@ -0,0 +1,237 @@
+"""
+Fixtures de benchmark construidas a partir del corpus guardado en SQLite.
+
+El corpus real son los productos del último snapshot de
+``landing_page_raw_data`` y las páginas de detalle guardadas en
+``bundle.raw_html``. ``scale_products`` genera a partir de ellos un número
+arbitrario de bundles sintéticos (10k–100k) con identificadores únicos y
+valores variados, manteniendo la forma exacta del JSON de Humble Bundle.
+"""
+
+import json
+import random
+import sqlite3
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DETAIL_SCRIPT_ID = 'webpack-bundle-page-data'
+
+
+@dataclass
+class Corpus:
+    """Productos del landingPage y páginas de detalle (product_url -> HTML)."""
+    products: List[Dict]
+    detail_pages: Dict[str, str] = field(default_factory=dict)
+    source: str = ''
+
+    @property
+    def page_bytes(self) -> int:
+        return sum(len(html.encode('utf-8')) for html in set(self.detail_pages.values()))
+
+
+def load_corpus(db_path: str) -> Corpus:
+    """
+    Lee el corpus de benchmark desde la base de datos SQLite.
+
+    Args:
+        db_path: Ruta al archivo SQLite con datos de al menos un ETL.
+
+    Returns:
+        Corpus con los productos del último snapshot y el HTML de detalle.
+
+    Raises:
+        FileNotFoundError: Si la base de datos no existe.
+        ValueError: Si la base de datos no tiene snapshot de landingPage.
+    """
+    path = Path(db_path)
+    if not path.exists():
+        raise FileNotFoundError(f'No existe la base de datos {db_path}')
+
+    # Solo lectura: el benchmark nunca modifica el corpus
+    connection = sqlite3.connect(f'file:{path.absolute()}?mode=ro', uri=True)
+    try:
+        row = connection.execute(
+            'SELECT json_data FROM landing_page_raw_data ORDER BY scraped_date DESC LIMIT 1'
+        ).fetchone()
+        if row is None:
+            raise ValueError(f'{db_path} no tiene snapshots de landing_page_raw_data')
+        payload = json.loads(row[0])
+        products = payload['data']['books']['mosaic'][0]['products']
+        pages = dict(connection.execute(
+            'SELECT product_url, raw_html FROM bundle WHERE raw_html IS NOT NULL'
+        ).fetchall())
+    finally:
+        connection.close()
+
+    # Las URLs de la BD son absolutas; en el landingPage son relativas
+    detail_pages = {}
+    for url, html in pages.items():
+        detail_pages[url] = html
+        if url.startswith('https://www.humblebundle.com'):
+            detail_pages[url[len('https://www.humblebundle.com'):]] = html
+    return Corpus(products=products, detail_pages=detail_pages, source=str(path))
+
+
+def scale_products(products: List[Dict], count: int, seed: int = 42) -> List[Dict]:
+    """
+    Genera ``count`` productos sintéticos a partir de los reales.
+
+    Cada copia recibe un ``machine_name`` y un ``product_url`` únicos, fechas
+    desplazadas y ventas/textos ligeramente distintos, de modo que la
+    normalización y el upsert trabajan sobre filas realmente distintas.
+
+    Args:
+        products: Productos reales del landingPage.
+        count: Número de productos a generar.
+        seed: Semilla para que los datos sean reproducibles entre ejecuciones.
+
+    Returns:
+        Lista de diccionarios con la misma estructura que el JSON original.
+    """
+    if not products:
+        raise ValueError('Se necesita al menos un producto para escalar')
+    rng = random.Random(seed)
+    # json.loads de la plantilla es más rápido que deepcopy para 100k copias
+    templates = [json.dumps(product) for product in products]
+    base = datetime(2024, 1, 1)
+    result = []
+    for index in range(count):
+        item = json.loads(templates[index % len(templates)])
+        original = item.get('machine_name') or 'bundle'
+        item['machine_name'] = f'{original}_{index}'
+        if item.get('product_url'):
+            item['product_url'] = f'{item["product_url"]}-{index}'
+        start = base + timedelta(days=rng.randint(0, 700), minutes=rng.randint(0, 1440))
+        item['start_date|datetime'] = start.isoformat()
+        item['end_date|datetime'] = (start + timedelta(days=rng.randint(7, 30))).isoformat()
+        if 'bundles_sold|decimal' in item:
+            item['bundles_sold|decimal'] = rng.randint(0, 50000)
+        if item.get('tile_short_name'):
+            item['tile_short_name'] = f'{item["tile_short_name"]} #{index}'
+        result.append(item)
+    return result
+
+
+def detail_page_for(corpus: Corpus, product_url: Optional[str]) -> Optional[str]:
+    """
+    Devuelve el HTML de detalle para un product_url real o sintético.
+
+    Los productos sintéticos (``/books/x-123``) reutilizan la página de su
+    producto original; si no hay página guardada se usa cualquiera del corpus.
+    """
+    if not product_url or not corpus.detail_pages:
+        return None
+    if product_url in corpus.detail_pages:
+        return corpus.detail_pages[product_url]
+    original, _, suffix = product_url.rpartition('-')
+    if suffix.isdigit() and original in corpus.detail_pages:
+        return corpus.detail_pages[original]
+    pages = list(corpus.detail_pages.values())
+    return pages[zlib.crc32(product_url.encode('utf-8')) % len(pages)]
+
+
+def decode_detail_script(html: str) -> Optional[Dict]:
+    """Decodifica el script webpack-bundle-page-data de una página de detalle."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    script = soup.find('script', id=DETAIL_SCRIPT_ID, type='application/json')
+    if not script or not script.string:
+        return None
+    return json.loads(script.string)
+
+
+def synthetic_items(corpus: Corpus, products: List[Dict], include_raw_html: bool = False) -> List[Dict]:
+    """
+    Construye los items que el spider validaría para ``products``.
+
+    Normaliza los productos con ``HumbleSpider._normalize_products`` y añade
+    a cada uno los campos de detalle (tiers, libros, MSRP) de su página de
+    detalle, decodificada una sola vez por página original.
+
+    Args:
+        corpus: Corpus cargado con load_corpus().
+        products: Productos reales o generados con scale_products().
+        include_raw_html: Si True, cada item lleva el HTML de su página
+            (cientos de KB por bundle: multiplica el tamaño de la BD).
+
+    Returns:
+        Lista de diccionarios listos para ``BundleRecord.model_validate``.
+    """
+    from spider.core.spider import HumbleSpider
+    from spider.scrapers.bundle_detail_scraper import BundleDetailScraper
+
+    scraper = BundleDetailScraper()
+    details_by_page: Dict[int, Dict] = {}
+
+    def details_for(url: Optional[str]) -> Optional[Dict]:
+        html = detail_page_for(corpus, url)
+        if html is None:
+            return None
+        key = id(html)
+        if key not in details_by_page:
+            data = decode_detail_script(html) or {}
+            bundle = data.get('bundleData', {})
+            display = bundle.get('tier_display_data', {})
+            details_by_page[key] = {
+                'price_tiers': scraper._extract_price_tiers(bundle.get('tier_pricing_data', {}), display),
+                'book_list': scraper._extract_book_list(bundle.get('tier_item_data', {}), display),
+                'msrp_total': scraper._safe_amount(bundle.get('basic_data', {}).get('msrp|money')),
+                'raw_html': html if include_raw_html else None,
+            }
+        return details_by_page[key]
+
+    items = HumbleSpider()._normalize_products(products).to_dict(orient='records')
+    for item in items:
+        item.update(details_for(item.get('product_url')) or {})
+    return items
+
+
+def seed_database(corpus: Corpus, db_path: str, bundles: int, seed: int = 42) -> Dict[str, int]:
+    """
+    Crea una base de datos con ``bundles`` bundles sintéticos.
+
+    Persiste los bundles, un snapshot de landingPage con los productos
+    escalados, los rankings y los documentos de respuesta, igual que un ETL completo pero sin red, para
+    probar la API con volúmenes de producción.
+
+    Args:
+        corpus: Corpus cargado con load_corpus().
+        db_path: Ruta del archivo SQLite a crear (no debe existir).
+        bundles: Número de bundles sintéticos.
+        seed: Semilla de scale_products().
+
+    Returns:
+        Diccionario con los bundles guardados y las posiciones por ranking.
+
+    Raises:
+        FileExistsError: Si db_path ya existe.
+    """
+    from spider.config.settings import Settings
+    from spider.core.etl import materialize_response_documents
+    from spider.database.persistence import persist_bundles, persist_landing_page_raw_data
+    from spider.database.rankings import refresh_bundle_rankings
+    from spider.database.session import get_session_factory
+    from spider.schemas.bundle import BundleRecord
+    from spider.schemas.raw_data import LandingPageRawDataRecord
+
+    if Path(db_path).exists():
+        raise FileExistsError(f'{db_path} ya existe; no se sobrescribe')
+    products = scale_products(corpus.products, bundles, seed)
+    records = [BundleRecord.model_validate(item) for item in synthetic_items(corpus, products)]
+    settings = Settings(db_path=db_path)
+    with get_session_factory(settings)() as session:
+        persist_bundles(records, session)
+        persist_landing_page_raw_data(
+            LandingPageRawDataRecord(
+                json_data={'data': {'books': {'mosaic': [{'products': products}]}}},
+                source_url=f'{settings.humble_base_url}/books',
+            ),
+            session,
+        )
+        rankings = refresh_bundle_rankings(session, size=settings.ranking_size)
+        materialize_response_documents(session)
+    return {'bundles': len(records), **rankings}
@@ -0,0 +1,124 @@
+"""
+Mide el tiempo de arranque en frío de un worker del API.
+
+Cada muestra se toma en un intérprete nuevo (como un worker recién escalado)
+que importa el módulo indicado y reporta el tiempo de import y qué módulos
+pesados quedaron cargados. Con ``--compare-ref`` se mide también una
+revisión anterior del repositorio (extraída con ``git archive``) para ver
+la mejora.
+
+Uso:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --compare-ref HEAD~1 --runs 10 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ('pandas', 'bs4', 'requests', 'aiosqlite', 'spider.core.spider')
+
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': elapsed,
+    'modules': len(sys.modules),
+    'heavy': [name for name in {heavy!r} if name in sys.modules],
+}}))
+'''
+
+
+def measure(root: Path, module: str, runs: int) -> dict:
+    """
+    Importa ``module`` en ``runs`` intérpretes nuevos con ``root`` en el path.
+
+    Args:
+        root: Directorio raíz del código a medir.
+        module: Módulo a importar (p. ej. 'api.main').
+        runs: Número de muestras.
+
+    Returns:
+        Diccionario con mediana/mínimo/máximo en milisegundos y los módulos
+        pesados cargados.
+    """
+    env = dict(os.environ, PYTHONPATH=str(root), PYTHONDONTWRITEBYTECODE='1')
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    samples = []
+    probe = {}
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=root,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        samples.append(probe['seconds'] * 1000)
+    return {
+        'module': module,
+        'runs': runs,
+        'median_ms': round(statistics.median(samples), 1),
+        'min_ms': round(min(samples), 1),
+        'max_ms': round(max(samples), 1),
+        'modules_loaded': probe.get('modules'),
+        'heavy_modules': probe.get('heavy', []),
+    }
+
+
+def checkout(ref: str, target: Path) -> Path:
+    """Extrae la revisión ``ref`` del repositorio en ``target`` sin tocar el árbol actual."""
+    archive = subprocess.run(
+        ['git', 'archive', '--format=tar', ref, 'api', 'spider'],
+        cwd=REPO_ROOT,
+        check=True,
+        capture_output=True,
+    ).stdout
+    with tarfile.open(fileobj=BytesIO(archive)) as tar:
+        tar.extractall(target)
+    return target
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--module', default='api.main', help='Módulo a importar (por defecto api.main)')
+    parser.add_argument('--runs', type=int, default=5, help='Muestras por revisión')
+    parser.add_argument('--compare-ref', help='Revisión git contra la que comparar (p. ej. HEAD~1)')
+    parser.add_argument('--json', action='store_true', help='Imprime el resultado como JSON')
+    args = parser.parse_args()
+
+    # El import de api.main lee la configuración: no tocar la BD real
+    os.environ.setdefault('DB_DB_PATH', str(Path(tempfile.gettempdir()) / 'hb_import_bench.db'))
+
+    results = {'current': measure(REPO_ROOT, args.module, args.runs)}
+    if args.compare_ref:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = checkout(args.compare_ref, Path(tmp))
+            results[args.compare_ref] = measure(root, args.module, args.runs)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for label, result in results.items():
+        heavy = ', '.join(result['heavy_modules']) or '-'
+        print(
+            f'{label:>12}: {result["median_ms"]:8.1f} ms mediana '
+            f'(min {result["min_ms"]:.1f}, max {result["max_ms"]:.1f}), '
+            f'{result["modules_loaded"]} módulos, pesados: {heavy}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+"""
+Benchmark del códec JSON por capa y por backend (json, orjson, msgspec).
+
+Capas medidas (cada una con cada backend instalado):
+    - parse_landing: decodificar el script landingPage-json-data guardado.
+    - parse_detail: decodificar los scripts webpack-bundle-page-data de las
+      páginas de detalle (el texto ya extraído: solo se mide el JSON).
+    - hash_landing: serialización canónica (claves ordenadas) del payload
+      del landingPage para ``json_hash``.
+    - serialize_list: ``serialize_list`` sobre los highlights de cada producto.
+    - column_roundtrip: ``json_serializer``/``json_deserializer`` del engine
+      sobre price_tiers, book_list y json_data de la base de datos.
+    - column_query: SELECT ORM de las columnas JSON de todos los bundles.
+    - api_render: ``CodecJSONResponse.render`` de la lista de /bundles.
+
+Con el backend ``json`` cada capa se comporta como antes del códec
+intercambiable; la columna ``speedup`` de cada capa es la mediana de
+``json`` dividida entre la del backend.
+
+Uso:
+    python -m benchmarks.json_codec --output json_codec.json
+"""
+
+import argparse
+import gc
+import json
+import logging
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+from sqlalchemy import select
+
+from api.responses import CodecJSONResponse
+from api.schemas import BundleResponse
+from spider.config.settings import Settings
+from spider.database.models import Bundle
+from spider.database.session import dispose_engines, get_session_factory
+from spider.utils import json_codec
+from spider.utils.transformers import serialize_list
+
+from .fixtures import DETAIL_SCRIPT_ID, load_corpus
+
+LIST_FIELDS = ('highlights', 'hero_highlights', 'hover_highlights')
+
+
+def _time(run: Callable[[], int], repeat: int) -> Dict:
+    """Ejecuta ``run`` ``repeat`` veces y resume los tiempos."""
+    samples: List[float] = []
+    items = 0
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        items = run()
+        samples.append(time.perf_counter() - start)
+    median = statistics.median(samples)
+    return {
+        'items': items,
+        'median_s': round(median, 6),
+        'min_s': round(min(samples), 6),
+        'per_item_us': round(median / items * 1e6, 3) if items else None,
+    }
+
+
+def build_layers(db_path: str, workdir: str) -> Dict[str, Callable[[], int]]:
+    """Prepara los datos de cada capa una sola vez y devuelve sus funciones cronometrables."""
+    import sqlite3
+
+    connection = sqlite3.connect(f'file:{Path(db_path).absolute()}?mode=ro', uri=True)
+    try:
+        landing_text = connection.execute(
+            'SELECT json_data FROM landing_page_raw_data ORDER BY scraped_date DESC LIMIT 1'
+        ).fetchone()[0]
+        column_texts = [
+            text for row in connection.execute('SELECT price_tiers, book_list FROM bundle')
+            for text in row if text
+        ]
+        column_texts.append(landing_text)
+    finally:
+        connection.close()
+
+    corpus = load_corpus(db_path)
+    detail_texts = []
+    for html in set(corpus.detail_pages.values()):
+        script = BeautifulSoup(html, 'html.parser').find('script', id=DETAIL_SCRIPT_ID, type='application/json')
+        if script and script.string:
+            detail_texts.append(script.string)
+    landing_payload = json.loads(landing_text)
+    column_values = [json.loads(text) for text in column_texts]
+    highlight_lists = [
+        product[field] for product in corpus.products for field in LIST_FIELDS
+        if isinstance(product.get(field), list)
+    ]
+
+    # Copia de trabajo: get_session_factory puede crear tablas o índices
+    db_copy = str(Path(workdir) / 'json-codec.db')
+    shutil.copyfile(db_path, db_copy)
+    factory = get_session_factory(Settings(db_path=db_copy))
+    with factory() as session:
+        engine = session.get_bind()
+        api_content = [
+            BundleResponse.model_validate(bundle).model_dump(mode='json')
+            for bundle in session.execute(select(Bundle)).scalars()
+        ]
+    serializer = engine.dialect._json_serializer
+    deserializer = engine.dialect._json_deserializer
+
+    def parse_landing() -> int:
+        json_codec.loads(landing_text)
+        return 1
+
+    def parse_detail() -> int:
+        for text in detail_texts:
+            json_codec.loads(text)
+        return len(detail_texts)
+
+    def hash_landing() -> int:
+        json_codec.dumps_bytes(landing_payload, sort_keys=True)
+        return 1
+
+    def serialize_lists() -> int:
+        for value in highlight_lists:
+            serialize_list(value)
+        return len(highlight_lists)
+
+    def column_roundtrip() -> int:
+        for value in column_values:
+            deserializer(serializer(value))
+        return len(column_values)
+
+    def column_query() -> int:
+        with factory() as session:
+            rows = session.execute(select(Bundle.price_tiers, Bundle.book_list)).all()
+        return len(rows)
+
+    def api_render() -> int:
+        CodecJSONResponse(api_content)
+        return len(api_content)
+
+    return {
+        'parse_landing': parse_landing,
+        'parse_detail': parse_detail,
+        'hash_landing': hash_landing,
+        'serialize_list': serialize_lists,
+        'column_roundtrip': column_roundtrip,
+        'column_query': column_query,
+        'api_render': api_render,
+    }
+
+
+def run_benchmarks(db_path: str, repeat: int, backends: Optional[List[str]] = None) -> Dict:
+    """
+    Mide cada capa con cada backend y calcula la aceleración frente a ``json``.
+
+    Args:
+        db_path: Base de datos con el corpus (no se modifica).
+        repeat: Repeticiones por caso (se reporta la mediana).
+        backends: Backends a medir; por defecto todos los instalados.
+
+    Returns:
+        Diccionario con ``backends``, ``results`` (capa -> backend -> tiempos)
+        y ``speedup`` (capa -> backend -> veces más rápido que json).
+    """
+    backends = backends or list(json_codec.BACKENDS)
+    active = json_codec.get_backend()
+    results: Dict[str, Dict[str, Dict]] = {}
+    with tempfile.TemporaryDirectory(prefix='hb-json-') as workdir:
+        layers = build_layers(db_path, workdir)
+        try:
+            for backend in backends:
+                json_codec.set_backend(backend)
+                for layer, run in layers.items():
+                    results.setdefault(layer, {})[backend] = _time(run, repeat)
+                    print(f'{layer:<18} {backend:<8} {results[layer][backend]["median_s"]:10.6f}s', file=sys.stderr)
+        finally:
+            json_codec.set_backend(active)
+            dispose_engines()
+
+    speedup = {
+        layer: {
+            backend: round(timings['json']['median_s'] / timing['median_s'], 2)
+            for backend, timing in timings.items()
+            if 'json' in timings and timing['median_s']
+        }
+        for layer, timings in results.items()
+    }
+    return {'backends': backends, 'default_backend': active, 'results': results, 'speedup': speedup}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Benchmark del códec JSON por capa y backend.')
+    parser.add_argument('--db', default='humble_bundle.db', help='Base de datos con el corpus (solo lectura)')
+    parser.add_argument('--repeat', type=int, default=5, help='Repeticiones por caso')
+    parser.add_argument('--backends', help='Backends separados por comas (por defecto todos los instalados)')
+    parser.add_argument('--output', help='Archivo JSON donde guardar los resultados')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    backends = [name.strip() for name in args.backends.split(',')] if args.backends else None
+    document = json.dumps(run_benchmarks(args.db, args.repeat, backends), indent=2)
+    if args.output:
+        Path(args.output).write_text(document + '\n')
+    print(document)
+
+
+if __name__ == '__main__':
+    main()
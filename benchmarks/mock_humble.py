@@ -0,0 +1,282 @@
+"""
+Servidor HTTP local que imita Humble Bundle para pruebas de carga del ETL.
+
+Sirve ``/books`` (con el script landingPage-json-data) y las páginas de
+detalle ``/books/<slug>`` a partir del corpus guardado en SQLite, escalado a
+``--bundles`` productos con benchmarks.fixtures. Permite inyectar latencia
+(fija, uniforme, exponencial o lognormal), errores 5xx, respuestas 429 con
+Retry-After y cuerpos enviados "gota a gota" para ejercitar los timeouts y
+los reintentos del spider.
+
+Uso:
+    python -m benchmarks.mock_humble --bundles 1000 --latency-ms 50 --error-rate 0.05
+    DB_HUMBLE_BASE_URL=http://127.0.0.1:8765 python -m spider.cli.run_spider --report text
+
+``GET /__stats`` devuelve los contadores del servidor (peticiones, fallos
+inyectados, bytes enviados) y ``POST /__reset`` los pone a cero.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from .fixtures import Corpus, detail_page_for, load_corpus, scale_products
+
+LANDING_SCRIPT_ID = 'landingPage-json-data'
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+
+@dataclass
+class MockConfig:
+    """Parámetros de comportamiento del servidor mock."""
+    bundles: Optional[int] = None  # None: solo los productos reales del corpus
+    latency_ms: float = 0.0
+    latency_distribution: str = 'fixed'
+    error_rate: float = 0.0  # fracción de peticiones que responden 500
+    rate_limit_rate: float = 0.0  # fracción de peticiones que responden 429
+    retry_after_seconds: int = 1  # Retry-After solo admite segundos enteros
+    drip_chunk_bytes: int = 0  # > 0: el cuerpo se envía en trozos de este tamaño
+    drip_delay_ms: float = 0.0  # pausa entre trozos
+    seed: int = 42
+
+
+class MockStats:
+    """Contadores thread-safe de lo que ha servido el mock."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters: Dict[str, int] = {
+                'requests': 0,
+                'landing': 0,
+                'details': 0,
+                'not_found': 0,
+                'errors_injected': 0,
+                'rate_limited': 0,
+                'bytes_sent': 0,
+            }
+
+    def incr(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+
+class MockHumbleServer:
+    """
+    Servidor mock en un hilo propio; usable como context manager.
+
+    Ejemplo:
+        with MockHumbleServer(corpus, MockConfig(bundles=500)) as server:
+            settings = Settings(humble_base_url=server.base_url)
+    """
+
+    def __init__(self, corpus: Corpus, config: MockConfig, host: str = '127.0.0.1', port: int = 0) -> None:
+        self.corpus = corpus
+        self.config = config
+        self.stats = MockStats()
+        self._rng = random.Random(config.seed)
+        self._rng_lock = threading.Lock()
+
+        products = scale_products(corpus.products, config.bundles) if config.bundles else corpus.products
+        payload = {'data': {'books': {'mosaic': [{'products': products}]}}}
+        self.landing_page = (
+            '<!doctype html><html><body>'
+            f'<script id="{LANDING_SCRIPT_ID}" type="application/json">{json.dumps(payload)}</script>'
+            '</body></html>'
+        ).encode('utf-8')
+        self._detail_cache: Dict[int, bytes] = {}
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'MockHumbleServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='mock-humble', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> 'MockHumbleServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _random(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def sample_latency(self) -> float:
+        """Latencia a aplicar a una petición, en segundos."""
+        mean = self.config.latency_ms / 1000
+        if mean <= 0:
+            return 0.0
+        with self._rng_lock:
+            distribution = self.config.latency_distribution
+            if distribution == 'uniform':
+                return self._rng.uniform(0, 2 * mean)
+            if distribution == 'exponential':
+                return self._rng.expovariate(1 / mean)
+            if distribution == 'lognormal':
+                # sigma=1: cola larga con la misma media
+                return self._rng.lognormvariate(0, 1) * mean / 1.6487
+            return mean
+
+    def detail_page(self, path: str) -> Optional[bytes]:
+        html = detail_page_for(self.corpus, path)
+        if html is None:
+            return None
+        # Una copia codificada por página original, no por bundle sintético
+        body = self._detail_cache.get(id(html))
+        if body is None:
+            body = html.encode('utf-8')
+            self._detail_cache[id(html)] = body
+        return body
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args) -> None:
+                return None
+
+            def do_POST(self) -> None:
+                if self.path == '/__reset':
+                    server.stats.reset()
+                    self._send(200, b'{}', 'application/json')
+                else:
+                    self._send(404, b'not found', 'text/plain')
+
+            def do_GET(self) -> None:
+                path = self.path.split('?', 1)[0]
+                if path == '/__stats':
+                    body = json.dumps({'stats': server.stats.snapshot(), 'config': asdict(server.config)})
+                    self._send(200, body.encode('utf-8'), 'application/json')
+                    return
+
+                server.stats.incr('requests')
+                latency = server.sample_latency()
+                if latency:
+                    time.sleep(latency)
+
+                roll = server._random()
+                config = server.config
+                if roll < config.rate_limit_rate:
+                    server.stats.incr('rate_limited')
+                    self._send(429, b'rate limited', 'text/plain',
+                               {'Retry-After': str(config.retry_after_seconds)})
+                    return
+                if roll < config.rate_limit_rate + config.error_rate:
+                    server.stats.incr('errors_injected')
+                    self._send(500, b'injected error', 'text/plain')
+                    return
+
+                if path.rstrip('/') == '/books':
+                    server.stats.incr('landing')
+                    self._send(200, server.landing_page, 'text/html; charset=utf-8', drip=True)
+                    return
+                body = server.detail_page(path) if path.startswith('/books/') else None
+                if body is None:
+                    server.stats.incr('not_found')
+                    self._send(404, b'not found', 'text/plain')
+                    return
+                server.stats.incr('details')
+                self._send(200, body, 'text/html; charset=utf-8', drip=True)
+
+            def _send(self, status: int, body: bytes, content_type: str,
+                      headers: Optional[Dict[str, str]] = None, drip: bool = False) -> None:
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                chunk = server.config.drip_chunk_bytes
+                try:
+                    if drip and chunk > 0:
+                        # Cuerpo "gota a gota": trozos pequeños con pausas
+                        for offset in range(0, len(body), chunk):
+                            self.wfile.write(body[offset:offset + chunk])
+                            self.wfile.flush()
+                            time.sleep(server.config.drip_delay_ms / 1000)
+                    else:
+                        self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # El cliente abandonó la petición (timeout)
+                    return
+                server.stats.incr('bytes_sent', len(body))
+
+        return Handler
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    """Añade al parser las opciones de MockConfig (compartidas con etl_throughput)."""
+    parser.add_argument('--db', default='humble_bundle.db', help='Base de datos con el corpus (solo lectura)')
+    parser.add_argument('--bundles', type=int, help='Número de bundles a servir (por defecto, los del corpus)')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Latencia media por petición')
+    parser.add_argument('--latency-distribution', choices=LATENCY_DISTRIBUTIONS, default='fixed')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fracción de respuestas 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fracción de respuestas 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Segundos (enteros) del header Retry-After')
+    parser.add_argument('--drip-chunk-bytes', type=int, default=0, help='Enviar el cuerpo en trozos de N bytes')
+    parser.add_argument('--drip-delay-ms', type=float, default=0.0, help='Pausa entre trozos')
+    parser.add_argument('--seed', type=int, default=42)
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        bundles=args.bundles,
+        latency_ms=args.latency_ms,
+        latency_distribution=args.latency_distribution,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_seconds=args.retry_after,
+        drip_chunk_bytes=args.drip_chunk_bytes,
+        drip_delay_ms=args.drip_delay_ms,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Mock local de Humble Bundle con inyección de latencia y fallos.')
+    add_mock_arguments(parser)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server = MockHumbleServer(load_corpus(args.db), config_from_args(args), args.host, args.port)
+    print(f'Mock de Humble Bundle en {server.base_url} (DB_HUMBLE_BASE_URL={server.base_url})')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
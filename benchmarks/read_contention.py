@@ -0,0 +1,216 @@
+"""
+Latencia de las lecturas de la API mientras corre un ETL completo.
+
+Para cada modo crea una base de datos sintética (``seed_database``), mide
+unos segundos de lecturas en reposo y después las mismas lecturas mientras
+otro proceso ejecuta ``run_etl`` contra el mock (el mock y el ETL comparten
+ese proceso, así que el GIL del ETL no afecta a los lectores). Cada lectura
+abre una sesión, consulta la versión de datos y un bundle por id o una
+página del listado, como un endpoint de la API. Los lectores leen a un
+ritmo fijo (``--rate``) para no saturar la CPU: la latencia refleja las
+esperas por locks, no la cola de lecturas.
+
+Modos:
+    - journal: rollback journal (``sqlite_wal=False``) y lectores sobre el
+      engine de escritura, como antes de la cola de escritura.
+    - wal: WAL y lectores sobre el pool de solo lectura (``mode=ro``,
+      ``query_only``).
+
+Se reportan p50/p95/p99, lecturas bloqueadas (más lentas que
+``--stall-ms``) y errores ('database is locked') por fase.
+
+Uso:
+    python -m benchmarks.read_contention --seed-bundles 2000 --bundles 500 --readers 4 --rate 200
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+
+from spider.config.settings import Settings
+from spider.database.models import Bundle
+from spider.database.persistence import get_data_version
+from spider.database.session import dispose_engines, get_read_session_factory, get_session_factory
+
+from .api_load import _percentiles
+from .fixtures import load_corpus, seed_database
+from .mock_humble import MockConfig, MockHumbleServer, add_mock_arguments, config_from_args
+
+MODES = ('journal', 'wal')
+
+
+def _settings(db_path: str, mode: str, **extra) -> Settings:
+    return Settings(db_path=db_path, sqlite_wal=mode == 'wal', etl_trace_memory=False, **extra)
+
+
+def _run_etl_process(corpus_db: str, db_path: str, mode: str, config: MockConfig, results) -> None:
+    """Proceso hijo: levanta el mock y ejecuta el ETL completo sobre ``db_path``."""
+    from spider.core.etl import run_etl
+
+    logging.basicConfig(level=logging.WARNING)
+    corpus = load_corpus(corpus_db)
+    with MockHumbleServer(corpus, config) as server:
+        # Las imágenes del corpus apuntan al CDN real, no al mock
+        settings = _settings(db_path, mode, humble_base_url=server.base_url, image_mirror_enabled=False)
+        started = time.perf_counter()
+        with get_session_factory(settings)() as session:
+            result = run_etl(session, settings=settings)
+    results.put({'bundles_processed': result.bundles_processed, 'wall_seconds': round(time.perf_counter() - started, 3)})
+
+
+class Readers:
+    """Hilos lectores que registran la latencia de cada lectura en la fase actual."""
+
+    def __init__(self, factory, ids: List[str], count: int, rate: float, seed: int = 42) -> None:
+        self.factory = factory
+        self.ids = ids
+        self.count = count
+        self.interval = count / rate if rate > 0 else 0.0
+        self.seed = seed
+        self.phase = 'idle'
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, Counter] = {}
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        for index in range(self.count):
+            thread = threading.Thread(target=self._worker, args=(random.Random(self.seed + index),), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+    def _read(self, rng: random.Random) -> None:
+        with self.factory() as session:
+            get_data_version(session)
+            if rng.random() < 0.8:
+                session.execute(
+                    select(Bundle.id, Bundle.machine_name, Bundle.price_tiers, Bundle.book_list)
+                    .where(Bundle.id == rng.choice(self.ids))
+                ).first()
+            else:
+                session.execute(
+                    select(Bundle.id, Bundle.machine_name, Bundle.tile_name, Bundle.msrp_total)
+                    .order_by(Bundle.end_date_datetime.desc()).limit(50)
+                ).all()
+
+    def _worker(self, rng: random.Random) -> None:
+        next_slot = time.perf_counter()
+        while not self._stop.is_set():
+            next_slot += self.interval
+            phase = self.phase
+            start = time.perf_counter()
+            try:
+                self._read(rng)
+            except Exception as exc:
+                self.errors.setdefault(phase, Counter())[str(exc).splitlines()[0][:80]] += 1
+            else:
+                self.latencies.setdefault(phase, []).append(time.perf_counter() - start)
+            # Si una lectura se retrasa, las siguientes no se acumulan para recuperar
+            next_slot = max(next_slot, time.perf_counter())
+            self._stop.wait(next_slot - time.perf_counter())
+
+
+def run_mode(
+    corpus_db: str,
+    mode: str,
+    seed_bundles: int,
+    readers: int,
+    rate: float,
+    idle_seconds: float,
+    config: MockConfig,
+    stall_ms: float = 100.0,
+) -> Dict:
+    """Mide las lecturas en reposo y durante un ETL para un modo."""
+    corpus = load_corpus(corpus_db)
+    with tempfile.TemporaryDirectory(prefix=f'hb-contention-{mode}-') as workdir:
+        db_path = str(Path(workdir) / 'contention.db')
+        seed_database(corpus, db_path, seed_bundles)
+        dispose_engines()
+        if mode == 'journal':
+            connection = sqlite3.connect(db_path)
+            connection.execute('PRAGMA journal_mode = DELETE')
+            connection.close()
+
+        settings = _settings(db_path, mode)
+        factory = get_read_session_factory(settings) if mode == 'wal' else get_session_factory(settings)
+        with factory() as session:
+            ids = list(session.execute(select(Bundle.id)).scalars())
+        pool = Readers(factory, ids, readers, rate)
+        pool.start()
+        time.sleep(idle_seconds)
+
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        child = context.Process(target=_run_etl_process, args=(corpus_db, db_path, mode, config, results))
+        pool.phase = 'etl'
+        child.start()
+        etl: Optional[Dict] = results.get()
+        child.join()
+        pool.stop()
+        dispose_engines()
+
+    phases = {
+        phase: {
+            'reads': len(pool.latencies.get(phase, [])),
+            'stalled': sum(1 for value in pool.latencies.get(phase, []) if value * 1000 >= stall_ms),
+            'errors': dict(pool.errors.get(phase, {})),
+            **_percentiles(pool.latencies.get(phase, [])),
+        }
+        for phase in ('idle', 'etl')
+    }
+    idle_p99, etl_p99 = phases['idle']['p99_ms'], phases['etl']['p99_ms']
+    return {
+        'etl': etl,
+        'phases': phases,
+        'p99_ratio': round(etl_p99 / idle_p99, 2) if idle_p99 and etl_p99 else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Latencia de lectura durante un ETL (journal vs WAL + pool de solo lectura).')
+    add_mock_arguments(parser)
+    parser.add_argument('--seed-bundles', type=int, default=2000, help='Bundles de la base de datos inicial')
+    parser.add_argument('--readers', type=int, default=4, help='Hilos lectores')
+    parser.add_argument('--rate', type=float, default=200.0, help='Lecturas por segundo entre todos los lectores (0: sin pausa)')
+    parser.add_argument('--idle-seconds', type=float, default=5.0, help='Segundos de lecturas antes del ETL')
+    parser.add_argument('--stall-ms', type=float, default=100.0, help='Umbral (ms) para contar una lectura como bloqueada')
+    parser.add_argument('--modes', default=','.join(MODES), help='Modos separados por comas')
+    parser.add_argument('--output', help='Archivo JSON donde guardar los resultados')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    config = config_from_args(args)
+    document = {
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'modes': {
+            mode.strip(): run_mode(
+                args.db, mode.strip(), args.seed_bundles, args.readers, args.rate, args.idle_seconds, config,
+                args.stall_ms,
+            )
+            for mode in args.modes.split(',')
+        },
+    }
+    text = json.dumps(document, indent=2, default=str)
+    if args.output:
+        Path(args.output).write_text(text + '\n')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
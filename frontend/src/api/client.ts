@@ -29,6 +29,14 @@ export async function postLong<T>(url: string, payload?: unknown) {
   return data;
 }
 
+// Las imágenes replicadas por el ETL llegan como rutas locales (/images/...)
+// servidas por la API; las URLs absolutas (fallback al CDN) se usan tal cual.
+export function resolveImageUrl(imageUrl: string | null | undefined): string {
+  if (!imageUrl) return "";
+  if (imageUrl.startsWith("/")) return `${baseURL.replace(/\/$/, "")}${imageUrl}`;
+  return imageUrl;
+}
+
 export function isAxiosError(error: unknown): error is AxiosError {
   return axios.isAxiosError(error);
 }
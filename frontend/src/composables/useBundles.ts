@@ -1,10 +1,45 @@
-import { ref, computed, onMounted } from "vue";
+import { ref, computed, onMounted, onUnmounted } from "vue";
 import type { Bundle } from "@/types/bundle";
-import { get, postLong, isAxiosError } from "@api/client";
+import { api, get, post, isAxiosError } from "@api/client";
 
 interface ETLRunResponse {
-  bundles_processed: number;
-  cleanup_ran: boolean;
+  job_id: string;
+  status: string;
+  joined: boolean;
+}
+
+interface ETLJobResponse {
+  id: string;
+  status: "queued" | "running" | "succeeded" | "failed";
+  stage: string | null;
+  bundles_total: number | null;
+  bundles_done: number | null;
+  current_bundle: string | null;
+  bundles_processed: number | null;
+  error: string | null;
+}
+
+const ETL_POLL_INTERVAL_MS = 2000;
+const ETL_MAX_WAIT_MS = 600000;
+
+const BUNDLE_EVENT_TYPES = ["inserted", "updated", "expired", "reset"];
+const EVENT_REFRESH_DEBOUNCE_MS = 1000;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// El ETL corre en segundo plano: se consulta el job hasta que termina
+async function waitForJob(jobId: string): Promise<ETLJobResponse> {
+  const deadline = Date.now() + ETL_MAX_WAIT_MS;
+  for (;;) {
+    const job = await get<ETLJobResponse>(`/etl/jobs/${jobId}`);
+    if (job.status === "succeeded" || job.status === "failed") {
+      return job;
+    }
+    if (Date.now() > deadline) {
+      throw new Error("El ETL está tardando demasiado. Por favor, intenta de nuevo.");
+    }
+    await sleep(ETL_POLL_INTERVAL_MS);
+  }
 }
 
 export function useBundles() {
@@ -13,7 +48,7 @@ export function useBundles() {
   const loading = ref(true);
   const error = ref<string | null>(null);
   const lastUpdate = ref<Date | null>(null);
-  const etlResult = ref<ETLRunResponse | null>(null);
+  const etlResult = ref<ETLJobResponse | null>(null);
 
   const activeBundles = computed(() =>
     bundles.value.filter((bundle) => bundle.is_active),
@@ -65,9 +100,13 @@ export function useBundles() {
     error.value = null;
     etlResult.value = null;
     try {
-      // Ejecutar el ETL con timeout extendido
-      const result = await postLong<ETLRunResponse>("/etl/run", {});
-      etlResult.value = result;
+      // Encolar el ETL (o unirse al que ya está en curso) y esperar el job
+      const run = await post<ETLRunResponse>("/etl/run", {});
+      const job = await waitForJob(run.job_id);
+      if (job.status === "failed") {
+        throw new Error(job.error || "Error ejecutando ETL.");
+      }
+      etlResult.value = job;
       
       // Recargar los datos después del ETL
       await fetchData();
@@ -95,7 +134,32 @@ export function useBundles() {
     }
   };
 
-  onMounted(fetchData);
+  // Cambios empujados por el API (SSE) en lugar de hacer polling
+  let events: EventSource | null = null;
+  let refreshTimer: ReturnType<typeof setTimeout> | null = null;
+
+  const scheduleRefresh = () => {
+    if (refreshTimer) clearTimeout(refreshTimer);
+    refreshTimer = setTimeout(() => {
+      refreshTimer = null;
+      if (!loading.value) fetchData();
+    }, EVENT_REFRESH_DEBOUNCE_MS);
+  };
+
+  onMounted(() => {
+    fetchData();
+    if (typeof EventSource === "undefined") return;
+    events = new EventSource(`${api.defaults.baseURL}/events`);
+    BUNDLE_EVENT_TYPES.forEach((type) =>
+      events?.addEventListener(type, scheduleRefresh),
+    );
+  });
+
+  onUnmounted(() => {
+    events?.close();
+    events = null;
+    if (refreshTimer) clearTimeout(refreshTimer);
+  });
 
   return {
     bundles,
@@ -1,10 +1,14 @@
 import { ref } from "vue";
 import { get } from "@/api/client";
 import { isAxiosError } from "@/api/client";
-import type { LandingPageRawData } from "@/types/rawData";
+import type {
+	LandingPageRawData,
+	LandingPageRawDataSummary,
+} from "@/types/rawData";
 
 export function useRawData() {
-	const rawDataList = ref<LandingPageRawData[]>([]);
+	// El listado solo trae metadata; el JSON completo se pide por id
+	const rawDataList = ref<LandingPageRawDataSummary[]>([]);
 	const latestRawData = ref<LandingPageRawData | null>(null);
 	const currentRawData = ref<LandingPageRawData | null>(null);
 	const loading = ref(false);
@@ -14,7 +18,7 @@ export function useRawData() {
 		loading.value = true;
 		error.value = null;
 		try {
-			rawDataList.value = await get<LandingPageRawData[]>(
+			rawDataList.value = await get<LandingPageRawDataSummary[]>(
 				"/landing-page-raw-data",
 			);
 		} catch (err) {
@@ -105,6 +109,7 @@ export function useRawData() {
 		} finally {
 			loading.value = false;
 		}
+		return currentRawData.value;
 	}
 
 	return {
@@ -33,8 +33,12 @@ export interface Bundle {
   price_tiers?: PriceTier[];
   book_list?: BookItem[];
   featured_image?: string | null;
+  tile_image?: string | null;
+  high_res_tile_image?: string | null;
+  images?: Record<string, Record<string, string>> | null;
   msrp_total?: number | null;
   verification_date?: string;
+  row_version?: number | null;
   start_date_datetime?: string;
   end_date_datetime?: string;
 }
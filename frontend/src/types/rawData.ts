@@ -7,3 +7,11 @@ export interface LandingPageRawData {
   json_version: string | null;
 }
 
+export interface LandingPageRawDataSummary {
+  id: string;
+  scraped_date: string;
+  source_url: string;
+  json_hash: string | null;
+  json_version: string | null;
+  size_bytes: number | null;
+}
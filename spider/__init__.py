@@ -3,9 +3,11 @@ Módulo spider para scraping y procesamiento de bundles de Humble Bundle.
 """
 
 # Exportaciones principales para mantener compatibilidad
-from .core.spider import HumbleSpider
 from .core.errors import HumbleSpiderError
-from .database.models import Base, Bundle, LandingPageRawData
+from .core.etl import EtlResult, run_etl
+from .core.instrumentation import EtlInstrumentation
+from .core.jobs import EtlJobRunner
+from .database.models import Base, Bundle, BundleRanking, BundleTombstone, DataVersion, EtlJob, EtlLease, EtlRun, LandingPageRawData
 from .schemas.bundle import BundleRecord
 from .schemas.raw_data import LandingPageRawDataRecord
 from .database.persistence import (
@@ -15,26 +17,77 @@ from .database.persistence import (
     ensure_columns,
     persist_landing_page_raw_data,
     ensure_landing_page_raw_data_table,
+    get_data_version,
+    reserve_data_version,
+    bump_data_version,
+)
+from .database.runs import record_etl_run, list_etl_runs
+from .database.rankings import RANKING_KINDS, refresh_bundle_rankings
+from .database.publish import SnapshotValidationError, publish_snapshot, rollback_snapshot
+from .database.session import (
+    get_session_factory,
+    get_async_session_factory,
+    get_engine,
+    get_async_engine,
+    get_read_session_factory,
+    get_async_read_session_factory,
+    get_read_engine,
+    get_async_read_engine,
+    ensure_schema,
+    dispose_engines,
+    build_database_uri,
+    build_read_only_uri,
+    release_read_engines,
 )
-from .database.session import get_session_factory, build_database_uri
 from .config.settings import Settings, get_settings
 
 __all__ = [
     # Core
     'HumbleSpider',
     'HumbleSpiderError',
+    'EtlResult',
+    'run_etl',
+    'EtlJobRunner',
+    'EtlInstrumentation',
     # Database
     'Base',
     'Bundle',
     'LandingPageRawData',
+    'DataVersion',
+    'EtlJob',
+    'EtlLease',
+    'EtlRun',
+    'BundleRanking',
+    'BundleTombstone',
     'get_session_factory',
+    'get_async_session_factory',
+    'get_engine',
+    'get_async_engine',
+    'get_read_session_factory',
+    'get_async_read_session_factory',
+    'get_read_engine',
+    'get_async_read_engine',
+    'ensure_schema',
+    'dispose_engines',
     'build_database_uri',
+    'build_read_only_uri',
+    'release_read_engines',
     'persist_bundles',
     'remove_outdated_bundles',
     'recreate_database',
     'ensure_columns',
     'persist_landing_page_raw_data',
     'ensure_landing_page_raw_data_table',
+    'get_data_version',
+    'reserve_data_version',
+    'bump_data_version',
+    'record_etl_run',
+    'list_etl_runs',
+    'RANKING_KINDS',
+    'refresh_bundle_rankings',
+    'SnapshotValidationError',
+    'publish_snapshot',
+    'rollback_snapshot',
     # Schemas
     'BundleRecord',
     'LandingPageRawDataRecord',
@@ -42,3 +95,11 @@ __all__ = [
     'Settings',
     'get_settings',
 ]
+
+
+def __getattr__(name):
+    # HumbleSpider arrastra pandas y BeautifulSoup: se importa solo al usarlo
+    if name == 'HumbleSpider':
+        from .core.spider import HumbleSpider
+        return HumbleSpider
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
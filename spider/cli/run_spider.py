@@ -1,49 +1,189 @@
+import argparse
+import json
 import sys
-from ..core.spider import HumbleSpider
+from functools import partial
+from typing import List, Optional
+
 from ..core.errors import HumbleSpiderError
+from ..core.jobs import EtlJobRunner
 from ..config.settings import get_settings
-from ..database.session import get_session_factory
-from ..database.persistence import (
-    persist_bundles,
-    remove_outdated_bundles,
-    persist_landing_page_raw_data,
-)
+from ..database.runs import list_etl_runs
+
+
+STAGE_MESSAGES = {
+    'fetch': 'Iniciando HumbleSpider...',
+    'cleanup': 'Limpiando bundles expirados...',
+    'persist': 'Persistiendo bundles...',
+    'raw_data': 'Persistiendo raw data de landingPage...',
+    'images': 'Replicando imágenes de bundles...',
+    'rankings': 'Calculando rankings de bundles...',
+    'documents': 'Serializando respuestas de bundles...',
+    'publish': 'Publicando snapshot de la base de datos...',
+}
+
+
+def _print_progress(stage: str, status: str, file=None, **details) -> None:
+    """Imprime los mensajes de avance del ETL en la consola."""
+    if status == 'running' and stage in STAGE_MESSAGES and not details.get('current'):
+        print(STAGE_MESSAGES[stage], file=file)
+    elif stage == 'details' and status == 'done':
+        print(f'Bundles obtenidos: {details.get("total", 0) - details.get("discarded", 0)}', file=file)
+
+
+def _print_report(run, fmt: str) -> None:
+    """Imprime el informe de rendimiento de la ejecución (etl_run)."""
+    if fmt == 'json':
+        print(json.dumps({
+            'id': run.id,
+            'job_id': run.job_id,
+            'status': run.status,
+            'bundles_processed': run.bundles_processed,
+            'bundles_discarded': run.bundles_discarded,
+            **run.report,
+        }, indent=2, ensure_ascii=False))
+        return
+
+    print(f'Tiempo total: {run.wall_seconds:.2f}s (CPU {run.cpu_seconds:.2f}s)')
+    for stage, entry in run.report.get('stages', {}).items():
+        if stage != 'total':
+            print(f'  {stage:<10} {entry["wall_seconds"]:8.3f}s  CPU {entry["cpu_seconds"]:8.3f}s  x{entry["calls"]}')
+    fetches = run.report.get('fetches', {})
+    print(f'Descargas: {fetches.get("requests", 0)} ({fetches.get("bytes_downloaded", 0)} bytes), '
+          f'p50 {fetches.get("latency_p50_ms", 0)} ms, p95 {fetches.get("latency_p95_ms", 0)} ms')
+    if run.report.get('discards'):
+        print(f'Descartes: {run.report["discards"]}')
+    if run.peak_memory_bytes is not None:
+        print(f'Pico de memoria: {run.peak_memory_bytes / (1024 * 1024):.1f} MiB')
+
+
+def _reparse_stored(settings) -> None:
+    """Re-parsea el raw_html guardado sin descargar nada (--reparse-stored)."""
+    # pandas/BeautifulSoup y el pool de procesos solo se cargan en este modo
+    from ..core.reparse import reparse_stored_bundles
+    from ..database.session import get_session_factory
+
+    with get_session_factory(settings)() as session:
+        stats = reparse_stored_bundles(session, settings)
+    print(f'Bundles re-parseados: {stats.get("bundles", 0)} '
+          f'(actualizados {stats.get("updated", 0)}, sin cambios {stats.get("unchanged", 0)}, '
+          f'fallidos {stats.get("failed", 0)})')
+
 
+def _publish(settings, rollback: bool) -> None:
+    """Publica la base de trabajo como snapshot o vuelve al anterior (--publish-now / --rollback-publish)."""
+    from ..database.publish import SnapshotValidationError, publish_snapshot, rollback_snapshot
+    from ..database.session import get_session_factory
 
-def main() -> None:
+    if not settings.publish_dir:
+        raise SystemExit('DB_PUBLISH_DIR no está definido')
+    if rollback:
+        try:
+            pointer = rollback_snapshot(settings.publish_dir)
+        except FileNotFoundError as exc:
+            raise SystemExit(str(exc)) from exc
+        print(f'Snapshot publicado: {pointer["file"]} (anterior: {pointer["previous"]})')
+        return
+    try:
+        with get_session_factory(settings)() as session:
+            summary = publish_snapshot(
+                session, settings.publish_dir, settings.publish_keep, settings.publish_min_bundles,
+            )
+    except SnapshotValidationError as exc:
+        raise SystemExit(f'Snapshot no publicado: {exc}') from exc
+    print(f'Snapshot v{summary["data_version"]}: {summary["bundles"]} bundles en {summary["path"]}'
+          + (' (ya publicado)' if summary['skipped'] else ''))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """
     Punto de entrada principal para ejecutar el spider de Humble Bundle.
-    
+
     Obtiene los bundles desde Humble Bundle, limpia los bundles expirados
-    de la base de datos y persiste los nuevos bundles obtenidos.
-    
+    de la base de datos y persiste los nuevos bundles obtenidos. Toma el
+    mismo lease que la API, por lo que nunca corre en paralelo con otro ETL.
+
+    Args:
+        argv: Argumentos de línea de comandos. Si es None, se usa sys.argv.
+            ``--report text|json`` imprime el informe de rendimiento de la
+            ejecución (con el pico de memoria de tracemalloc); con ``json`` el avance se envía a stderr para que
+            stdout sea JSON válido. ``--export-static DIR`` (o
+            DB_STATIC_EXPORT_DIR) exporta al terminar el snapshot estático
+            de la API en DIR. ``--reparse-stored`` no ejecuta el ETL: vuelve
+            a extraer los detalles del raw_html guardado (reparse_stored_bundles).
+            ``--publish-now`` publica la base de trabajo en DB_PUBLISH_DIR y
+            ``--rollback-publish`` vuelve al snapshot publicado anterior.
+
     Raises:
-        SystemExit: Si ocurre un error al ejecutar el spider.
+        SystemExit: Si ocurre un error al ejecutar el spider o si ya hay
+            un ETL en curso.
     """
+    parser = argparse.ArgumentParser(description='Ejecuta el ETL de Humble Bundle.')
+    parser.add_argument(
+        '--report',
+        choices=('text', 'json'),
+        help='Imprime el informe de rendimiento de la ejecución (etl_run).',
+    )
+    parser.add_argument(
+        '--export-static',
+        metavar='DIR',
+        help='Exporta los endpoints de bundles como JSON estático precomprimido en DIR '
+             '(por defecto DB_STATIC_EXPORT_DIR).',
+    )
+    parser.add_argument(
+        '--reparse-stored',
+        action='store_true',
+        help='No descarga nada: vuelve a extraer precios y libros del raw_html guardado '
+             '(DB_DETAIL_PARSE_WORKERS procesos) y termina.',
+    )
+    parser.add_argument(
+        '--publish-now',
+        action='store_true',
+        help='No ejecuta el ETL: publica la base de datos actual como snapshot en DB_PUBLISH_DIR y termina.',
+    )
+    parser.add_argument(
+        '--rollback-publish',
+        action='store_true',
+        help='Vuelve a publicar el snapshot anterior de DB_PUBLISH_DIR (otra llamada lo deshace) y termina.',
+    )
+    args = parser.parse_args(argv)
+
     settings = get_settings()
-    spider = HumbleSpider()
-    
+    if args.reparse_stored:
+        _reparse_stored(settings)
+        return
+    if args.publish_now or args.rollback_publish:
+        _publish(settings, rollback=args.rollback_publish)
+        return
+
+    if args.report:
+        # El proceso de la CLI solo ejecuta el ETL: el overhead de tracemalloc no afecta a nadie más
+        settings = settings.model_copy(update={'etl_trace_memory': True})
+    runner = EtlJobRunner(settings)
+    output = sys.stderr if args.report == 'json' else sys.stdout
+    progress = partial(_print_progress, file=output)
+
     try:
-        print('Iniciando HumbleSpider...')
-        records = spider.fetch_bundles()
-        print(f'Bundles obtenidos: {len(records)}')
+        job, joined = runner.submit(background=False, progress=progress)
     except HumbleSpiderError as exc:
         raise SystemExit(f'Error ejecutando el spider: {exc}') from exc
 
-    SessionFactory = get_session_factory(settings)
-    with SessionFactory() as session:
-        print('Limpiando bundles expirados...')
-        remove_outdated_bundles(session)
-        print('Persistiendo bundles...')
-        persist_bundles(records, session)
-        
-        # Guardar raw data de landingPage
-        raw_data_record = spider.get_raw_data_record()
-        if raw_data_record:
-            print('Persistiendo raw data de landingPage...')
-            persist_landing_page_raw_data(raw_data_record, session)
-        
-        print('¡Proceso completado exitosamente!')
+    if joined:
+        raise SystemExit(f'Ya hay un ETL en curso (job {job.id}, worker {job.owner})')
+
+    print('¡Proceso completado exitosamente!', file=output)
+
+    export_dir = args.export_static or settings.static_export_dir
+    if export_dir:
+        # FastAPI/pydantic de la API solo se cargan si se pide el export
+        from api.static_export import export_static_snapshot
+        summary = export_static_snapshot(export_dir, settings)
+        print(f'Snapshot estático v{summary["data_version"]}: {summary["files"]} archivos en {summary["path"]}', file=output)
+
+    if args.report:
+        with runner.session_factory() as session:
+            runs = list_etl_runs(session, limit=1, job_id=job.id)
+        if runs:
+            _print_report(runs[0], args.report)
 
 
 if __name__ == '__main__':
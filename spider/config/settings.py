@@ -1,6 +1,12 @@
 from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Directorio images/ del repositorio, montado por la API en /images
+DEFAULT_IMAGES_DIR = str(Path(__file__).resolve().parents[2] / 'images')
+
 
 class Settings(BaseSettings):
     """
@@ -9,11 +15,119 @@ class Settings(BaseSettings):
     Atributos:
         db_path: Ruta al archivo de base de datos SQLite. Por defecto 'humble_bundle.db'.
         sql_echo: Si True, imprime las consultas SQL. Por defecto False.
+        sqlite_wal: Si True, las conexiones de escritura activan el modo WAL
+            (journal_mode=WAL, synchronous=NORMAL): los lectores de la API
+            leen el último commit sin bloquearse mientras el ETL escribe.
+            Por defecto True.
+        sqlite_busy_timeout_ms: Milisegundos que una conexión espera un lock
+            de SQLite antes de fallar con 'database is locked'. Por defecto 5000.
+        read_pool_size: Conexiones de solo lectura (mode=ro, query_only) del
+            pool que usan los endpoints de la API. Por defecto 8.
+        raw_data_cache_max_bytes: Tamaño máximo (en bytes) de la caché en memoria
+            de snapshots de landingPage serializados en la API. Por defecto 64 MiB.
+        compression_min_size: Tamaño mínimo (en bytes) de una respuesta para
+            comprimirla. Por defecto 1024.
+        compression_cache_max_bytes: Tamaño máximo (en bytes) de la caché de
+            cuerpos comprimidos por versión de datos. Por defecto 32 MiB.
+        etl_lease_ttl_seconds: Duración del lease que garantiza un único ETL en
+            ejecución; el job lo renueva mientras corre. Por defecto 300.
+        ranking_size: Número de posiciones guardadas por ranking de bundles
+            al final del ETL. Por defecto 25.
+        metrics_enabled: Si True, la API registra métricas por ruta (latencia,
+            tamaño de respuesta, consultas a la BD), las expone en /metrics y
+            añade el header Server-Timing. Por defecto True.
+        etl_trace_memory: Si True, cada ETL mide su pico de memoria con
+            tracemalloc y lo guarda en etl_run. tracemalloc afecta a todo el
+            proceso (un ETL lanzado con POST /etl/run ralentizaría la API),
+            así que por defecto es False; ``run_spider --report`` lo activa
+            para su ejecución.
+        humble_base_url: Host desde el que el ETL descarga /books y las páginas
+            de detalle. Permite apuntar a un mock local
+            (benchmarks/mock_humble.py). Por defecto https://www.humblebundle.com.
+        http_retries: Reintentos por petición HTTP del ETL ante errores de
+            conexión, 429 y 5xx. Por defecto 3.
+        http_backoff_seconds: Factor de backoff exponencial entre reintentos
+            (429/503 respetan Retry-After). Por defecto 0.5.
+        images_dir: Directorio donde el ETL replica las imágenes de los bundles
+            y que la API sirve en /images. Por defecto images/ del repositorio.
+        image_mirror_enabled: Si True, el ETL descarga tile_image,
+            high_res_tile_image, tile_logo y featured_image a images_dir y la
+            API devuelve rutas locales. Por defecto True.
+        image_workers: Descargas de imágenes simultáneas. Por defecto 8.
+        image_thumbnail_width: Ancho (px) de las miniaturas WebP; requiere
+            Pillow. Por defecto 400.
+        etl_batch_size: Bundles por commit del ETL. Los detalles se descargan,
+            validan y persisten en streaming, así que la memoria del ETL crece
+            con el lote y no con el catálogo. Por defecto 50.
+        store_raw_html: Si True, el HTML de cada página de detalle se guarda
+            en bundle.raw_html; si False se descarta al extraer los datos.
+            Por defecto True.
+        detail_parse_workers: Procesos que parsean las páginas de detalle
+            (BeautifulSoup, tiers y libros) mientras el hilo principal sigue
+            descargando. 0 parsea en el mismo proceso. Por defecto 0.
+        detail_parse_chunk_size: Páginas por tarea enviada a los procesos de
+            parseo. Por defecto 8.
+        response_documents_enabled: Si True, la última etapa del ETL guarda
+            en bundle_document las respuestas JSON ya serializadas de cada
+            bundle y la API las devuelve sin volver a serializar. Por defecto True.
+        read_model_enabled: Si True, cada worker de la API mantiene en memoria
+            un snapshot de los bundles (sin raw_html) y sirve /bundles,
+            /bundles/{id}, by-machine-name, featured y rankings sin consultar
+            la BD. Por defecto False.
+        read_model_refresh_seconds: Cada cuántos segundos la API comprueba la
+            versión de datos para reconstruir el snapshot. Por defecto 2.0.
+        publish_dir: Directorio de publicación blue/green. Si se define, el
+            ETL escribe en db_path (base de trabajo) y al terminar publica un
+            snapshot validado (VACUUM INTO) como v<versión>.db, y la API lee
+            el snapshot que indica current.json: los lectores ven el estado
+            anterior o el nuevo completo, nunca un ETL a medias. Si es None,
+            la API lee db_path directamente. Por defecto None.
+        publish_keep: Snapshots publicados que se conservan (el anterior al
+            actual siempre se conserva para el rollback). Por defecto 3.
+        publish_min_bundles: Bundles mínimos para aceptar un snapshot.
+            Por defecto 1.
+        publish_check_seconds: Cada cuántos segundos la API vuelve a leer
+            current.json. Por defecto 1.0.
+        static_export_dir: Directorio donde run_spider exporta, al terminar
+            cada ETL, el snapshot estático de la API (api/static_export.py).
+            Si es None no se exporta. Por defecto None.
+        static_export_keep: Snapshots estáticos (versiones) que se conservan.
+            Por defecto 3.
     
     Las variables de entorno deben tener el prefijo 'DB_' (ej: DB_DB_PATH).
     """
     db_path: str = 'humble_bundle.db'
     sql_echo: bool = False
+    sqlite_wal: bool = True
+    sqlite_busy_timeout_ms: int = 5000
+    read_pool_size: int = 8
+    raw_data_cache_max_bytes: int = 64 * 1024 * 1024
+    compression_min_size: int = 1024
+    compression_cache_max_bytes: int = 32 * 1024 * 1024
+    etl_lease_ttl_seconds: int = 300
+    ranking_size: int = 25
+    metrics_enabled: bool = True
+    etl_trace_memory: bool = False
+    humble_base_url: str = 'https://www.humblebundle.com'
+    http_retries: int = 3
+    http_backoff_seconds: float = 0.5
+    images_dir: str = DEFAULT_IMAGES_DIR
+    image_mirror_enabled: bool = True
+    image_workers: int = 8
+    image_thumbnail_width: int = 400
+    etl_batch_size: int = 50
+    store_raw_html: bool = True
+    detail_parse_workers: int = 0
+    detail_parse_chunk_size: int = 8
+    response_documents_enabled: bool = True
+    read_model_enabled: bool = False
+    read_model_refresh_seconds: float = 2.0
+    publish_dir: Optional[str] = None
+    publish_keep: int = 3
+    publish_min_bundles: int = 1
+    publish_check_seconds: float = 1.0
+    static_export_dir: Optional[str] = None
+    static_export_keep: int = 3
 
     model_config = SettingsConfigDict(
         env_prefix='DB_',
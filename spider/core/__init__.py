@@ -1,7 +1,22 @@
 """Core del spider: lógica principal y excepciones."""
 
-from .spider import HumbleSpider
 from .errors import HumbleSpiderError
+from .etl import EtlResult, run_etl
+from .instrumentation import EtlInstrumentation
+from .jobs import EtlJobRunner
 
-__all__ = ['HumbleSpider', 'HumbleSpiderError']
+__all__ = ['HumbleSpider', 'HumbleSpiderError', 'EtlResult', 'run_etl', 'EtlJobRunner', 'EtlInstrumentation', 'ImageMirror', 'reparse_stored_bundles']
 
+
+def __getattr__(name):
+    # HumbleSpider arrastra pandas y BeautifulSoup: se importa solo al usarlo
+    if name == 'HumbleSpider':
+        from .spider import HumbleSpider
+        return HumbleSpider
+    if name == 'ImageMirror':
+        from .images import ImageMirror
+        return ImageMirror
+    if name == 'reparse_stored_bundles':
+        from .reparse import reparse_stored_bundles
+        return reparse_stored_bundles
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
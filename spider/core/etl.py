@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import logging
+from concurrent.futures import Future
+from dataclasses import dataclass
+from functools import partial
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from sqlalchemy.orm import Session
+
+from ..config.settings import Settings, get_settings
+from ..database.persistence import (
+    persist_bundles,
+    persist_landing_page_raw_data,
+    remove_outdated_bundles,
+)
+from ..database.documents import materialize_bundle_documents
+from ..database.images import IMAGE_FIELDS
+from ..database.publish import publish_snapshot
+from ..database.rankings import refresh_bundle_rankings
+from ..database.runs import record_etl_run
+from ..database.writer import WriteQueue
+from .instrumentation import EtlInstrumentation
+from .progress import ProgressCallback, _no_progress
+
+if TYPE_CHECKING:
+    from .spider import HumbleSpider
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+@dataclass
+class EtlResult:
+    """Resumen de una ejecución completa del ETL."""
+    bundles_processed: int
+    cleanup_ran: bool
+    raw_data_saved: bool
+    run_id: Optional[str] = None
+    report: Optional[Dict] = None
+
+
+def _batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Agrupa un iterable en listas de hasta ``size`` elementos, sin materializarlo."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, max(size, 1))):
+        yield batch
+
+
+def materialize_response_documents(session: Session) -> Dict[str, Any]:
+    """
+    Serializa las respuestas JSON de cada bundle para la versión de datos actual.
+
+    Guarda en bundle_document el cuerpo de /bundles/{id} y el resumen de
+    ranking de cada bundle (spider/database/documents.py), que la API
+    devuelve sin volver a serializar mientras la versión no cambie. Un fallo
+    al guardarlos no es fatal: la API vuelve a serializar desde la BD. Un
+    error al serializar sí se propaga.
+
+    Args:
+        session: Sesión de SQLAlchemy.
+
+    Returns:
+        Contadores (data_version, documents) o ``{'error': ...}``.
+    """
+    try:
+        return materialize_bundle_documents(session)
+    except RuntimeError as exc:
+        logger.error('No se pudieron guardar los documentos de bundles: %s', exc)
+        return {'error': str(exc)}
+
+
+def _persist_batch(batch: List, instrumentation: EtlInstrumentation, session: Session) -> int:
+    """Operación de escritura de un lote (se ejecuta en el hilo escritor)."""
+    with instrumentation.stage('persist'):
+        return persist_bundles(batch, session)
+
+
+def run_etl(
+    session: Optional[Session],
+    spider: Optional[HumbleSpider] = None,
+    progress: Optional[ProgressCallback] = None,
+    settings: Optional[Settings] = None,
+    job_id: Optional[str] = None,
+    writer: Optional[WriteQueue] = None,
+) -> EtlResult:
+    """
+    Ejecuta el pipeline ETL completo sobre la sesión indicada.
+
+    Obtiene los bundles con HumbleSpider, elimina los bundles expirados,
+    persiste los nuevos/actualizados en lotes de ``etl_batch_size`` a medida
+    que se descargan sus detalles (la memoria queda acotada por el lote),
+    guarda el snapshot del landingPage-json-data, replica sus imágenes en
+    images_dir, recalcula los rankings de bundles y materializa las
+    respuestas JSON de cada bundle. Es el flujo compartido por la CLI y la API.
+    Con ``publish_dir`` la última etapa publica la base de datos como
+    snapshot validado (ver publish_snapshot()); si la validación falla la
+    ejecución falla y la API sigue leyendo el snapshot anterior.
+
+    Cada ejecución, exitosa o fallida, queda registrada en ``etl_run`` con
+    sus tiempos por etapa, descargas, descartes y pico de memoria.
+
+    Todas las escrituras pasan por una WriteQueue (un único hilo y una única
+    conexión de escritura). Cada lote se encola sin esperar, así que el lote
+    siguiente se descarga mientras se escribe el anterior (como mucho hay un
+    lote en escritura y otro en memoria).
+
+    Args:
+        session: Sesión de SQLAlchemy donde se persisten los datos si no se
+            pasa ``writer`` (se usa como la sesión del escritor).
+        spider: Instancia de HumbleSpider a usar. Si es None, se crea una nueva.
+        progress: Callback opcional ``progress(stage, status, **detalles)``
+            que recibe el avance de cada etapa.
+        settings: Configuración a usar. Si es None, se usa get_settings().
+        job_id: Id del etl_job que ejecuta el pipeline, si lo hay.
+        writer: Cola de escritura compartida (p. ej. con el progreso del
+            job). Si es None, se crea una sobre ``session`` y se cierra al final.
+
+    Returns:
+        EtlResult con el número de bundles procesados y el informe de la
+        ejecución.
+
+    Raises:
+        HumbleSpiderError: Si falla la extracción de datos.
+        RuntimeError: Si falla la persistencia.
+    """
+    settings = settings or get_settings()
+    instrumentation = EtlInstrumentation(trace_memory=settings.etl_trace_memory)
+    if spider is None:
+        # pandas/BeautifulSoup solo se importan cuando el ETL realmente corre
+        from .http import build_http_session
+        from .spider import HumbleSpider
+        spider = HumbleSpider(
+            session=build_http_session(settings.http_retries, settings.http_backoff_seconds),
+            instrumentation=instrumentation,
+            base_url=settings.humble_base_url,
+            keep_raw_html=settings.store_raw_html,
+            parse_workers=settings.detail_parse_workers,
+            parse_chunk_size=settings.detail_parse_chunk_size,
+        )
+    else:
+        instrumentation = getattr(spider, 'instrumentation', None) or instrumentation
+    progress = progress or _no_progress
+    own_writer = writer is None
+    if own_writer:
+        writer = WriteQueue(lambda: session, name='etl-writer')
+
+    instrumentation.start()
+    persisted = 0
+    # Solo las URLs de imágenes sobreviven al lote, para la etapa de imágenes
+    image_urls: List[str] = []
+    raw_data_saved = False
+    error: Optional[str] = None
+    try:
+        # Descarga y normaliza el listado; los detalles llegan al consumir el generador
+        stream = spider.iter_bundles(progress=progress)
+
+        progress('cleanup', 'running')
+        with instrumentation.stage('cleanup'):
+            writer.run(remove_outdated_bundles)
+        progress('cleanup', 'done')
+
+        progress('persist', 'running', current=0)
+        pending: Optional[Future] = None
+        for batch in _batched(stream, settings.etl_batch_size):
+            image_urls.extend(url for record in batch for field in IMAGE_FIELDS if (url := getattr(record, field)))
+            if pending is not None:
+                persisted += pending.result()
+                progress('persist', 'running', current=persisted)
+            pending = writer.submit(partial(_persist_batch, batch, instrumentation))
+            del batch
+        if pending is not None:
+            persisted += pending.result()
+        progress('persist', 'done', total=persisted)
+
+        raw_data_record = spider.get_raw_data_record()
+        if raw_data_record:
+            progress('raw_data', 'running')
+            with instrumentation.stage('raw_data'):
+                writer.run(partial(persist_landing_page_raw_data, raw_data_record))
+            raw_data_saved = True
+            progress('raw_data', 'done')
+
+        if settings.image_mirror_enabled and image_urls:
+            progress('images', 'running')
+            with instrumentation.stage('images'):
+                try:
+                    # Pillow y el pool de descargas solo se cargan si la etapa corre
+                    from .images import mirror_bundle_images
+                    image_stats = mirror_bundle_images(image_urls, writer, settings)
+                except Exception as exc:
+                    # Sin imágenes locales la API sigue sirviendo las URLs de origen
+                    logger.warning('Falló la réplica de imágenes: %s', exc)
+                    image_stats = {'error': str(exc)}
+            instrumentation.record_images(image_stats)
+            progress('images', 'done', **{key: value for key, value in image_stats.items() if ':' not in key})
+
+        progress('rankings', 'running')
+        with instrumentation.stage('rankings'):
+            rankings = writer.run(partial(refresh_bundle_rankings, size=settings.ranking_size))
+        progress('rankings', 'done', **rankings)
+
+        if settings.response_documents_enabled:
+            # Última etapa: los documentos quedan con la versión de datos final
+            progress('documents', 'running')
+            with instrumentation.stage('documents'):
+                documents = writer.run(materialize_response_documents)
+            progress('documents', 'done', **documents)
+
+        if settings.publish_dir:
+            progress('publish', 'running')
+            with instrumentation.stage('publish'):
+                published = writer.run(partial(
+                    publish_snapshot,
+                    publish_dir=settings.publish_dir,
+                    keep=settings.publish_keep,
+                    min_bundles=settings.publish_min_bundles,
+                ))
+            progress('publish', 'done', **{key: published[key] for key in ('data_version', 'bundles', 'skipped')})
+    except Exception as exc:
+        error = str(exc)
+        raise
+    finally:
+        instrumentation.stop()
+        report = instrumentation.report()
+        try:
+            run = writer.run(partial(
+                record_etl_run,
+                report=report,
+                status='failed' if error is not None else 'succeeded',
+                job_id=job_id,
+                bundles_processed=persisted,
+                error=error,
+            ))
+        finally:
+            if own_writer:
+                writer.close()
+        logger.info('Informe del ETL: %s', report['stages'].get('total'))
+
+    return EtlResult(
+        bundles_processed=persisted,
+        cleanup_ran=True,
+        raw_data_saved=raw_data_saved,
+        run_id=run.id if run else None,
+        report=report,
+    )
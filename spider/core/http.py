@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Respuestas transitorias que vale la pena reintentar (429 respeta Retry-After)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def build_http_session(retries: int = 3, backoff_seconds: float = 0.5, pool_size: int = 10) -> Session:
+    """
+    Crea una sesión de requests con reintentos y backoff exponencial.
+
+    Los reintentos se aplican a errores de conexión/lectura y a los códigos de
+    RETRY_STATUS_CODES. Para 429/503 se respeta el header ``Retry-After``.
+
+    Args:
+        retries: Número máximo de reintentos por petición (0 los desactiva).
+        backoff_seconds: Factor de backoff: espera backoff * 2^(intento - 1).
+        pool_size: Conexiones keep-alive por host; debe cubrir los hilos que
+            comparten la sesión.
+
+    Returns:
+        Session configurada para http y https.
+    """
+    session = Session()
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_seconds,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({'GET'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def retries_used(response) -> int:
+    """Número de reintentos que necesitó una respuesta de requests (0 si no hubo)."""
+    retry = getattr(getattr(response, 'raw', None), 'retries', None)
+    history = getattr(retry, 'history', None)
+    return len(history) if history else 0
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from requests import RequestException, Session
+from sqlalchemy.orm import Session as DbSession
+
+from ..config.settings import Settings
+from ..database.images import get_image_assets, save_image_assets, touch_bundles_with_images
+from ..database.persistence import reserve_data_version
+from ..database.writer import WriteQueue
+from .http import build_http_session
+
+try:
+    from PIL import Image
+except ImportError:  # Dependencia de requirements.txt; sin ella solo se replican los originales
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+    'image/avif': '.avif',
+    'image/svg+xml': '.svg',
+}
+
+
+class ImageMirror:
+    """
+    Replica imágenes remotas en un directorio local direccionado por contenido.
+
+    Cada imagen se guarda como ``<subdir>/<hh>/<sha256><ext>``: dos URLs con el
+    mismo contenido comparten archivo y un archivo nunca cambia de contenido,
+    así que puede servirse con caché immutable. Con Pillow instalado se generan
+    además una variante WebP a tamaño completo y una miniatura WebP.
+    """
+
+    def __init__(
+        self,
+        images_dir: str,
+        http_session: Optional[Session] = None,
+        workers: int = 8,
+        thumbnail_width: int = 400,
+        subdir: str = 'bundles',
+        timeout: float = 30.0,
+    ) -> None:
+        """
+        Inicializa el replicador.
+
+        Args:
+            images_dir: Directorio raíz de imágenes (el que la API monta en /images).
+            http_session: Sesión de requests compartida por los hilos. Si es
+                None, se crea una con reintentos y un pool de ``workers`` conexiones.
+            workers: Descargas simultáneas.
+            thumbnail_width: Ancho en píxeles de la miniatura WebP.
+            subdir: Subdirectorio de images_dir donde se guardan los archivos.
+            timeout: Timeout por descarga en segundos.
+        """
+        self.root = Path(images_dir)
+        self.http = http_session or build_http_session(pool_size=workers)
+        self.workers = max(1, workers)
+        self.thumbnail_width = thumbnail_width
+        self.subdir = subdir
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._hashes_seen: set = set()
+
+    def mirror(self, urls: Iterable[str], known: Dict[str, object]) -> Tuple[List[Dict], Counter]:
+        """
+        Descarga concurrentemente las URLs que aún no están replicadas.
+
+        Args:
+            urls: URLs de origen (se ignoran vacías y repetidas).
+            known: URL -> registro ya replicado (con ``path``); se saltan las
+                que siguen teniendo su archivo en disco.
+
+        Returns:
+            Tupla (filas para image_asset de las nuevas descargas, contadores
+            downloaded/skipped/deduplicated/failed/bytes/variants).
+        """
+        stats: Counter = Counter()
+        pending = []
+        for url in dict.fromkeys(url for url in urls if url):
+            asset = known.get(url)
+            if asset is not None and (self.root / asset.path).exists():
+                stats['skipped'] += 1
+            else:
+                pending.append(url)
+        if not pending:
+            return [], stats
+
+        results: List[Dict] = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='image-mirror') as pool:
+            for url, outcome in zip(pending, pool.map(self._mirror_one, pending)):
+                if isinstance(outcome, str):
+                    stats['failed'] += 1
+                    stats[f'failed:{outcome}'] += 1
+                    continue
+                payload, deduplicated = outcome
+                stats['downloaded'] += 1
+                stats['bytes'] += payload['size_bytes']
+                stats['variants'] += len(payload['variants'] or {})
+                if deduplicated:
+                    stats['deduplicated'] += 1
+                results.append(payload)
+        return results, stats
+
+    def _mirror_one(self, url: str):
+        """Descarga y guarda una imagen; devuelve (payload, deduplicada) o el motivo del fallo."""
+        try:
+            response = self.http.get(url, timeout=self.timeout)
+        except RequestException:
+            return 'http_error'
+        if response.status_code != 200:
+            return 'http_error'
+        content_type = (response.headers.get('Content-Type') or '').split(';', 1)[0].strip().lower()
+        if not content_type.startswith('image/'):
+            return 'not_an_image'
+
+        data = response.content
+        digest = hashlib.sha256(data).hexdigest()
+        extension = EXTENSIONS.get(content_type) or Path(urlsplit(url).path).suffix.lower() or '.bin'
+        relative = f'{self.subdir}/{digest[:2]}/{digest}{extension}'
+        with self._lock:
+            deduplicated = digest in self._hashes_seen or (self.root / relative).exists()
+            self._hashes_seen.add(digest)
+        if not (self.root / relative).exists():
+            self._write(relative, data)
+
+        width, height, variants = self._variants(data, digest, content_type)
+        return {
+            'source_url': url,
+            'content_hash': digest,
+            'path': relative,
+            'content_type': content_type,
+            'size_bytes': len(data),
+            'width': width,
+            'height': height,
+            'variants': variants,
+            'fetched_at': datetime.utcnow(),
+        }, deduplicated
+
+    def _write(self, relative: str, data: bytes) -> None:
+        """Escritura atómica: un lector nunca ve un archivo a medias."""
+        target = self.root / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=target.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(descriptor, 'wb') as handle:
+                handle.write(data)
+            os.replace(temporary, target)
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
+
+    def _variants(self, data: bytes, digest: str, content_type: str) -> Tuple[Optional[int], Optional[int], Dict[str, str]]:
+        """Genera la variante WebP y la miniatura si Pillow está disponible."""
+        if Image is None or content_type in ('image/svg+xml', 'image/gif'):
+            return None, None, {}
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image.load()
+                width, height = image.size
+                variants: Dict[str, str] = {}
+                if content_type != 'image/webp':
+                    variants['webp'] = self._save_variant(image, f'{digest}.webp')
+                if self.thumbnail_width and width > self.thumbnail_width:
+                    thumbnail = image.copy()
+                    thumbnail.thumbnail((self.thumbnail_width, self.thumbnail_width * height // width))
+                    variants['thumbnail'] = self._save_variant(thumbnail, f'{digest}-w{self.thumbnail_width}.webp')
+                return width, height, variants
+        except (OSError, ValueError) as exc:
+            logger.warning('No se pudieron generar variantes de %s: %s', digest, exc)
+            return None, None, {}
+
+    def _save_variant(self, image, name: str) -> str:
+        relative = f'{self.subdir}/{name[:2]}/{name}'
+        if not (self.root / relative).exists():
+            buffer = io.BytesIO()
+            image.save(buffer, format='WEBP', quality=80, method=4)
+            self._write(relative, buffer.getvalue())
+        return relative
+
+
+def mirror_bundle_images(urls: Iterable[str], writer: WriteQueue, settings: Settings) -> Dict[str, int]:
+    """
+    Etapa del ETL que replica las imágenes de los bundles en images_dir.
+
+    Las URLs ya replicadas (con su archivo en disco) se saltan; las nuevas se
+    descargan en paralelo y se registran en image_asset. Si hubo imágenes
+    nuevas se incrementa la versión de datos para que la API reescriba las
+    URLs de sus respuestas a rutas locales, y los bundles que las usan se
+    marcan como cambiados (row_version) para el feed de cambios. Un fallo de descarga solo se
+    cuenta: las respuestas siguen usando la URL de origen. Las descargas
+    corren en el hilo que llama; solo la consulta y el registro de los
+    assets pasan por la cola de escritura.
+
+    Args:
+        urls: URLs de imágenes (IMAGE_FIELDS) de los bundles persistidos en
+            esta ejecución.
+        writer: Cola de escritura del ETL.
+        settings: Configuración (images_dir, image_workers, image_thumbnail_width).
+
+    Returns:
+        Contadores de la etapa (downloaded, skipped, deduplicated, failed, bytes...).
+    """
+    urls = [url for url in urls if url]
+    mirror = ImageMirror(
+        settings.images_dir,
+        build_http_session(settings.http_retries, settings.http_backoff_seconds, pool_size=settings.image_workers),
+        workers=settings.image_workers,
+        thumbnail_width=settings.image_thumbnail_width,
+    )
+    assets, stats = mirror.mirror(urls, writer.run(lambda session: get_image_assets(session, urls)))
+    if assets:
+        def save(session: DbSession) -> None:
+            # Versión, bundles marcados e imágenes se confirman en el mismo commit
+            row_version = reserve_data_version(session)
+            touch_bundles_with_images(session, [asset['source_url'] for asset in assets], row_version)
+            save_image_assets(session, assets)
+
+        writer.run(save)
+    if Image is None and assets:
+        # Se cuenta en el informe del ETL para que la falta de variantes no pase inadvertida
+        stats['variants_skipped:pillow_missing'] += len(assets)
+        logger.warning(
+            'Pillow no está instalado (pip install -r requirements.txt): %s imágenes replicadas sin miniatura ni WebP',
+            len(assets),
+        )
+    logger.info('Imágenes replicadas: %s', dict(stats))
+    return dict(stats)
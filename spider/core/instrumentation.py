@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import math
+import statistics
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+
+class EtlInstrumentation:
+    """
+    Acumula las métricas de rendimiento de una ejecución del ETL.
+
+    Mide tiempo de pared y de CPU por etapa (una etapa puede ejecutarse
+    varias veces, p. ej. una descarga de detalle por bundle, y se acumula),
+    la latencia y el tamaño de cada descarga HTTP, los descartes por motivo
+    y, opcionalmente, el pico de memoria con tracemalloc.
+
+    El tiempo de CPU de cada etapa es el del hilo que la ejecuta
+    (``time.thread_time``): 'persist' se mide en el hilo escritor y 'fetch'
+    en el del pipeline, sin mezclar el trabajo de otros hilos. El total
+    ('total') es el tiempo de CPU del proceso (``time.process_time``), que
+    suma todos los hilos del ETL; si el ETL corre dentro de la API incluye
+    también las peticiones servidas mientras tanto. No incluye los procesos
+    de parseo (DetailParsePool). El pico de tracemalloc es de todo el proceso.
+    """
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        """
+        Inicializa el acumulador.
+
+        Args:
+            trace_memory: Si True, ``start()`` activa tracemalloc para medir el
+                pico de memoria (añade overhead a cada asignación).
+        """
+        self.trace_memory = trace_memory
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.fetch_latencies: List[float] = []
+        self.fetch_failures: Counter = Counter()
+        self.bytes_downloaded = 0
+        self.retries = 0
+        self.discards: Counter = Counter()
+        self.images: Dict = {}
+        self.peak_memory_bytes: Optional[int] = None
+        self._wall_start = 0.0
+        self._cpu_start = 0.0
+        self._owns_tracemalloc = False
+
+    def start(self) -> None:
+        """Marca el inicio de la ejecución y arranca tracemalloc si corresponde."""
+        self.started_at = datetime.utcnow()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                self._owns_tracemalloc = True
+
+    def stop(self) -> None:
+        """Marca el fin de la ejecución y guarda el pico de memoria."""
+        self.finished_at = datetime.utcnow()
+        self.stages['total'] = {
+            'wall_seconds': time.perf_counter() - self._wall_start,
+            'cpu_seconds': time.process_time() - self._cpu_start,
+            'calls': 1,
+        }
+        if self.trace_memory and tracemalloc.is_tracing():
+            self.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+                self._owns_tracemalloc = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Mide el bloque como una ejecución de la etapa ``name``.
+
+        Args:
+            name: Nombre de la etapa (fetch, normalize, details, validate...).
+        """
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'calls': 0})
+            entry['wall_seconds'] += time.perf_counter() - wall
+            entry['cpu_seconds'] += time.thread_time() - cpu
+            entry['calls'] += 1
+
+    def record_fetch(
+        self,
+        seconds: float,
+        size: int = 0,
+        failure: Optional[str] = None,
+        retries: int = 0,
+    ) -> None:
+        """
+        Registra una descarga HTTP.
+
+        Args:
+            seconds: Latencia de la petición (hasta tener el cuerpo completo,
+                incluidos los reintentos).
+            size: Bytes del cuerpo descargado.
+            failure: Motivo del fallo, si lo hubo (http_error, script_missing...).
+            retries: Reintentos que necesitó la petición.
+        """
+        self.fetch_latencies.append(seconds)
+        self.bytes_downloaded += size
+        self.retries += retries
+        if failure:
+            self.fetch_failures[failure] += 1
+
+    def record_discard(self, reason: str) -> None:
+        """Registra un bundle descartado por el motivo indicado."""
+        self.discards[reason] += 1
+
+    def record_images(self, stats: Dict) -> None:
+        """Registra los contadores de la etapa de réplica de imágenes."""
+        self.images = dict(stats)
+
+    def report(self) -> Dict:
+        """
+        Devuelve el informe de la ejecución como diccionario serializable a JSON.
+
+        Returns:
+            Diccionario con tiempos por etapa, estadísticas de descarga,
+            descartes por motivo, réplica de imágenes y pico de memoria.
+        """
+        latencies = sorted(self.fetch_latencies)
+        fetches = {
+            'requests': len(latencies),
+            'failures': dict(self.fetch_failures),
+            'retries': self.retries,
+            'bytes_downloaded': self.bytes_downloaded,
+        }
+        if latencies:
+            fetches.update({
+                'latency_mean_ms': round(statistics.fmean(latencies) * 1000, 1),
+                'latency_p50_ms': round(_percentile(latencies, 50) * 1000, 1),
+                'latency_p95_ms': round(_percentile(latencies, 95) * 1000, 1),
+                'latency_max_ms': round(latencies[-1] * 1000, 1),
+            })
+        return {
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'stages': {
+                name: {
+                    'wall_seconds': round(entry['wall_seconds'], 4),
+                    'cpu_seconds': round(entry['cpu_seconds'], 4),
+                    'calls': int(entry['calls']),
+                }
+                for name, entry in self.stages.items()
+            },
+            'fetches': fetches,
+            'discards': dict(self.discards),
+            'images': dict(self.images),
+            'peak_memory_bytes': self.peak_memory_bytes,
+        }
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """Percentil por el método nearest-rank sobre una lista ya ordenada."""
+    index = max(0, min(len(sorted_values) - 1, math.ceil(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
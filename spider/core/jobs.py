@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+from datetime import datetime
+from typing import Optional, Tuple
+
+from ..config.settings import Settings, get_settings
+from ..database.jobs import (
+    get_etl_job,
+    release_etl_lease,
+    renew_etl_lease,
+    start_etl_job,
+    update_etl_job,
+)
+from ..database.models import EtlJob
+from ..database.session import get_session_factory
+from ..database.writer import WriteQueue
+from .etl import run_etl
+from .progress import ProgressCallback
+
+logger = logging.getLogger(__name__)
+
+
+def worker_identity() -> str:
+    """Identificador del proceso actual (hostname:pid) usado como dueño del lease."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+class _JobProgress:
+    """
+    Callback de progreso que vuelca el avance del ETL en la fila del job.
+
+    Mantiene en memoria el diccionario ``stages`` y lo reescribe completo en
+    cada actualización (la columna JSON no detecta mutaciones in-place). Las
+    actualizaciones se encolan en el escritor del ETL sin esperar; si varias
+    esperan turno, solo se escribe la última.
+    """
+
+    def __init__(self, writer: WriteQueue, job_id: str, forward: Optional[ProgressCallback] = None) -> None:
+        self.writer = writer
+        self.job_id = job_id
+        self.forward = forward
+        self.stages: dict = {}
+
+    def __call__(self, stage: str, status: str, **details) -> None:
+        now = datetime.utcnow().isoformat()
+        entry = dict(self.stages.get(stage, {}))
+        if 'started_at' not in entry:
+            entry['started_at'] = now
+        if status == 'done':
+            entry['finished_at'] = now
+        entry['status'] = status
+        entry.update({key: value for key, value in details.items() if key != 'machine_name'})
+        self.stages[stage] = entry
+
+        fields = {'stage': stage, 'stages': dict(self.stages)}
+        if stage == 'details':
+            fields['bundles_total'] = details.get('total')
+            fields['bundles_done'] = details.get('current')
+            fields['current_bundle'] = details.get('machine_name')
+        try:
+            self.writer.submit(lambda session: update_etl_job(session, self.job_id, **fields), key='progress')
+        except Exception as exc:
+            # El progreso es informativo: nunca debe abortar el ETL
+            logger.warning('No se pudo actualizar el progreso del job %s: %s', self.job_id, exc)
+
+        if self.forward:
+            self.forward(stage, status, **details)
+
+
+class EtlJobRunner:
+    """
+    Ejecuta el ETL como job en segundo plano protegido por un lease en BD.
+
+    ``submit()`` devuelve inmediatamente el job creado (o el job en curso si
+    otro worker ya tiene el lease) y ejecuta el pipeline en un hilo propio.
+    Mientras el job corre, un hilo de heartbeat renueva el lease cada tercio
+    de su TTL; si el proceso muere, el lease expira y otro worker puede
+    lanzar un nuevo ETL.
+    """
+
+    def __init__(self, settings: Settings | None = None, session_factory=None) -> None:
+        """
+        Inicializa el runner.
+
+        Args:
+            settings: Configuración a usar. Si es None, se usa get_settings().
+            session_factory: sessionmaker a usar. Si es None, se crea uno con
+                get_session_factory(settings).
+        """
+        self.settings = settings or get_settings()
+        self._session_factory = session_factory
+        self.ttl_seconds = self.settings.etl_lease_ttl_seconds
+        self.owner = worker_identity()
+
+    @property
+    def session_factory(self):
+        if self._session_factory is None:
+            self._session_factory = get_session_factory(self.settings)
+        return self._session_factory
+
+    def submit(
+        self,
+        background: bool = True,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Tuple[EtlJob, bool]:
+        """
+        Lanza un ETL o se une al que ya está en curso.
+
+        Args:
+            background: Si True, el pipeline se ejecuta en un hilo daemon y la
+                llamada retorna enseguida. Si False, se ejecuta en el hilo
+                actual y se propagan sus excepciones.
+            progress: Callback adicional que recibe el avance (p. ej. la CLI).
+
+        Returns:
+            Tupla (job, joined). ``joined`` es True si ya había un ETL en curso.
+        """
+        with self.session_factory() as session:
+            job, joined = start_etl_job(session, self.owner, self.ttl_seconds)
+        if joined:
+            logger.info('ETL en curso (job %s), se reutiliza', job.id)
+            return job, True
+
+        if background:
+            thread = threading.Thread(
+                target=self._run,
+                args=(job.id, progress, False),
+                name=f'etl-job-{job.id[:8]}',
+                daemon=True,
+            )
+            thread.start()
+        else:
+            self._run(job.id, progress, True)
+        return self.get(job.id) or job, False
+
+    def get(self, job_id: str) -> Optional[EtlJob]:
+        """Obtiene el estado actual de un job."""
+        with self.session_factory() as session:
+            return get_etl_job(session, job_id)
+
+    def _run(self, job_id: str, progress: Optional[ProgressCallback], reraise: bool) -> None:
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat,
+            args=(job_id, stop),
+            name=f'etl-lease-{job_id[:8]}',
+            daemon=True,
+        )
+        heartbeat.start()
+        # Un único escritor para el pipeline y el estado del job
+        writer = WriteQueue(self.session_factory, name=f'etl-writer-{job_id[:8]}')
+        try:
+            result = run_etl(
+                None,
+                progress=_JobProgress(writer, job_id, progress),
+                settings=self.settings,
+                job_id=job_id,
+                writer=writer,
+            )
+            writer.run(lambda session: update_etl_job(
+                session,
+                job_id,
+                status='succeeded',
+                bundles_processed=result.bundles_processed,
+                current_bundle=None,
+                finished_at=datetime.utcnow(),
+            ))
+        except Exception as exc:
+            logger.exception('ETL job %s falló', job_id)
+            writer.run(lambda session: update_etl_job(
+                session, job_id, status='failed', error=str(exc), finished_at=datetime.utcnow(),
+            ))
+            if reraise:
+                raise
+        finally:
+            stop.set()
+            heartbeat.join()
+            try:
+                writer.run(lambda session: release_etl_lease(session, job_id))
+            finally:
+                writer.close()
+
+    def _heartbeat(self, job_id: str, stop: threading.Event) -> None:
+        # Conexión propia: la renovación del lease no espera detrás de los lotes del ETL
+        interval = max(1.0, self.ttl_seconds / 3)
+        while not stop.wait(interval):
+            try:
+                with self.session_factory() as session:
+                    if not renew_etl_lease(session, job_id, self.ttl_seconds):
+                        logger.warning('El job %s perdió el lease del ETL', job_id)
+                        return
+            except Exception as exc:
+                logger.warning('No se pudo renovar el lease del job %s: %s', job_id, exc)
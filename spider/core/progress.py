@@ -0,0 +1,8 @@
+from typing import Callable
+
+# progress(stage, status, **detalles): notificación opcional del avance del ETL
+ProgressCallback = Callable[..., None]
+
+
+def _no_progress(stage: str, status: str, **details) -> None:
+    return None
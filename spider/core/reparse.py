@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from ..config.settings import Settings, get_settings
+from ..database.models import Bundle
+from ..database.persistence import _comparable, reserve_data_version
+from ..database.publish import publish_snapshot
+from ..database.rankings import refresh_bundle_rankings
+from ..database.similarity import get_bundle_signatures, upsert_bundle_signature
+from ..scrapers.bundle_detail_scraper import BundleDetails
+from ..scrapers.detail_pool import DetailParsePool
+from .etl import materialize_response_documents
+
+logger = logging.getLogger(__name__)
+
+DETAIL_FIELDS = ('price_tiers', 'book_list', 'msrp_total')
+
+
+def _iter_stored_pages(session: Session, ids: List[str], chunk: int) -> Iterator[Tuple[object, Optional[str]]]:
+    """Lee el raw_html guardado por bloques de ids (sin cursores abiertos durante los commits)."""
+    for start in range(0, len(ids), chunk):
+        rows = session.execute(
+            select(Bundle.id, Bundle.machine_name, Bundle.tile_name, Bundle.raw_html, *(
+                getattr(Bundle, field) for field in DETAIL_FIELDS
+            )).where(Bundle.id.in_(ids[start:start + chunk]))
+        ).all()
+        for row in rows:
+            yield row, row.raw_html
+
+
+def _apply_updates(session: Session, updates: List[Tuple[object, BundleDetails]]) -> None:
+    """Guarda un lote de detalles re-parseados y sus firmas MinHash con su versión de datos, en un commit."""
+    row_version = reserve_data_version(session)
+    session.execute(update(Bundle), [
+        {'id': row.id, 'row_version': row_version, **{field: getattr(details, field) for field in DETAIL_FIELDS}}
+        for row, details in updates
+    ])
+    signatures = get_bundle_signatures(session, [row.machine_name for row, _ in updates])
+    for row, details in updates:
+        upsert_bundle_signature(session, row.id, row.machine_name, row.tile_name, details.book_list, known=signatures)
+    session.commit()
+
+
+def reparse_stored_bundles(
+    session: Session,
+    settings: Optional[Settings] = None,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Vuelve a extraer price_tiers, book_list y msrp_total del raw_html guardado.
+
+    Reprocesado sin red: útil cuando cambia la lógica de extracción y hay
+    un corpus grande de HTML en la BD. Las páginas se parsean en un
+    DetailParsePool y solo se escriben los bundles cuyos detalles cambian,
+    por lotes de ``etl_batch_size``; cada lote reserva su versión de datos
+    en su propia transacción. Si alguno cambió se actualizan sus firmas
+    MinHash, se recalculan los rankings y los documentos de respuesta y,
+    con ``publish_dir``, se publica un snapshot nuevo.
+
+    Args:
+        session: Sesión de SQLAlchemy.
+        settings: Configuración. Si es None, se usa get_settings().
+        workers: Procesos de parseo. Si es None, se usa detail_parse_workers.
+        chunk_size: Páginas por tarea. Si es None, se usa detail_parse_chunk_size.
+
+    Returns:
+        Contadores: bundles, updated, unchanged y failed (con failed:<motivo>).
+    """
+    settings = settings or get_settings()
+    workers = settings.detail_parse_workers if workers is None else workers
+    chunk_size = chunk_size or settings.detail_parse_chunk_size
+    batch_size = max(1, settings.etl_batch_size)
+
+    ids = list(session.execute(select(Bundle.id).where(Bundle.raw_html.is_not(None))).scalars())
+    session.rollback()
+    stats: Counter = Counter(bundles=len(ids))
+    updates: List[Tuple[object, BundleDetails]] = []
+    with DetailParsePool(workers, chunk_size) as pool:
+        for row, _, result in pool.parse(_iter_stored_pages(session, ids, batch_size)):
+            if not isinstance(result, BundleDetails):
+                stats['failed'] += 1
+                stats[f'failed:{result}'] += 1
+                logger.warning('No se pudo re-parsear %s: %s', row.machine_name, result)
+                continue
+            if all(_comparable(getattr(row, field)) == _comparable(getattr(result, field)) for field in DETAIL_FIELDS):
+                stats['unchanged'] += 1
+                continue
+            updates.append((row, result))
+            stats['updated'] += 1
+            if len(updates) >= batch_size:
+                _apply_updates(session, updates)
+                updates = []
+    if updates:
+        _apply_updates(session, updates)
+
+    if stats['updated']:
+        refresh_bundle_rankings(session, size=settings.ranking_size)
+        if settings.response_documents_enabled:
+            materialize_response_documents(session)
+        if settings.publish_dir:
+            publish_snapshot(session, settings.publish_dir, settings.publish_keep, settings.publish_min_bundles)
+    logger.info('Re-parseo de raw_html: %s', dict(stats))
+    return dict(stats)
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import logging
-from typing import Dict, List, Optional
+import time
+from typing import Dict, Iterator, List, Optional
 
 import pandas as pd
 from bs4 import BeautifulSoup
@@ -11,8 +11,10 @@ from pydantic import ValidationError
 from requests import Session, exceptions
 
 from ..scrapers.bundle_detail_scraper import BundleDetailScraper
+from ..scrapers.detail_pool import DetailParsePool
 from ..schemas.bundle import BundleRecord
 from ..schemas.raw_data import LandingPageRawDataRecord
+from ..utils import json_codec
 from ..utils.transformers import (
     absolute_url,
     compute_duration_days,
@@ -22,6 +24,9 @@ from ..utils.transformers import (
     safe_float,
 )
 from .errors import HumbleSpiderError
+from .http import retries_used
+from .instrumentation import EtlInstrumentation
+from .progress import ProgressCallback, _no_progress
 
 logger = logging.getLogger(__name__)
 
@@ -49,23 +54,52 @@ class HumbleSpider:
         'tile_logo',
     )
 
-    def __init__(self, session: Session | None = None) -> None:
+    def __init__(
+        self,
+        session: Session | None = None,
+        instrumentation: EtlInstrumentation | None = None,
+        base_url: str | None = None,
+        keep_raw_html: bool = True,
+        parse_workers: int = 0,
+        parse_chunk_size: int = 8,
+    ) -> None:
         """
         Inicializa el spider de Humble Bundle.
 
         Args:
             session: Sesión de requests a usar. Si es None, se crea una nueva.
+            instrumentation: Acumulador de tiempos, descargas y descartes.
+                Si es None, se crea uno sin tracemalloc.
+            base_url: Host de Humble Bundle a consultar (p. ej. un mock local
+                para pruebas de carga). Si es None, se usa el sitio real.
+            keep_raw_html: Si False, el HTML de cada página de detalle se
+                descarta en cuanto se extraen sus datos y no llega a
+                BundleRecord.raw_html.
+            parse_workers: Procesos que parsean las páginas de detalle mientras
+                este hilo sigue descargando (DetailParsePool). 0 parsea aquí.
+            parse_chunk_size: Páginas por tarea enviada a esos procesos.
         """
         self.session = session or Session()
-        self.detail_scraper = BundleDetailScraper(self.session)
+        self.instrumentation = instrumentation or EtlInstrumentation()
+        if base_url:
+            self.URL = f'{base_url.rstrip("/")}/books'
+        self.keep_raw_html = keep_raw_html
+        self.parse_workers = parse_workers
+        self.parse_chunk_size = parse_chunk_size
+        self.detail_scraper = BundleDetailScraper(self.session, self.instrumentation, base_url)
         self._last_raw_payload: Optional[Dict] = None
 
-    def fetch_bundles(self) -> List[BundleRecord]:
+    def fetch_bundles(self, progress: Optional[ProgressCallback] = None) -> List[BundleRecord]:
         """
         Obtiene y procesa todos los bundles disponibles de Humble Bundle.
 
-        Realiza el scraping de la página de Humble Bundle, extrae los datos
-        de los productos, los normaliza y los convierte en registros validados.
+        Equivale a ``list(iter_bundles())``: mantiene todos los registros en
+        memoria. El ETL usa iter_bundles() para persistir por lotes.
+
+        Args:
+            progress: Callback opcional ``progress(stage, status, **detalles)``
+                que recibe el avance por etapa ('fetch', 'normalize', 'details')
+                y por bundle durante la descarga de detalles.
 
         Returns:
             Lista de BundleRecord con los bundles obtenidos y validados.
@@ -73,11 +107,42 @@ class HumbleSpider:
         Raises:
             HumbleSpiderError: Si hay un error al obtener o procesar los datos.
         """
-        payload = self._fetch_raw_payload()
-        self._last_raw_payload = payload
-        products = self._extract_products(payload)
-        frame = self._normalize_products(products)
-        return self._to_records(frame)
+        return list(self.iter_bundles(progress))
+
+    def iter_bundles(self, progress: Optional[ProgressCallback] = None) -> Iterator[BundleRecord]:
+        """
+        Descarga el listado y devuelve un generador de BundleRecord validados.
+
+        El listado se descarga y normaliza al llamar (los errores se lanzan
+        aquí); las páginas de detalle se descargan de una en una a medida que
+        se consume el generador, así que la memoria solo crece con los
+        registros que el consumidor retiene (p. ej. un lote a persistir).
+
+        Args:
+            progress: Callback opcional ``progress(stage, status, **detalles)``.
+
+        Returns:
+            Generador de BundleRecord.
+
+        Raises:
+            HumbleSpiderError: Si hay un error al obtener o procesar el listado.
+        """
+        progress = progress or _no_progress
+        progress('fetch', 'running')
+        with self.instrumentation.stage('fetch'):
+            payload = self._fetch_raw_payload()
+            self._last_raw_payload = payload
+            products = self._extract_products(payload)
+        progress('fetch', 'done', products=len(products))
+
+        progress('normalize', 'running')
+        with self.instrumentation.stage('normalize'):
+            frame = self._normalize_products(products)
+            items = frame.to_dict(orient='records')
+        del frame
+        progress('normalize', 'done')
+
+        return self._iter_records(items, progress)
 
     def get_raw_data_record(self) -> Optional[LandingPageRawDataRecord]:
         """
@@ -93,10 +158,8 @@ class HumbleSpider:
         if not self._last_raw_payload:
             return None
 
-        # Calcular hash del JSON
-        json_str = json.dumps(self._last_raw_payload,
-                              sort_keys=True, ensure_ascii=False)
-        json_hash = hashlib.sha256(json_str.encode('utf-8')).hexdigest()
+        # Hash de la forma canónica (claves ordenadas, compacta): igual con cualquier backend
+        json_hash = hashlib.sha256(json_codec.dumps_bytes(self._last_raw_payload, sort_keys=True)).hexdigest()
 
         return LandingPageRawDataRecord(
             json_data=self._last_raw_payload,
@@ -119,20 +182,24 @@ class HumbleSpider:
             HumbleSpiderError: Si no se puede obtener la página o el script
                 con los datos no se encuentra.
         """
+        started = time.perf_counter()
         try:
             response = self.session.get(self.URL, timeout=30)
             response.raise_for_status()
         except exceptions.RequestException as exc:
+            self.instrumentation.record_fetch(time.perf_counter() - started, failure='http_error')
             logger.exception('Error consultando %s', self.URL)
             raise HumbleSpiderError(
                 'No se pudo obtener la página de Humble Bundle') from exc
+        self.instrumentation.record_fetch(
+            time.perf_counter() - started, len(response.content), retries=retries_used(response))
 
         soup = BeautifulSoup(response.text, 'html.parser')
         script_tag = soup.select_one(f'script#{self.SCRIPT_ID}')
         if not script_tag or not script_tag.string:
             raise HumbleSpiderError(
                 'No se encontró el script con los datos esperados')
-        return json.loads(script_tag.string)
+        return json_codec.loads(script_tag.string)
 
     def _extract_products(self, payload: Dict) -> List[Dict]:
         """
@@ -208,46 +275,72 @@ class HumbleSpider:
 
         return frame
 
-    def _to_records(self, frame: pd.DataFrame) -> List[BundleRecord]:
+    def _iter_records(self, items: List[Dict], progress: Optional[ProgressCallback] = None) -> Iterator[BundleRecord]:
         """
-        Convierte el DataFrame en una lista de BundleRecord validados.
+        Genera los BundleRecord validados de los productos normalizados.
 
-        Para cada producto, obtiene detalles adicionales (precios, libros, imágenes)
-        mediante scraping de la página del bundle y valida los datos usando
-        el schema BundleRecord.
+        Para cada producto descarga su página de detalle y la parsea (precios,
+        libros, MSRP) en un DetailParsePool: con ``parse_workers`` > 0 el
+        parseo corre en otros procesos mientras este hilo sigue descargando.
+        Después valida los datos con el schema BundleRecord. Cada producto se
+        suelta de ``items`` al descargarlo, así que el detalle (y su raw_html)
+        solo vive mientras está en el pool o el consumidor retiene el registro.
 
         Args:
-            frame: DataFrame con productos normalizados.
+            items: Productos normalizados (filas del DataFrame).
+            progress: Callback opcional que recibe el avance por bundle.
 
-        Returns:
-            Lista de BundleRecord validados. Los registros que no pasan la
-            validación se descartan y se registra un warning.
+        Yields:
+            BundleRecord validados. Los registros que no pasan la validación
+            se descartan y se registra un warning.
         """
-        if frame.empty:
-            return []
-        records: List[BundleRecord] = []
+        progress = progress or _no_progress
         discarded = 0
-        for item in frame.to_dict(orient='records'):
-            machine_name = item.get('machine_name')
-            detail = self.detail_scraper.fetch_bundle_details(item.get('product_url'))
-            if detail:
-                item['price_tiers'] = detail.price_tiers
-                item['book_list'] = detail.book_list
-                item['msrp_total'] = detail.msrp_total
-                # Guardar HTML raw para tests
-                item['raw_html'] = detail.raw_html
-                # tile_logo ya viene del JSON inicial, pero verificar que esté normalizado
-                if 'tile_logo' in item and item['tile_logo']:
-                    item['tile_logo'] = absolute_url(item['tile_logo'])
-                    logger.debug('tile_logo extraído para %s: %s', machine_name, item.get('tile_logo'))
-            try:
-                record = BundleRecord.model_validate(item)
-            except ValidationError as exc:
-                discarded += 1
-                logger.warning('Registro descartado %s: %s',
-                               item.get('machine_name'), exc)
-                continue
-            records.append(record)
+        total = len(items)
+        with DetailParsePool(self.parse_workers, self.parse_chunk_size, instrumentation=self.instrumentation) as pool:
+            for item, html, result in pool.parse(self._iter_pages(items, progress)):
+                machine_name = item.get('machine_name')
+                detail = self.detail_scraper.resolve_details(result, item.get('product_url'), html)
+                html = result = None
+                if detail:
+                    item['price_tiers'] = detail.price_tiers
+                    item['book_list'] = detail.book_list
+                    item['msrp_total'] = detail.msrp_total
+                    if self.keep_raw_html:
+                        item['raw_html'] = detail.raw_html
+                    detail = None
+                    # tile_logo ya viene del JSON inicial, pero verificar que esté normalizado
+                    if 'tile_logo' in item and item['tile_logo']:
+                        item['tile_logo'] = absolute_url(item['tile_logo'])
+                        logger.debug('tile_logo extraído para %s: %s', machine_name, item.get('tile_logo'))
+                try:
+                    with self.instrumentation.stage('validate'):
+                        record = BundleRecord.model_validate(item)
+                except ValidationError as exc:
+                    discarded += 1
+                    self.instrumentation.record_discard(_discard_reason(exc))
+                    logger.warning('Registro descartado %s: %s',
+                                   item.get('machine_name'), exc)
+                    continue
+                del item
+                yield record
         if discarded:
             logger.info('Descartados %s registros por validación', discarded)
-        return records
+        progress('details', 'done', total=total, current=total, discarded=discarded)
+
+    def _iter_pages(self, items: List[Dict], progress: ProgressCallback) -> Iterator[tuple]:
+        """Descarga (sin parsear) la página de detalle de cada producto: pares (item, html)."""
+        for index in range(len(items)):
+            item, items[index] = items[index], None
+            progress('details', 'running', total=len(items), current=index, machine_name=item.get('machine_name'))
+            with self.instrumentation.stage('details'):
+                html = self.detail_scraper.fetch_bundle_html(item.get('product_url'))
+            yield item, html
+
+def _discard_reason(exc: ValidationError) -> str:
+    """Motivo de descarte compacto: 'validation:<campo>' del primer error."""
+    errors = exc.errors()
+    if not errors:
+        return 'validation'
+    location = '.'.join(str(part) for part in errors[0].get('loc', ()))
+    return f'validation:{location}' if location else 'validation'
@@ -1,7 +1,34 @@
 """Modelos de base de datos y persistencia."""
 
-from .models import Base, Bundle, LandingPageRawData
-from .session import get_session_factory, build_database_uri
+from .models import (
+    Base,
+    Bundle,
+    BundleDocument,
+    BundleRanking,
+    BundleSignature,
+    BundleTombstone,
+    DataVersion,
+    EtlJob,
+    EtlLease,
+    EtlRun,
+    ImageAsset,
+    LandingPageRawData,
+)
+from .session import (
+    get_session_factory,
+    get_async_session_factory,
+    get_engine,
+    get_async_engine,
+    get_read_session_factory,
+    get_async_read_session_factory,
+    get_read_engine,
+    get_async_read_engine,
+    ensure_schema,
+    dispose_engines,
+    build_database_uri,
+    build_read_only_uri,
+    release_read_engines,
+)
 from .persistence import (
     persist_bundles,
     remove_outdated_bundles,
@@ -9,18 +36,91 @@ from .persistence import (
     ensure_columns,
     persist_landing_page_raw_data,
     ensure_landing_page_raw_data_table,
+    get_data_version,
+    reserve_data_version,
+    bump_data_version,
+)
+from .runs import record_etl_run, list_etl_runs
+from .rankings import RANKING_KINDS, refresh_bundle_rankings
+from .similarity import compute_bundle_signature, get_bundle_signatures, upsert_bundle_signature
+from .images import IMAGE_FIELDS, ImageMap, get_image_assets, save_image_assets, touch_bundles_with_images
+from .documents import DOCUMENT_KINDS, materialize_bundle_documents, render_bundle_documents, replace_bundle_documents
+from .writer import WriteQueue
+from .publish import (
+    SnapshotValidationError,
+    publish_snapshot,
+    rollback_snapshot,
+    read_pointer,
+    resolve_published_db,
+)
+from .jobs import (
+    start_etl_job,
+    renew_etl_lease,
+    release_etl_lease,
+    update_etl_job,
+    get_etl_job,
 )
 
 __all__ = [
     'Base',
     'Bundle',
     'LandingPageRawData',
+    'DataVersion',
+    'EtlJob',
+    'EtlLease',
+    'EtlRun',
+    'BundleRanking',
+    'BundleSignature',
+    'BundleTombstone',
+    'ImageAsset',
+    'BundleDocument',
     'get_session_factory',
+    'get_async_session_factory',
+    'get_engine',
+    'get_async_engine',
+    'get_read_session_factory',
+    'get_async_read_session_factory',
+    'get_read_engine',
+    'get_async_read_engine',
+    'ensure_schema',
+    'dispose_engines',
     'build_database_uri',
+    'build_read_only_uri',
+    'release_read_engines',
     'persist_bundles',
     'remove_outdated_bundles',
     'recreate_database',
     'ensure_columns',
     'persist_landing_page_raw_data',
     'ensure_landing_page_raw_data_table',
+    'get_data_version',
+    'reserve_data_version',
+    'bump_data_version',
+    'start_etl_job',
+    'renew_etl_lease',
+    'release_etl_lease',
+    'update_etl_job',
+    'get_etl_job',
+    'record_etl_run',
+    'list_etl_runs',
+    'RANKING_KINDS',
+    'refresh_bundle_rankings',
+    'compute_bundle_signature',
+    'get_bundle_signatures',
+    'upsert_bundle_signature',
+    'IMAGE_FIELDS',
+    'ImageMap',
+    'get_image_assets',
+    'save_image_assets',
+    'touch_bundles_with_images',
+    'DOCUMENT_KINDS',
+    'replace_bundle_documents',
+    'render_bundle_documents',
+    'materialize_bundle_documents',
+    'WriteQueue',
+    'SnapshotValidationError',
+    'publish_snapshot',
+    'rollback_snapshot',
+    'read_pointer',
+    'resolve_published_db',
 ]
@@ -0,0 +1,105 @@
+from typing import Dict, Iterable, Iterator, Tuple
+
+import logging
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..schemas.responses import BundleResponse, BundleSummaryResponse
+from .images import ImageMap
+from .models import Bundle, BundleDocument
+from .persistence import get_data_version
+
+logger = logging.getLogger(__name__)
+
+# Formas serializadas de cada bundle: respuesta completa y resumen de ranking
+DOCUMENT_KINDS = ('full', 'summary')
+
+
+def replace_bundle_documents(
+    session: Session,
+    data_version: int,
+    documents: Iterable[Tuple[str, str, bytes]],
+    batch_size: int = 200,
+) -> int:
+    """
+    Sustituye los documentos guardados por los de ``data_version``.
+
+    Borra los documentos de cualquier otra versión e inserta los nuevos por
+    lotes, todo en una única transacción: un lector ve los documentos
+    anteriores o los nuevos completos, nunca una mezcla.
+
+    Args:
+        session: Sesión de SQLAlchemy.
+        data_version: Versión de datos a la que corresponden los documentos.
+        documents: Tuplas (bundle_id, kind, body); puede ser un generador.
+        batch_size: Filas por INSERT.
+
+    Returns:
+        Número de documentos guardados.
+
+    Raises:
+        RuntimeError: Si ocurre un error al guardar los documentos.
+    """
+    saved = 0
+    try:
+        session.execute(delete(BundleDocument))
+        batch = []
+        for bundle_id, kind, body in documents:
+            batch.append({'bundle_id': bundle_id, 'data_version': data_version, 'kind': kind, 'body': body})
+            if len(batch) >= batch_size:
+                session.execute(insert(BundleDocument), batch)
+                saved += len(batch)
+                batch = []
+        if batch:
+            session.execute(insert(BundleDocument), batch)
+            saved += len(batch)
+        session.commit()
+    except SQLAlchemyError as exc:
+        session.rollback()
+        raise RuntimeError(f'Error guardando documentos de bundles: {exc}') from exc
+    logger.info('Documentos de bundles materializados: %s (versión %s)', saved, data_version)
+    return saved
+
+
+def render_bundle_documents(session: Session, images: ImageMap) -> Iterator[Tuple[str, str, bytes]]:
+    """
+    Serializa cada bundle guardado en sus dos formas (ver DOCUMENT_KINDS).
+
+    Recorre los bundles por lotes y los libera de la sesión tras
+    serializarlos: solo hay un bundle en memoria a la vez.
+
+    Args:
+        session: Sesión de SQLAlchemy.
+        images: Mapa de imágenes replicadas con el que se localizan las URLs.
+
+    Yields:
+        Tuplas (bundle_id, kind, body) con el JSON en UTF-8.
+    """
+    result = session.execute(select(Bundle).execution_options(yield_per=100))
+    for bundle in result.scalars():
+        yield bundle.id, 'full', images.localize(BundleResponse.model_validate(bundle)).model_dump_json().encode('utf-8')
+        yield bundle.id, 'summary', images.localize(BundleSummaryResponse.model_validate(bundle)).model_dump_json().encode('utf-8')
+        session.expunge(bundle)
+
+
+def materialize_bundle_documents(session: Session) -> Dict[str, int]:
+    """
+    Serializa y guarda los documentos de la versión de datos actual.
+
+    Los bundles se leen y los documentos se sustituyen en la misma
+    transacción, así la versión guardada siempre corresponde a las filas
+    con las que se serializaron.
+
+    Args:
+        session: Sesión de SQLAlchemy.
+
+    Returns:
+        Diccionario con data_version y documents (documentos guardados).
+
+    Raises:
+        RuntimeError: Si ocurre un error al guardar los documentos.
+    """
+    version = get_data_version(session)
+    saved = replace_bundle_documents(session, version, render_bundle_documents(session, ImageMap.load(session, version)))
+    return {'data_version': version, 'documents': saved}
@@ -0,0 +1,135 @@
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, TypeVar
+
+import logging
+from pydantic import BaseModel
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .models import Bundle, ImageAsset
+
+logger = logging.getLogger(__name__)
+
+# Campos de Bundle con URLs de imágenes que se replican
+IMAGE_FIELDS = ('tile_image', 'high_res_tile_image', 'tile_logo', 'featured_image')
+# Prefijo de URL con el que la API sirve las imágenes replicadas
+IMAGES_URL_PREFIX = '/images'
+
+M = TypeVar('M', bound=BaseModel)
+
+
+def get_image_assets(session: Session, urls: Iterable[str]) -> Dict[str, ImageAsset]:
+    """
+    Obtiene las imágenes ya replicadas para las URLs indicadas.
+
+    Args:
+        session: Sesión de SQLAlchemy.
+        urls: URLs de origen a consultar.
+
+    Returns:
+        Diccionario URL de origen -> ImageAsset (solo las que existen).
+    """
+    urls = list(dict.fromkeys(url for url in urls if url))
+    assets: Dict[str, ImageAsset] = {}
+    # SQLite limita el número de parámetros por consulta
+    for start in range(0, len(urls), 500):
+        chunk = urls[start:start + 500]
+        for asset in session.execute(select(ImageAsset).where(ImageAsset.source_url.in_(chunk))).scalars():
+            assets[asset.source_url] = asset
+    return assets
+
+
+def save_image_assets(session: Session, assets: List[Dict]) -> None:
+    """
+    Crea o actualiza las filas de image_asset en una sola transacción.
+
+    Args:
+        session: Sesión de SQLAlchemy.
+        assets: Diccionarios con las columnas de ImageAsset.
+
+    Raises:
+        RuntimeError: Si ocurre un error al guardar en la BD.
+    """
+    try:
+        for payload in assets:
+            session.merge(ImageAsset(**payload))
+        session.commit()
+    except SQLAlchemyError as exc:
+        session.rollback()
+        raise RuntimeError(f'Error guardando imágenes replicadas: {exc}') from exc
+
+
+def touch_bundles_with_images(session: Session, urls: Iterable[str], row_version: int) -> int:
+    """
+    Marca con ``row_version`` los bundles que usan alguna de las imágenes.
+
+    Una imagen recién replicada cambia la respuesta del bundle (URL local y
+    ``images``) sin cambiar su fila; así el feed de cambios lo vuelve a enviar.
+
+    Args:
+        session: Sesión de SQLAlchemy (el commit lo hace quien llama).
+        urls: URLs de origen de las imágenes replicadas.
+        row_version: Versión de datos de la operación (reserve_data_version()).
+
+    Returns:
+        Bundles marcados.
+    """
+    urls = list(dict.fromkeys(url for url in urls if url))
+    touched = 0
+    # Cada URL se compara con los cuatro campos: 200 por consulta (800 parámetros)
+    for start in range(0, len(urls), 200):
+        chunk = urls[start:start + 200]
+        result = session.execute(
+            update(Bundle)
+            .where(or_(*(getattr(Bundle, field).in_(chunk) for field in IMAGE_FIELDS)))
+            .values(row_version=row_version)
+        )
+        touched += result.rowcount
+    return touched
+
+
+class ImageMap:
+    """
+    Traduce URLs de imágenes de origen a sus copias replicadas.
+
+    Se construye desde image_asset una vez por versión de datos (la etapa de
+    imágenes la incrementa), así que reescribir una respuesta es una búsqueda
+    en un diccionario por campo de imagen. Los bundles cuyas imágenes no se
+    replicaron conservan las URLs de origen.
+
+    Args:
+        rows: Filas con source_url, path y variants de image_asset.
+        data_version: Versión de datos con la que se construyó.
+    """
+
+    def __init__(self, rows: Sequence[Any], data_version: int = 0) -> None:
+        self.data_version = data_version
+        self._assets: Dict[str, Tuple[str, Dict[str, str]]] = {}
+        for row in rows:
+            local = f'{IMAGES_URL_PREFIX}/{row.path}'
+            variants = {'original': local}
+            variants.update({name: f'{IMAGES_URL_PREFIX}/{path}' for name, path in (row.variants or {}).items()})
+            self._assets[row.source_url] = (local, variants)
+
+    @classmethod
+    def load(cls, session: Session, data_version: int = 0) -> 'ImageMap':
+        """Construye el mapa con todas las filas de image_asset."""
+        return cls(session.execute(select(ImageAsset.source_url, ImageAsset.path, ImageAsset.variants)).all(), data_version)
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    def localize(self, model: M) -> M:
+        """Devuelve ``model`` con sus campos de imagen apuntando a las copias locales."""
+        update: Dict[str, Any] = {}
+        variants: Dict[str, Dict[str, str]] = {}
+        for field in IMAGE_FIELDS:
+            url = getattr(model, field, None)
+            asset = self._assets.get(url) if url else None
+            if asset is not None:
+                update[field], variants[field] = asset
+        if not update:
+            return model
+        if 'images' in type(model).model_fields:
+            update['images'] = variants
+        return model.model_copy(update=update)
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+import logging
+from sqlalchemy import or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .models import EtlJob, EtlLease
+
+logger = logging.getLogger(__name__)
+
+ETL_LEASE_NAME = 'etl'
+
+
+def start_etl_job(session: Session, owner: str, ttl_seconds: int) -> Tuple[EtlJob, bool]:
+    """
+    Crea un job de ETL tomando el lease global, o se une al job en curso.
+
+    La toma del lease es un UPDATE condicional (lease libre o expirado) que
+    se confirma en la misma transacción que el INSERT del job, por lo que
+    dos workers que disparan el ETL a la vez nunca obtienen ambos el lease.
+    Si el lease anterior expiró (worker caído), su job se marca como fallido.
+
+    Args:
+        session: Sesión de SQLAlchemy para la transacción.
+        owner: Identificador del worker (hostname:pid).
+        ttl_seconds: Duración del lease antes de tener que renovarlo.
+
+    Returns:
+        Tupla (job, joined). ``joined`` es True si ya había un ETL en curso y
+        se devuelve ese job en lugar de crear uno nuevo.
+    """
+    now = datetime.utcnow()
+    session.execute(
+        sqlite_insert(EtlLease).values(name=ETL_LEASE_NAME).on_conflict_do_nothing()
+    )
+    previous = session.execute(
+        select(EtlLease.job_id).where(EtlLease.name == ETL_LEASE_NAME)
+    ).scalar_one_or_none()
+
+    job = EtlJob(status='running', owner=owner, stages={}, created_at=now, started_at=now, updated_at=now)
+    session.add(job)
+    session.flush()
+
+    acquired = session.execute(
+        update(EtlLease)
+        .where(
+            EtlLease.name == ETL_LEASE_NAME,
+            or_(EtlLease.job_id.is_(None), EtlLease.expires_at < now),
+        )
+        .values(job_id=job.id, owner=owner, expires_at=now + timedelta(seconds=ttl_seconds))
+    ).rowcount == 1
+
+    if not acquired:
+        session.rollback()
+        holder = session.get(EtlJob, previous) if previous else None
+        if holder is None:
+            # El lease cambió de dueño entre la lectura y el UPDATE
+            holder_id = session.execute(
+                select(EtlLease.job_id).where(EtlLease.name == ETL_LEASE_NAME)
+            ).scalar_one_or_none()
+            holder = session.get(EtlJob, holder_id) if holder_id else None
+        if holder is None:
+            raise RuntimeError('No se pudo tomar el lease del ETL ni encontrar el job en curso')
+        return holder, True
+
+    if previous:
+        session.execute(
+            update(EtlJob)
+            .where(EtlJob.id == previous, EtlJob.status.in_(('queued', 'running')))
+            .values(status='failed', error='Lease expirado: el worker dejó de responder',
+                    finished_at=now, updated_at=now)
+        )
+    session.commit()
+    return job, False
+
+
+def renew_etl_lease(session: Session, job_id: str, ttl_seconds: int) -> bool:
+    """
+    Extiende el lease del ETL mientras el job sigue ejecutándose.
+
+    Args:
+        session: Sesión de SQLAlchemy para la transacción.
+        job_id: Job que posee el lease.
+        ttl_seconds: Nueva duración del lease desde ahora.
+
+    Returns:
+        True si el lease sigue perteneciendo al job, False si lo perdió.
+    """
+    result = session.execute(
+        update(EtlLease)
+        .where(EtlLease.name == ETL_LEASE_NAME, EtlLease.job_id == job_id)
+        .values(expires_at=datetime.utcnow() + timedelta(seconds=ttl_seconds))
+    )
+    session.commit()
+    return result.rowcount == 1
+
+
+def release_etl_lease(session: Session, job_id: str) -> None:
+    """
+    Libera el lease del ETL si sigue perteneciendo al job indicado.
+
+    Args:
+        session: Sesión de SQLAlchemy para la transacción.
+        job_id: Job que posee el lease.
+    """
+    session.execute(
+        update(EtlLease)
+        .where(EtlLease.name == ETL_LEASE_NAME, EtlLease.job_id == job_id)
+        .values(job_id=None, owner=None, expires_at=None)
+    )
+    session.commit()
+
+
+def update_etl_job(session: Session, job_id: str, **fields) -> None:
+    """
+    Actualiza campos de un job de ETL y hace commit.
+
+    Args:
+        session: Sesión de SQLAlchemy para la transacción.
+        job_id: Identificador del job.
+        **fields: Columnas de EtlJob a actualizar.
+    """
+    fields.setdefault('updated_at', datetime.utcnow())
+    session.execute(update(EtlJob).where(EtlJob.id == job_id).values(**fields))
+    session.commit()
+
+
+def get_etl_job(session: Session, job_id: str) -> Optional[EtlJob]:
+    """
+    Obtiene un job de ETL por su identificador.
+
+    Args:
+        session: Sesión de SQLAlchemy.
+        job_id: Identificador del job.
+
+    Returns:
+        EtlJob o None si no existe.
+    """
+    return session.get(EtlJob, job_id)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Float, JSON, String, UniqueConstraint
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, JSON, LargeBinary, String, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from uuid import uuid4
 
@@ -57,6 +57,8 @@ class Bundle(Base):
     featured_image = Column(String)  # URL de imagen destacada extraída de div.img-container
     msrp_total = Column(Float)
     raw_html = Column(String)  # HTML raw del bundle para tests
+    # Versión de datos del último cambio visible del bundle (feed /bundles/changes); 0 = anterior al feed
+    row_version = Column(Integer, nullable=False, default=0, server_default='0', index=True)
 
 
 class LandingPageRawData(Base):
@@ -76,3 +78,191 @@ class LandingPageRawData(Base):
     source_url = Column(String, nullable=False)
     json_hash = Column(String, nullable=True, index=True)
     json_version = Column(String, nullable=True)
+
+
+class DataVersion(Base):
+    """
+    Contador monotónico de la versión de los datos publicados.
+
+    Tiene una única fila (id=1) cuyo campo version se incrementa cada vez que
+    la persistencia modifica bundles o snapshots. La API lo usa como clave de
+    sus cachés para invalidarlas al terminar cada ETL.
+    """
+    __tablename__ = 'data_version'
+    __table_args__ = ()
+
+    id = Column(Integer, primary_key=True, default=1)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class EtlJob(Base):
+    """
+    Modelo ORM para una ejecución del ETL lanzada en segundo plano.
+
+    Guarda el estado del job (queued/running/succeeded/failed), la etapa
+    actual, el avance por etapa en ``stages`` y el avance por bundle durante
+    la descarga de detalles. Al estar en la base de datos, cualquier worker
+    de la API puede consultar el estado de un job lanzado por otro.
+    """
+    __tablename__ = 'etl_job'
+    __table_args__ = ()
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()), index=True)
+    status = Column(String, nullable=False, default='queued', index=True)
+    stage = Column(String)
+    stages = Column(JSON)  # {stage: {'status', 'started_at', 'finished_at', ...}}
+    bundles_total = Column(Integer)
+    bundles_done = Column(Integer, default=0)
+    current_bundle = Column(String)
+    bundles_processed = Column(Integer)
+    error = Column(String)
+    owner = Column(String)  # hostname:pid del worker que ejecuta el job
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class EtlRun(Base):
+    """
+    Modelo ORM del registro histórico de ejecuciones del ETL.
+
+    Cada ejecución (exitosa o fallida) guarda sus métricas de rendimiento:
+    tiempos de pared/CPU, volumen descargado, descartes y pico de memoria.
+    Las columnas escalares permiten comparar ejecuciones con SQL; el informe
+    completo (tiempos por etapa, latencias de descarga) queda en ``report``.
+    """
+    __tablename__ = 'etl_run'
+    __table_args__ = ()
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()), index=True)
+    job_id = Column(String, index=True)
+    status = Column(String, nullable=False)  # succeeded | failed
+    error = Column(String)
+    started_at = Column(DateTime, nullable=False, index=True)
+    finished_at = Column(DateTime)
+    wall_seconds = Column(Float)
+    cpu_seconds = Column(Float)
+    bundles_processed = Column(Integer)
+    bundles_discarded = Column(Integer)
+    requests = Column(Integer)
+    bytes_downloaded = Column(Integer)
+    peak_memory_bytes = Column(Integer)
+    report = Column(JSON)  # EtlInstrumentation.report()
+
+
+class EtlLease(Base):
+    """
+    Lease en base de datos que garantiza un único ETL en ejecución.
+
+    Una fila por nombre de lease; ``job_id`` es el job que la posee y
+    ``expires_at`` el instante a partir del cual otro worker puede tomarla
+    (el dueño la renueva periódicamente mientras el job sigue vivo).
+    """
+    __tablename__ = 'etl_lease'
+    __table_args__ = ()
+
+    name = Column(String, primary_key=True)
+    job_id = Column(String)
+    owner = Column(String)
+    expires_at = Column(DateTime)
+
+
+class BundleRanking(Base):
+    """
+    Modelo ORM para los rankings de bundles precalculados al final del ETL.
+
+    Cada fila es la posición ``position`` del ranking ``kind`` (featured,
+    best_value, ending_soon, ...). La clave primaria (kind, position) permite
+    servir un ranking completo con una lectura por rango de la PK.
+    """
+    __tablename__ = 'bundle_ranking'
+    __table_args__ = ()
+
+    kind = Column(String, primary_key=True)
+    position = Column(Integer, primary_key=True)
+    bundle_id = Column(String, nullable=False)
+    score = Column(Float)
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class BundleSignature(Base):
+    """
+    Modelo ORM de la firma MinHash del conjunto de libros de cada bundle.
+
+    La clave es ``machine_name`` y las filas no se borran al expirar el
+    bundle, así que el índice de similitud cubre todo el histórico.
+    ``signature`` son NUM_PERM enteros uint32 (512 bytes); ``tokens_hash``
+    permite saltarse el recálculo cuando los libros del bundle no cambian.
+    """
+    __tablename__ = 'bundle_signature'
+    __table_args__ = ()
+
+    machine_name = Column(String, primary_key=True)
+    bundle_id = Column(String, index=True)
+    tile_name = Column(String)
+    token_count = Column(Integer, nullable=False)
+    tokens_hash = Column(String, nullable=False)
+    signature = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ImageAsset(Base):
+    """
+    Modelo ORM de una imagen de bundle replicada localmente.
+
+    Una fila por URL de origen. ``path`` es relativo al directorio de imágenes
+    y su nombre es el SHA-256 del contenido, así que dos URLs con la misma
+    imagen comparten archivo y los archivos nunca cambian (caché immutable).
+    ``variants`` guarda las rutas de las variantes generadas (webp, thumbnail).
+    """
+    __tablename__ = 'image_asset'
+    __table_args__ = ()
+
+    source_url = Column(String, primary_key=True)
+    content_hash = Column(String, nullable=False, index=True)
+    path = Column(String, nullable=False)
+    content_type = Column(String)
+    size_bytes = Column(Integer)
+    width = Column(Integer)
+    height = Column(Integer)
+    variants = Column(JSON)
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class BundleTombstone(Base):
+    """
+    Modelo ORM del registro de bundles eliminados (tombstones).
+
+    Una fila por bundle borrado de la tabla bundle, con la versión de datos
+    en la que se borró. Permite a los clientes que replican el catálogo con
+    ``GET /bundles/changes`` borrar también los bundles que ya no existen.
+    """
+    __tablename__ = 'bundle_tombstone'
+    __table_args__ = ()
+
+    bundle_id = Column(String, primary_key=True)
+    machine_name = Column(String, nullable=False)
+    version = Column(Integer, nullable=False, index=True)
+    reason = Column(String, nullable=False)  # expired
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class BundleDocument(Base):
+    """
+    Modelo ORM de las respuestas JSON de un bundle serializadas al final del ETL.
+
+    Una fila por bundle, versión de datos y forma (``full`` es el cuerpo de
+    /bundles/{id}; ``summary`` el bundle de cada entrada de un ranking). La
+    API devuelve ``body`` tal cual si ``data_version`` coincide con la versión
+    actual, sin cargar el bundle ni volver a serializarlo. Solo se conservan
+    los documentos de la última versión materializada.
+    """
+    __tablename__ = 'bundle_document'
+    __table_args__ = ()
+
+    bundle_id = Column(String, primary_key=True)
+    data_version = Column(Integer, primary_key=True)
+    kind = Column(String, primary_key=True)
+    body = Column(LargeBinary, nullable=False)
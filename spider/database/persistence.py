@@ -1,19 +1,37 @@
-from datetime import datetime
-from typing import Iterable
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
 
 import logging
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import inspect, select, text, update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from ..config.settings import Settings
 from ..schemas.bundle import BundleRecord
 from ..schemas.raw_data import LandingPageRawDataRecord
-from .models import Base, Bundle, LandingPageRawData
-from .session import build_database_uri
+from ..utils.events import change_hub
+from .models import Bundle, BundleTombstone, DataVersion, LandingPageRawData
+from .similarity import get_bundle_signatures, upsert_bundle_signature
 
 logger = logging.getLogger(__name__)
 
+# Campos que cambian en cada ejecución y no cuentan como cambio del bundle
+VOLATILE_FIELDS = frozenset({'id', 'verification_date'})
+
+
+def _comparable(value: Any) -> Any:
+    """Normaliza fechas con zona horaria a UTC naive (como las devuelve SQLite)."""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _publish_changes(changes: List[Tuple[str, Dict[str, Any]]], data_version: int) -> None:
+    """Publica en el hub de eventos los cambios acumulados de una operación."""
+    for event_type, data in changes:
+        change_hub.publish(event_type, {**data, 'data_version': data_version})
+
 
 def ensure_landing_page_raw_data_table(engine) -> None:
     """
@@ -80,6 +98,9 @@ def ensure_columns(engine) -> None:
         statements.append('ALTER TABLE bundle ADD COLUMN msrp_total REAL')
     if 'raw_html' not in columns:
         statements.append('ALTER TABLE bundle ADD COLUMN raw_html TEXT')
+    if 'row_version' not in columns:
+        statements.append('ALTER TABLE bundle ADD COLUMN row_version INTEGER NOT NULL DEFAULT 0')
+        statements.append('CREATE INDEX IF NOT EXISTS ix_bundle_row_version ON bundle (row_version)')
     
     for stmt in statements:
         try:
@@ -90,38 +111,162 @@ def ensure_columns(engine) -> None:
             logger.warning('Error agregando columna %s: %s', stmt, exc)
 
 
-def persist_bundles(records: Iterable[BundleRecord], session: Session) -> None:
+def get_data_version(session: Session) -> int:
+    """
+    Obtiene la versión actual de los datos publicados.
+
+    Args:
+        session: Sesión de SQLAlchemy.
+
+    Returns:
+        Número de versión actual, 0 si nunca se ha persistido nada.
+    """
+    version = session.execute(select(DataVersion.version).where(DataVersion.id == 1)).scalar_one_or_none()
+    return version or 0
+
+
+def reserve_data_version(session: Session) -> int:
+    """
+    Incrementa la versión de datos dentro de la transacción en curso, sin commit.
+
+    El UPDATE ... RETURNING toma el bloqueo de escritura de SQLite hasta el
+    commit, así que dos escritores nunca reciben la misma versión. Quien
+    llama marca con ella las filas que modifica (``bundle.row_version``,
+    ``bundle_tombstone.version``) y hace commit: la versión y las filas se
+    hacen visibles juntas y el feed de cambios nunca se salta una fila.
+
+    Args:
+        session: Sesión de SQLAlchemy con la transacción de la operación.
+
+    Returns:
+        La nueva versión (aún sin confirmar).
+    """
+    now = datetime.utcnow()
+    version = session.execute(
+        update(DataVersion)
+        .where(DataVersion.id == 1)
+        .values(version=DataVersion.version + 1, updated_at=now)
+        .returning(DataVersion.version)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    if version is None:
+        session.add(DataVersion(id=1, version=1, updated_at=now))
+        session.flush()
+        version = 1
+    return version
+
+
+def bump_data_version(session: Session) -> int:
+    """
+    Incrementa la versión de los datos publicados y hace commit.
+
+    Para operaciones que no marcan filas con la versión; las que sí lo hacen
+    usan reserve_data_version() antes de su commit.
+
+    Args:
+        session: Sesión de SQLAlchemy para la transacción.
+
+    Returns:
+        La nueva versión.
+    """
+    version = reserve_data_version(session)
+    session.commit()
+    return version
+
+
+def persist_bundles(
+    records: Iterable[BundleRecord],
+    session: Session,
+    batch_size: Optional[int] = None,
+) -> int:
     """
     Persiste los bundles en la base de datos SQLite.
     
     Inserta o actualiza los bundles usando machine_name como clave única.
-    Para SQLite, usa INSERT OR REPLACE.
+    Los registros se procesan por lotes de ``batch_size``: por lote se
+    cargan con una consulta los bundles y firmas existentes y se hace un
+    único commit, tras el cual el lote se suelta. Como ``records`` puede ser
+    un generador, la memoria queda acotada por el tamaño del lote. Cada
+    bundle actualiza también su firma MinHash en bundle_signature. Cada lote
+    reserva su propia versión de datos en su transacción y los bundles nuevos
+    o con cambios (sin contar VOLATILE_FIELDS) quedan con ``row_version``
+    igual a ella. Tras cada commit publica en el hub de eventos un evento
+    'inserted' por bundle nuevo y 'updated' (con la lista de campos
+    cambiados) por bundle modificado.
     
     Args:
         records: Iterable de BundleRecord a persistir.
         session: Sesión de SQLAlchemy para la transacción.
+        batch_size: Registros por commit. Si es None, todos en un único commit.
         
+    Returns:
+        Número de bundles persistidos.
+
     Raises:
         RuntimeError: Si ocurre un error al guardar los bundles en la BD.
     """
+    persisted = 0
+    batch: List[BundleRecord] = []
     for record in records:
-        payload = record.to_orm_payload()
-        try:
-            # Buscar si ya existe un bundle con el mismo machine_name
-            existing = session.query(Bundle).filter(Bundle.machine_name == payload['machine_name']).first()
+        batch.append(record)
+        if batch_size and len(batch) >= batch_size:
+            persisted += _persist_batch(batch, session)
+            batch = []
+    if batch:
+        persisted += _persist_batch(batch, session)
+    return persisted
+
+
+def _persist_batch(batch: List[BundleRecord], session: Session) -> int:
+    """Upsert de un lote de bundles (y sus firmas) con su versión de datos, en una sola transacción."""
+    payloads = [record.to_orm_payload() for record in batch]
+    names = [payload['machine_name'] for payload in payloads]
+    changes: List[Tuple[str, Dict[str, Any]]] = []
+    try:
+        row_version = reserve_data_version(session)
+        # Una consulta por lote en vez de un SELECT por bundle
+        existing_by_name = {
+            bundle.machine_name: bundle
+            for bundle in session.execute(select(Bundle).where(Bundle.machine_name.in_(names))).scalars()
+        }
+        signatures = get_bundle_signatures(session, names)
+        for payload in payloads:
+            existing = existing_by_name.get(payload['machine_name'])
             if existing:
                 # Actualizar el bundle existente
+                changed = []
                 for key, value in payload.items():
                     if key != 'id':  # No actualizar el ID
+                        if key not in VOLATILE_FIELDS and _comparable(getattr(existing, key)) != _comparable(value):
+                            changed.append(key)
                         setattr(existing, key, value)
+                if changed:
+                    existing.row_version = row_version
+                    changes.append(('updated', {
+                        'id': existing.id,
+                        'machine_name': existing.machine_name,
+                        'changed': changed,
+                    }))
             else:
-                # Insertar nuevo bundle
-                bundle = Bundle(**payload)
-                session.add(bundle)
-            session.commit()
-        except SQLAlchemyError as exc:
-            session.rollback()
-            raise RuntimeError(f'Error guardando bundles: {exc}') from exc
+                # Insertar nuevo bundle (id asignado aquí para no hacer flush por fila)
+                existing = Bundle(**{**payload, 'id': str(uuid4()), 'row_version': row_version})
+                session.add(existing)
+                existing_by_name[existing.machine_name] = existing
+                changes.append(('inserted', {'id': existing.id, 'machine_name': existing.machine_name}))
+            # Firma MinHash de los libros, en la misma transacción que el bundle
+            upsert_bundle_signature(
+                session, existing.id, existing.machine_name, existing.tile_name, existing.book_list,
+                known=signatures,
+            )
+        session.commit()
+    except SQLAlchemyError as exc:
+        session.rollback()
+        raise RuntimeError(f'Error guardando bundles: {exc}') from exc
+    # Los objetos ya están en la BD: soltarlos de la sesión libera su raw_html
+    for instance in (*existing_by_name.values(), *signatures.values()):
+        session.expunge(instance)
+    _publish_changes(changes, row_version)
+    return len(payloads)
 
 
 def persist_landing_page_raw_data(record: LandingPageRawDataRecord, session: Session) -> None:
@@ -142,6 +287,7 @@ def persist_landing_page_raw_data(record: LandingPageRawDataRecord, session: Ses
     try:
         landing_page_raw_data = LandingPageRawData(**payload)
         session.add(landing_page_raw_data)
+        reserve_data_version(session)
         session.commit()
         logger.info('Raw data de landingPage guardado exitosamente')
     except SQLAlchemyError as exc:
@@ -154,14 +300,32 @@ def remove_outdated_bundles(session: Session) -> None:
     Elimina los bundles que han expirado de la base de datos.
     
     Un bundle se considera expirado si su fecha de fin (end_date_datetime)
-    es anterior a la fecha/hora actual.
+    es anterior a la fecha/hora actual. Cada bundle eliminado deja un
+    tombstone en bundle_tombstone (en la misma transacción) y un evento
+    'expired' en el hub de eventos.
     
     Args:
         session: Sesión de SQLAlchemy para la transacción.
     """
     current_time = datetime.utcnow()
-    session.query(Bundle).filter(Bundle.end_date_datetime < current_time).delete(synchronize_session=False)
+    expired = session.execute(
+        select(Bundle.id, Bundle.machine_name).where(Bundle.end_date_datetime < current_time)
+    ).all()
+    if not expired:
+        return
+    version = reserve_data_version(session)
+    session.query(Bundle).filter(Bundle.id.in_([row.id for row in expired])).delete(synchronize_session=False)
+    session.add_all(
+        BundleTombstone(
+            bundle_id=row.id, machine_name=row.machine_name, version=version, reason='expired', deleted_at=current_time,
+        )
+        for row in expired
+    )
     session.commit()
+    _publish_changes(
+        [('expired', {'id': row.id, 'machine_name': row.machine_name}) for row in expired],
+        version,
+    )
 
 
 def recreate_database(settings: Settings, drop_existing: bool = True) -> None:
@@ -176,16 +340,15 @@ def recreate_database(settings: Settings, drop_existing: bool = True) -> None:
     
     db_path = Path(settings.db_path)
     
+    # Importar aquí para evitar importaciones circulares
+    from .session import dispose_engines, ensure_schema
+
+    # Los engines del registro apuntan al archivo anterior
+    dispose_engines()
     if drop_existing and db_path.exists():
         logger.info('Eliminando base de datos existente: %s', settings.db_path)
         db_path.unlink()
     
-    uri = build_database_uri(settings)
-    engine = create_engine(uri, echo=settings.sql_echo, future=True, connect_args={'check_same_thread': False})
-    
     logger.info('Creando tablas...')
-    # Usar checkfirst=True para evitar conflictos
-    Base.metadata.create_all(engine, checkfirst=True)
-    ensure_columns(engine)
-    ensure_landing_page_raw_data_table(engine)
+    ensure_schema(settings, force=True)
     logger.info('Base de datos recreada exitosamente')
@@ -0,0 +1,213 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+import json
+import logging
+import os
+import sqlite3
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Directorio de publicación:
+#   current.json        {"data_version": N, "file": "vN.db", "previous": "vM.db", ...}
+#   current.db -> vN.db symlink para herramientas (la API lee current.json)
+#   vN.db, vM.db ...    snapshots publicados, inmutables
+POINTER_NAME = 'current.json'
+CURRENT_LINK = 'current.db'
+
+
+class SnapshotValidationError(RuntimeError):
+    """El snapshot generado no pasó la validación y no se publicó."""
+
+
+def snapshot_name(version: int) -> str:
+    """Nombre del archivo del snapshot de una versión de datos."""
+    return f'v{version}.db'
+
+
+def read_pointer(publish_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    Lee current.json del directorio de publicación.
+
+    Returns:
+        El puntero (data_version, file, previous, published_at) o None si no
+        hay nada publicado o el archivo no se puede leer.
+    """
+    try:
+        return json.loads((Path(publish_dir) / POINTER_NAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def resolve_published_db(publish_dir: str) -> Optional[Path]:
+    """Ruta del snapshot publicado actualmente, o None si no hay ninguno."""
+    pointer = read_pointer(publish_dir)
+    if not pointer or not pointer.get('file'):
+        return None
+    path = Path(publish_dir) / pointer['file']
+    return path if path.exists() else None
+
+
+def validate_snapshot(path: Path, min_bundles: int = 1) -> Dict[str, int]:
+    """
+    Comprueba un snapshot antes de publicarlo y lo deja listo para leerse.
+
+    Verifica la integridad (``PRAGMA quick_check``) y que tenga al menos
+    ``min_bundles`` bundles. El snapshot pasa a journal
+    DELETE: se abre con ``mode=ro`` y no necesita archivos -wal/-shm.
+
+    Args:
+        path: Archivo SQLite generado con VACUUM INTO.
+        min_bundles: Bundles mínimos para aceptarlo (evita publicar un
+            catálogo vacío tras un ETL fallido a medias).
+
+    Returns:
+        Contadores del snapshot: data_version, bundles y documents.
+
+    Raises:
+        SnapshotValidationError: Si alguna comprobación falla.
+    """
+    connection = sqlite3.connect(path)
+    try:
+        check = connection.execute('PRAGMA quick_check').fetchone()[0]
+        if check != 'ok':
+            raise SnapshotValidationError(f'quick_check falló: {check}')
+        row = connection.execute('SELECT version FROM data_version WHERE id = 1').fetchone()
+        # 0: base de datos anterior a data_version (se publica como v0.db)
+        version = row[0] if row and row[0] else 0
+        bundles = connection.execute('SELECT COUNT(*) FROM bundle').fetchone()[0]
+        if bundles < min_bundles:
+            raise SnapshotValidationError(f'El snapshot tiene {bundles} bundles (mínimo {min_bundles})')
+        documents = connection.execute(
+            'SELECT COUNT(*) FROM bundle_document WHERE data_version = ?', (version,)
+        ).fetchone()[0]
+        connection.execute('PRAGMA journal_mode = DELETE')
+    except sqlite3.Error as exc:
+        raise SnapshotValidationError(f'El snapshot no se pudo leer: {exc}') from exc
+    finally:
+        connection.close()
+    return {'data_version': version, 'bundles': bundles, 'documents': documents}
+
+
+def publish_snapshot(
+    session: Session,
+    publish_dir: str,
+    keep: int = 3,
+    min_bundles: int = 1,
+) -> Dict[str, Any]:
+    """
+    Publica el estado actual de la base de datos como snapshot inmutable.
+
+    Copia la base de datos con ``VACUUM INTO`` (una lectura consistente, sin
+    bloquear a otros lectores) a un archivo temporal del directorio, la
+    valida, la renombra a ``v<version>.db`` y cambia el puntero current.json
+    con un rename atómico. Los lectores del snapshot anterior terminan sobre
+    él y los nuevos abren el nuevo: nunca ven un ETL a medias. El snapshot
+    anterior se conserva como ``previous`` para volver a él al instante.
+
+    Args:
+        session: Sesión sobre la base de datos de trabajo del ETL.
+        publish_dir: Directorio de publicación.
+        keep: Snapshots que se conservan (además del anterior al actual).
+        min_bundles: Bundles mínimos del snapshot (ver validate_snapshot()).
+
+    Returns:
+        Resumen: data_version, path, bundles, documents, bytes, previous y
+        skipped (True si esa versión ya era la publicada).
+
+    Raises:
+        SnapshotValidationError: Si el snapshot no es válido (el puntero no cambia).
+    """
+    directory = Path(publish_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    pointer = read_pointer(publish_dir) or {}
+    # VACUUM no puede ejecutarse dentro de una transacción
+    session.commit()
+
+    staging = directory / f'.staging-{os.getpid()}.db'
+    staging.unlink(missing_ok=True)
+    try:
+        session.connection().exec_driver_sql('VACUUM INTO ?', (str(staging),))
+        session.commit()
+        stats = validate_snapshot(staging, min_bundles)
+    except BaseException:
+        staging.unlink(missing_ok=True)
+        raise
+
+    name = snapshot_name(stats['data_version'])
+    target = directory / name
+    if pointer.get('file') == name and target.exists():
+        # Sin cambios desde la última publicación: se conserva el archivo publicado
+        staging.unlink(missing_ok=True)
+        return {**stats, 'path': str(target), 'bytes': target.stat().st_size,
+                'previous': pointer.get('previous'), 'skipped': True}
+
+    os.replace(staging, target)
+    previous = pointer.get('file') if pointer.get('file') != name else pointer.get('previous')
+    _point_current(directory, name, stats['data_version'], previous)
+    _prune(directory, keep, {name, previous})
+    logger.info('Snapshot publicado: %s (%s bundles)', name, stats['bundles'])
+    return {**stats, 'path': str(target), 'bytes': target.stat().st_size, 'previous': previous, 'skipped': False}
+
+
+def rollback_snapshot(publish_dir: str) -> Dict[str, Any]:
+    """
+    Vuelve a publicar el snapshot anterior (intercambia current y previous).
+
+    Una segunda llamada deshace el rollback.
+
+    Returns:
+        El nuevo puntero.
+
+    Raises:
+        FileNotFoundError: Si no hay snapshot anterior en disco.
+    """
+    directory = Path(publish_dir)
+    pointer = read_pointer(publish_dir) or {}
+    previous = pointer.get('previous')
+    if not previous or not (directory / previous).exists():
+        raise FileNotFoundError(f'No hay snapshot anterior en {publish_dir}')
+    version = validate_snapshot(directory / previous, min_bundles=0)['data_version']
+    _point_current(directory, previous, version, pointer.get('file'))
+    logger.info('Rollback: %s -> %s', pointer.get('file'), previous)
+    return read_pointer(publish_dir) or {}
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    temporary = path.with_name(f'.{path.name}-{os.getpid()}')
+    temporary.write_text(content, encoding='utf-8')
+    os.replace(temporary, path)
+
+
+def _point_current(directory: Path, name: str, version: int, previous: Optional[str]) -> None:
+    """Cambia current.json (y el symlink current.db) al snapshot ``name``."""
+    _write_atomic(directory / POINTER_NAME, json.dumps({
+        'data_version': version,
+        'file': name,
+        'previous': previous,
+        'published_at': datetime.utcnow().isoformat(),
+    }))
+    link = directory / CURRENT_LINK
+    temporary = directory / f'.{CURRENT_LINK}-{os.getpid()}'
+    try:
+        temporary.unlink(missing_ok=True)
+        temporary.symlink_to(name)
+        os.replace(temporary, link)
+    except OSError as exc:
+        # Sin symlinks (p. ej. algunos FS en Windows) queda current.json
+        temporary.unlink(missing_ok=True)
+        logger.warning('No se pudo actualizar el symlink %s: %s', CURRENT_LINK, exc)
+
+
+def _prune(directory: Path, keep: int, protected: Set[Optional[str]]) -> None:
+    """Borra los snapshots más antiguos, conservando ``keep`` y los protegidos."""
+    snapshots = sorted(
+        (path for path in directory.glob('v*.db') if path.stem[1:].isdigit()),
+        key=lambda path: int(path.stem[1:]),
+        reverse=True,
+    )
+    for path in snapshots[max(keep, 1):]:
+        if path.name not in protected:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,150 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import logging
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .models import Bundle, BundleRanking
+from .persistence import reserve_data_version
+
+logger = logging.getLogger(__name__)
+
+# (bundle_id, score, sort_key); el sort_key se ordena de forma ascendente
+RankingEntry = Tuple[str, Optional[float], tuple]
+
+
+def _min_tier_price(price_tiers: Optional[List[Dict[str, Any]]]) -> Optional[float]:
+    """
+    Obtiene el precio mínimo positivo de los tiers de un bundle.
+
+    Args:
+        price_tiers: Lista de tiers tal como se guarda en Bundle.price_tiers.
+
+    Returns:
+        Precio mínimo en la moneda del bundle o None si no hay precios válidos.
+    """
+    prices = []
+    for tier in price_tiers or []:
+        price = tier.get('price') if isinstance(tier, dict) else None
+        amount = price.get('amount') if isinstance(price, dict) else None
+        try:
+            amount = float(amount)
+        except (TypeError, ValueError):
+            continue
+        if amount > 0:
+            prices.append(amount)
+    return min(prices) if prices else None
+
+
+def _featured(row, now: datetime) -> Optional[RankingEntry]:
+    # Mismo criterio que /bundles/featured: MSRP total y ventas, nulls al final
+    return (
+        row.id,
+        row.msrp_total,
+        (
+            row.msrp_total is None,
+            -(row.msrp_total or 0),
+            row.bundles_sold_decimal is None,
+            -(row.bundles_sold_decimal or 0),
+        ),
+    )
+
+
+def _best_value(row, now: datetime) -> Optional[RankingEntry]:
+    min_price = _min_tier_price(row.price_tiers)
+    if not row.msrp_total or not min_price:
+        return None
+    ratio = round(row.msrp_total / min_price, 3)
+    return row.id, ratio, (-ratio,)
+
+
+def _ending_soon(row, now: datetime) -> Optional[RankingEntry]:
+    if row.end_date_datetime is None or row.end_date_datetime < now:
+        return None
+    hours_left = round((row.end_date_datetime - now).total_seconds() / 3600, 2)
+    return row.id, hours_left, (hours_left,)
+
+
+def _best_selling(row, now: datetime) -> Optional[RankingEntry]:
+    if row.bundles_sold_decimal is None:
+        return None
+    return row.id, row.bundles_sold_decimal, (-row.bundles_sold_decimal,)
+
+
+def _newest(row, now: datetime) -> Optional[RankingEntry]:
+    if row.start_date_datetime is None:
+        return None
+    return row.id, None, (-row.start_date_datetime.timestamp(),)
+
+
+RANKING_KINDS: Dict[str, Callable[[Any, datetime], Optional[RankingEntry]]] = {
+    'featured': _featured,
+    'best_value': _best_value,
+    'ending_soon': _ending_soon,
+    'best_selling': _best_selling,
+    'newest': _newest,
+}
+
+
+def refresh_bundle_rankings(session: Session, size: int = 25) -> Dict[str, int]:
+    """
+    Recalcula y guarda los rankings de bundles en la tabla bundle_ranking.
+
+    Lee una sola vez las columnas necesarias de todos los bundles, calcula
+    cada ranking en memoria y reemplaza el contenido de la tabla en una
+    única transacción, de modo que la API nunca ve rankings a medias.
+
+    Rankings calculados:
+        - featured: MSRP total y ventas (criterio de /bundles/featured).
+        - best_value: ratio MSRP total / precio del tier más barato.
+        - ending_soon: bundles activos ordenados por fecha de cierre.
+        - best_selling: bundles vendidos.
+        - newest: fecha de inicio más reciente.
+
+    Args:
+        session: Sesión de SQLAlchemy para la transacción.
+        size: Número máximo de posiciones por ranking.
+
+    Returns:
+        Diccionario con el número de posiciones guardadas por ranking.
+
+    Raises:
+        RuntimeError: Si ocurre un error al guardar los rankings en la BD.
+    """
+    now = datetime.utcnow()
+    rows = session.execute(
+        select(
+            Bundle.id,
+            Bundle.msrp_total,
+            Bundle.bundles_sold_decimal,
+            Bundle.price_tiers,
+            Bundle.start_date_datetime,
+            Bundle.end_date_datetime,
+        )
+    ).all()
+
+    counts: Dict[str, int] = {}
+    try:
+        session.execute(delete(BundleRanking))
+        for kind, scorer in RANKING_KINDS.items():
+            entries = [entry for entry in (scorer(row, now) for row in rows) if entry is not None]
+            entries.sort(key=lambda entry: entry[2])
+            for position, (bundle_id, score, _) in enumerate(entries[:size], start=1):
+                session.add(BundleRanking(
+                    kind=kind,
+                    position=position,
+                    bundle_id=bundle_id,
+                    score=score,
+                    computed_at=now,
+                ))
+            counts[kind] = min(len(entries), size)
+        reserve_data_version(session)
+        session.commit()
+    except SQLAlchemyError as exc:
+        session.rollback()
+        raise RuntimeError(f'Error guardando rankings: {exc}') from exc
+
+    logger.info('Rankings recalculados: %s', counts)
+    return counts
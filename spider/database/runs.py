@@ -0,0 +1,87 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import logging
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .models import EtlRun
+
+logger = logging.getLogger(__name__)
+
+
+def record_etl_run(
+    session: Session,
+    report: Dict,
+    status: str,
+    job_id: Optional[str] = None,
+    bundles_processed: Optional[int] = None,
+    error: Optional[str] = None,
+) -> Optional[EtlRun]:
+    """
+    Guarda el informe de rendimiento de una ejecución del ETL en etl_run.
+
+    Un fallo al guardar el informe no debe ocultar el resultado del ETL, por
+    lo que se registra un warning y se devuelve None en lugar de propagarlo.
+
+    Args:
+        session: Sesión de SQLAlchemy para la transacción.
+        report: Diccionario devuelto por EtlInstrumentation.report().
+        status: Estado final de la ejecución ('succeeded' o 'failed').
+        job_id: Id del etl_job asociado, si la ejecución se lanzó como job.
+        bundles_processed: Bundles validados y persistidos.
+        error: Mensaje de error si la ejecución falló.
+
+    Returns:
+        El EtlRun guardado o None si no se pudo guardar.
+    """
+    total = report.get('stages', {}).get('total', {})
+    fetches = report.get('fetches', {})
+    run = EtlRun(
+        job_id=job_id,
+        status=status,
+        error=error,
+        started_at=_parse_timestamp(report.get('started_at')),
+        finished_at=_parse_timestamp(report.get('finished_at')),
+        wall_seconds=total.get('wall_seconds'),
+        cpu_seconds=total.get('cpu_seconds'),
+        bundles_processed=bundles_processed,
+        bundles_discarded=sum(report.get('discards', {}).values()),
+        requests=fetches.get('requests'),
+        bytes_downloaded=fetches.get('bytes_downloaded'),
+        peak_memory_bytes=report.get('peak_memory_bytes'),
+        report=report,
+    )
+    try:
+        # La sesión puede venir de un ETL fallido con una transacción abierta
+        session.rollback()
+        session.add(run)
+        session.commit()
+    except SQLAlchemyError as exc:
+        session.rollback()
+        logger.warning('No se pudo guardar el informe del ETL: %s', exc)
+        return None
+    return run
+
+
+def list_etl_runs(session: Session, limit: int = 20, job_id: Optional[str] = None) -> List[EtlRun]:
+    """
+    Lista las ejecuciones del ETL más recientes primero.
+
+    Args:
+        session: Sesión de SQLAlchemy.
+        limit: Número máximo de ejecuciones a devolver.
+        job_id: Si se indica, solo las ejecuciones de ese job.
+
+    Returns:
+        Lista de EtlRun ordenada por fecha de inicio descendente.
+    """
+    statement = select(EtlRun).order_by(EtlRun.started_at.desc()).limit(limit)
+    if job_id:
+        statement = statement.where(EtlRun.job_id == job_id)
+    return list(session.execute(statement).scalars())
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
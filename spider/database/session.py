@@ -1,21 +1,36 @@
 import logging
+import threading
 from pathlib import Path
-from sqlalchemy import create_engine
+from typing import Dict, List, Set
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, sessionmaker
 
-from ..config.settings import Settings
+from ..config.settings import Settings, get_settings
+from ..utils import json_codec
 from .models import Base
 
 logger = logging.getLogger(__name__)
 
+# Registro de engines por proceso: un engine síncrono y uno asíncrono por URI
+# (las URIs de solo lectura llevan ?mode=ro, así que tienen su propia entrada)
+_lock = threading.RLock()
+_engines: Dict[str, Engine] = {}
+_async_engines: Dict[str, object] = {}
+_session_factories: Dict[str, sessionmaker] = {}
+_async_session_factories: Dict[str, object] = {}
+_schema_ready: Set[str] = set()
+
 
-def build_database_uri(settings: Settings) -> str:
+def build_database_uri(settings: Settings, driver: str = 'sqlite') -> str:
     """
     Construye la URI de conexión a la base de datos SQLite.
-    
+
     Args:
         settings: Configuración con la ruta al archivo SQLite.
-        
+        driver: Dialecto/driver de SQLAlchemy ('sqlite' o 'sqlite+aiosqlite').
+
     Returns:
         URI de conexión en formato sqlite:///
     """
@@ -23,32 +38,335 @@ def build_database_uri(settings: Settings) -> str:
     # Crear directorio si no existe
     db_path.parent.mkdir(parents=True, exist_ok=True)
     # Usar ruta absoluta para SQLite
-    return f'sqlite:///{db_path.absolute()}'
+    return f'{driver}:///{db_path.absolute()}'
 
 
-def get_session_factory(settings: Settings):
+def build_read_only_uri(settings: Settings, driver: str = 'sqlite') -> str:
     """
-    Crea y configura una factory de sesiones de SQLAlchemy para SQLite.
-    
-    Crea las tablas necesarias si no existen y asegura que todas las columnas
-    y tablas relacionadas estén presentes.
-    
+    Construye la URI de solo lectura (``mode=ro``) del archivo SQLite.
+
     Args:
         settings: Configuración con la ruta al archivo SQLite.
-        
+        driver: Dialecto/driver de SQLAlchemy ('sqlite' o 'sqlite+aiosqlite').
+
     Returns:
-        sessionmaker configurado para crear sesiones de SQLAlchemy.
+        URI ``file:`` que SQLite abre sin permiso de escritura.
+    """
+    return f'{driver}:///file:{Path(settings.db_path).absolute()}?mode=ro&uri=true'
+
+
+def _engine_options(settings: Settings) -> dict:
+    """Configuración compartida por el engine síncrono y el asíncrono."""
+    return {
+        'echo': settings.sql_echo,
+        'future': True,
+        # Columnas JSON (price_tiers, book_list, json_data...) con el códec rápido
+        'json_serializer': json_codec.dumps,
+        'json_deserializer': json_codec.loads,
+    }
+
+
+def _install_pragmas(engine: Engine, settings: Settings, read_only: bool) -> None:
+    """
+    Configura cada conexión nueva del engine.
+
+    Las conexiones de escritura activan WAL (si ``sqlite_wal``): con WAL los
+    lectores siguen leyendo el último commit mientras el ETL escribe, en
+    lugar de esperar (o fallar con 'database is locked') en cada commit.
+    Las de solo lectura además activan ``query_only``.
+    """
+    pragmas = [f'PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}']
+    if read_only:
+        pragmas.append('PRAGMA query_only = ON')
+    elif settings.sqlite_wal:
+        pragmas += ['PRAGMA journal_mode = WAL', 'PRAGMA synchronous = NORMAL']
+
+    @event.listens_for(engine, 'connect')
+    def _configure(dbapi_connection, _record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def get_engine(settings: Settings | None = None) -> Engine:
+    """
+    Obtiene el engine síncrono del proceso para la base de datos configurada.
+
+    El engine se crea una sola vez por URI y se reutiliza en todas las
+    llamadas posteriores (CLI, jobs del ETL y endpoints síncronos de la API).
+
+    Args:
+        settings: Configuración a usar. Si es None, se usa get_settings().
+
+    Returns:
+        Engine de SQLAlchemy compartido.
+    """
+    settings = settings or get_settings()
+    uri = build_database_uri(settings)
+    with _lock:
+        engine = _engines.get(uri)
+        if engine is None:
+            engine = create_engine(
+                uri,
+                connect_args={'check_same_thread': False},
+                **_engine_options(settings),
+            )
+            _install_pragmas(engine, settings, read_only=False)
+            _engines[uri] = engine
+        return engine
+
+
+def get_read_engine(settings: Settings | None = None) -> Engine:
+    """
+    Obtiene el engine síncrono de solo lectura (``mode=ro`` + ``query_only``).
+
+    Su pool tiene ``read_pool_size`` conexiones que nunca toman locks de
+    escritura. El archivo debe existir: las factories de lectura aseguran
+    antes el esquema con el engine de escritura.
+
+    Args:
+        settings: Configuración a usar. Si es None, se usa get_settings().
+
+    Returns:
+        Engine de SQLAlchemy compartido.
+    """
+    settings = settings or get_settings()
+    uri = build_read_only_uri(settings)
+    with _lock:
+        engine = _engines.get(uri)
+        if engine is None:
+            engine = create_engine(
+                uri,
+                connect_args={'check_same_thread': False},
+                pool_size=max(1, settings.read_pool_size),
+                **_engine_options(settings),
+            )
+            _install_pragmas(engine, settings, read_only=True)
+            _engines[uri] = engine
+        return engine
+
+
+def get_async_engine(settings: Settings | None = None):
+    """
+    Obtiene el engine asíncrono (aiosqlite) del proceso.
+
+    SQLAlchemy asyncio y aiosqlite se importan aquí para que la CLI del
+    spider no los cargue.
+
+    Args:
+        settings: Configuración a usar. Si es None, se usa get_settings().
+
+    Returns:
+        AsyncEngine de SQLAlchemy compartido.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    settings = settings or get_settings()
+    uri = build_database_uri(settings, driver='sqlite+aiosqlite')
+    with _lock:
+        engine = _async_engines.get(uri)
+        if engine is None:
+            engine = create_async_engine(uri, **_engine_options(settings))
+            _install_pragmas(engine.sync_engine, settings, read_only=False)
+            _async_engines[uri] = engine
+        return engine
+
+
+def get_async_read_engine(settings: Settings | None = None):
+    """
+    Obtiene el engine asíncrono (aiosqlite) de solo lectura del proceso.
+
+    Args:
+        settings: Configuración a usar. Si es None, se usa get_settings().
+
+    Returns:
+        AsyncEngine de SQLAlchemy compartido.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    settings = settings or get_settings()
+    uri = build_read_only_uri(settings, driver='sqlite+aiosqlite')
+    with _lock:
+        engine = _async_engines.get(uri)
+        if engine is None:
+            # aiosqlite usa NullPool por defecto (un hilo y una conexión por petición)
+            engine = create_async_engine(
+                uri,
+                poolclass=AsyncAdaptedQueuePool,
+                pool_size=max(1, settings.read_pool_size),
+                **_engine_options(settings),
+            )
+            _install_pragmas(engine.sync_engine, settings, read_only=True)
+            _async_engines[uri] = engine
+        return engine
+
+
+def ensure_schema(settings: Settings | None = None, force: bool = False) -> None:
+    """
+    Crea las tablas y columnas faltantes una sola vez por proceso.
+
+    Args:
+        settings: Configuración a usar. Si es None, se usa get_settings().
+        force: Si True, vuelve a ejecutar la creación aunque ya se haya hecho.
     """
+    settings = settings or get_settings()
     uri = build_database_uri(settings)
-    engine = create_engine(uri, echo=settings.sql_echo, future=True, connect_args={'check_same_thread': False})
-    
-    # Crear todas las tablas si no existen
-    logger.info('Creando tablas si no existen...')
-    Base.metadata.create_all(engine, checkfirst=True)
-    
+    if uri in _schema_ready and not force:
+        return
+
+    engine = get_engine(settings)
     # Importar aquí para evitar importaciones circulares
     from .persistence import ensure_columns, ensure_landing_page_raw_data_table
-    
-    ensure_columns(engine)
-    ensure_landing_page_raw_data_table(engine)
-    return sessionmaker(bind=engine, expire_on_commit=False, class_=Session)
+
+    with _lock:
+        if uri in _schema_ready and not force:
+            return
+        # Crear todas las tablas si no existen
+        logger.info('Creando tablas si no existen...')
+        Base.metadata.create_all(engine, checkfirst=True)
+        ensure_columns(engine)
+        ensure_landing_page_raw_data_table(engine)
+        _schema_ready.add(uri)
+
+
+def get_session_factory(settings: Settings | None = None):
+    """
+    Obtiene la factory de sesiones síncronas sobre el engine compartido.
+
+    La primera llamada asegura el esquema (tablas y columnas); las siguientes
+    devuelven la misma factory sin volver a inspeccionar la base de datos.
+
+    Args:
+        settings: Configuración con la ruta al archivo SQLite.
+
+    Returns:
+        sessionmaker configurado para crear sesiones de SQLAlchemy.
+    """
+    settings = settings or get_settings()
+    ensure_schema(settings)
+    uri = build_database_uri(settings)
+    factory = _session_factories.get(uri)
+    if factory is None:
+        factory = sessionmaker(bind=get_engine(settings), expire_on_commit=False, class_=Session)
+        _session_factories[uri] = factory
+    return factory
+
+
+def get_async_session_factory(settings: Settings | None = None):
+    """
+    Obtiene la factory de sesiones asíncronas sobre el engine compartido.
+
+    Args:
+        settings: Configuración con la ruta al archivo SQLite.
+
+    Returns:
+        async_sessionmaker configurado para crear AsyncSession.
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    settings = settings or get_settings()
+    ensure_schema(settings)
+    uri = build_database_uri(settings)
+    factory = _async_session_factories.get(uri)
+    if factory is None:
+        factory = async_sessionmaker(get_async_engine(settings), class_=AsyncSession, expire_on_commit=False)
+        _async_session_factories[uri] = factory
+    return factory
+
+
+def get_read_session_factory(settings: Settings | None = None, check_schema: bool = True):
+    """
+    Obtiene la factory de sesiones síncronas de solo lectura.
+
+    Para consultas de la API y exportaciones; cualquier escritura falla con
+    'attempt to write a readonly database'.
+
+    Args:
+        settings: Configuración con la ruta al archivo SQLite.
+        check_schema: Si False, no se asegura el esquema con el engine de
+            escritura (snapshots publicados, que nunca se modifican).
+
+    Returns:
+        sessionmaker sobre el engine de solo lectura.
+    """
+    settings = settings or get_settings()
+    if check_schema:
+        ensure_schema(settings)
+    uri = build_read_only_uri(settings)
+    factory = _session_factories.get(uri)
+    if factory is None:
+        factory = sessionmaker(bind=get_read_engine(settings), expire_on_commit=False, class_=Session)
+        _session_factories[uri] = factory
+    return factory
+
+
+def get_async_read_session_factory(settings: Settings | None = None, check_schema: bool = True):
+    """
+    Obtiene la factory de sesiones asíncronas de solo lectura.
+
+    Args:
+        settings: Configuración con la ruta al archivo SQLite.
+        check_schema: Si False, no se asegura el esquema (ver get_read_session_factory()).
+
+    Returns:
+        async_sessionmaker sobre el engine asíncrono de solo lectura.
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    settings = settings or get_settings()
+    if check_schema:
+        ensure_schema(settings)
+    uri = build_read_only_uri(settings, driver='sqlite+aiosqlite')
+    factory = _async_session_factories.get(uri)
+    if factory is None:
+        factory = async_sessionmaker(get_async_read_engine(settings), class_=AsyncSession, expire_on_commit=False)
+        _async_session_factories[uri] = factory
+    return factory
+
+
+def release_read_engines(settings: Settings) -> List[object]:
+    """
+    Quita del registro los engines de solo lectura de un archivo.
+
+    Los engines se devuelven sin cerrar: quien los retira decide cuándo
+    (p. ej. la API cierra los de un snapshot publicado cuando ya no hay
+    peticiones sobre él; los asíncronos requieren ``await engine.dispose()``).
+
+    Args:
+        settings: Configuración con la ruta del archivo.
+
+    Returns:
+        Engines retirados (síncrono y/o asíncrono).
+    """
+    released = []
+    with _lock:
+        for uri, registry, factories in (
+            (build_read_only_uri(settings), _engines, _session_factories),
+            (build_read_only_uri(settings, driver='sqlite+aiosqlite'), _async_engines, _async_session_factories),
+        ):
+            factories.pop(uri, None)
+            engine = registry.pop(uri, None)
+            if engine is not None:
+                released.append(engine)
+    return released
+
+
+def dispose_engines() -> None:
+    """
+    Cierra los pools de los engines síncronos y vacía el registro.
+
+    Los engines asíncronos deben cerrarse con ``await engine.dispose()``
+    desde el event loop (ver el lifespan de la API); aquí solo se olvidan.
+    """
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _async_engines.clear()
+        _session_factories.clear()
+        _async_session_factories.clear()
+        _schema_ready.clear()
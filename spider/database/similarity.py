@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import logging
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..utils.minhash import bundle_tokens, minhash_signature, tokens_digest
+from .models import BundleSignature
+
+logger = logging.getLogger(__name__)
+
+
+def compute_bundle_signature(book_list: Optional[Iterable[Any]]) -> Optional[Tuple[bytes, int, str]]:
+    """
+    Calcula la firma MinHash de la lista de libros de un bundle.
+
+    Args:
+        book_list: Lista de libros tal como se guarda en Bundle.book_list.
+
+    Returns:
+        Tupla (firma, número de tokens, hash de los tokens) o None si el
+        bundle no tiene libros.
+    """
+    tokens = bundle_tokens(book_list)
+    signature = minhash_signature(tokens)
+    if signature is None:
+        return None
+    return signature, len(tokens), tokens_digest(tokens)
+
+
+def get_bundle_signatures(session: Session, machine_names: Iterable[str]) -> Dict[str, BundleSignature]:
+    """
+    Carga en una sola consulta las firmas de los machine_names indicados.
+
+    Args:
+        session: Sesión de SQLAlchemy.
+        machine_names: machine_names a consultar.
+
+    Returns:
+        Diccionario machine_name -> BundleSignature (solo las que existen).
+    """
+    names = list(machine_names)
+    if not names:
+        return {}
+    rows = session.execute(select(BundleSignature).where(BundleSignature.machine_name.in_(names))).scalars()
+    return {row.machine_name: row for row in rows}
+
+
+def upsert_bundle_signature(
+    session: Session,
+    bundle_id: str,
+    machine_name: str,
+    tile_name: Optional[str],
+    book_list: Optional[Iterable[Any]],
+    known: Optional[Dict[str, BundleSignature]] = None,
+) -> bool:
+    """
+    Crea o actualiza la firma MinHash de un bundle (sin hacer commit).
+
+    La firma solo se recalcula si cambió el conjunto de tokens (machine_name
+    y título normalizado de cada libro); en caso contrario solo se refrescan
+    bundle_id y tile_name.
+
+    Args:
+        session: Sesión de SQLAlchemy de la transacción en curso.
+        bundle_id: Id actual del bundle.
+        machine_name: machine_name del bundle (clave de la firma).
+        tile_name: Nombre visible del bundle.
+        book_list: Lista de libros del bundle.
+        known: Firmas ya cargadas con get_bundle_signatures(); si se indica,
+            se usa en lugar de consultar la BD y se actualiza con la firma
+            creada o eliminada.
+
+    Returns:
+        True si la firma se creó o cambió.
+    """
+    tokens = bundle_tokens(book_list)
+    digest = tokens_digest(tokens)
+    existing = known.get(machine_name) if known is not None else session.get(BundleSignature, machine_name)
+    if existing is not None and existing.tokens_hash == digest:
+        existing.bundle_id = bundle_id
+        existing.tile_name = tile_name
+        return False
+
+    signature = minhash_signature(tokens)
+    if signature is None:
+        if existing is not None:
+            session.delete(existing)
+            if known is not None:
+                del known[machine_name]
+        return existing is not None
+    if existing is None:
+        existing = BundleSignature(
+            machine_name=machine_name,
+            bundle_id=bundle_id,
+            tile_name=tile_name,
+            token_count=len(tokens),
+            tokens_hash=digest,
+            signature=signature,
+        )
+        session.add(existing)
+        if known is not None:
+            known[machine_name] = existing
+    else:
+        existing.bundle_id = bundle_id
+        existing.tile_name = tile_name
+        existing.token_count = len(tokens)
+        existing.tokens_hash = digest
+        existing.signature = signature
+        existing.updated_at = datetime.utcnow()
+    return True
@@ -0,0 +1,139 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from itertools import count
+from typing import Callable, Dict, Hashable, Optional, TypeVar
+
+import logging
+import threading
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+WriteOperation = Callable[[Session], T]
+
+
+class WriteQueue:
+    """
+    Único escritor de la base de datos: un hilo con una sola sesión.
+
+    Las operaciones de escritura (funciones ``operation(session)``, p. ej. un
+    lote de ``persist_bundles``) se encolan con ``submit()`` y el hilo las
+    ejecuta en orden, cada una en su propia transacción, sobre una única
+    conexión de escritura. Así los hilos del proceso (pipeline del ETL,
+    progreso del job) nunca compiten entre sí por el lock de escritura de
+    SQLite, y quien encola puede seguir trabajando (descargar el siguiente
+    lote) mientras se escribe el anterior.
+
+    Las operaciones encoladas con la misma ``key`` se fusionan mientras
+    esperan turno: solo se ejecuta la última (útil para estados que se
+    sobrescriben, como el progreso de un job).
+    """
+
+    def __init__(self, session_factory, max_pending: int = 64, name: str = 'db-writer') -> None:
+        """
+        Inicializa la cola y arranca el hilo escritor.
+
+        Args:
+            session_factory: Factory de la sesión del escritor (engine de
+                escritura). Se abre una sola sesión durante toda la vida de la cola.
+            max_pending: Operaciones en espera como máximo; ``submit()``
+                bloquea cuando se alcanza (acota la memoria retenida).
+            name: Nombre del hilo escritor.
+        """
+        self.session_factory = session_factory
+        self.max_pending = max(1, max_pending)
+        self._pending: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._sequence = count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self.executed = 0
+        self.coalesced = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> 'WriteQueue':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def submit(self, operation: WriteOperation, key: Optional[Hashable] = None) -> Future:
+        """
+        Encola una operación de escritura.
+
+        Args:
+            operation: Función que recibe la sesión del escritor. Si deja una
+                transacción abierta, el escritor hace commit al terminar; si
+                lanza una excepción, se hace rollback.
+            key: Clave de fusión opcional. Si hay una operación con la misma
+                clave esperando turno, se sustituye por esta.
+
+        Returns:
+            Future con el resultado de la operación.
+
+        Raises:
+            RuntimeError: Si la cola ya está cerrada.
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('La cola de escritura está cerrada')
+            if key is not None and key in self._pending:
+                _, future = self._pending[key]
+                self._pending[key] = (operation, future)
+                self.coalesced += 1
+                return future
+            while len(self._pending) >= self.max_pending and not self._closed:
+                self._condition.wait()
+            future: Future = Future()
+            self._pending[key if key is not None else ('_', next(self._sequence))] = (operation, future)
+            self._condition.notify_all()
+            return future
+
+    def run(self, operation: Callable[[Session], T], timeout: Optional[float] = None) -> T:
+        """Encola una operación y espera su resultado (propaga su excepción)."""
+        return self.submit(operation).result(timeout)
+
+    def close(self) -> None:
+        """Ejecuta las operaciones pendientes, detiene el hilo y cierra la sesión."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            pending = len(self._pending)
+        return {'executed': self.executed, 'coalesced': self.coalesced, 'failed': self.failed, 'pending': pending}
+
+    def _next(self) -> Optional[tuple]:
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if not self._pending:
+                return None
+            _, entry = self._pending.popitem(last=False)
+            self._condition.notify_all()
+            return entry
+
+    def _loop(self) -> None:
+        with self.session_factory() as session:
+            while (entry := self._next()) is not None:
+                operation, future = entry
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    result = operation(session)
+                    if session.in_transaction():
+                        session.commit()
+                except BaseException as exc:
+                    session.rollback()
+                    self.failed += 1
+                    logger.warning('Falló una escritura encolada: %s', exc)
+                    future.set_exception(exc)
+                else:
+                    self.executed += 1
+                    future.set_result(result)
@@ -2,5 +2,6 @@
 
 from .bundle import BundleRecord
 from .raw_data import LandingPageRawDataRecord
+from .responses import BundleResponse, BundleSummaryResponse
 
-__all__ = ['BundleRecord', 'LandingPageRawDataRecord']
+__all__ = ['BundleRecord', 'LandingPageRawDataRecord', 'BundleResponse', 'BundleSummaryResponse']
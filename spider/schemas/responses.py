@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class BundleResponse(BaseModel):
+    """
+    Cuerpo JSON de un bundle tal como lo devuelve /bundles/{id}.
+
+    Vive en el spider porque el ETL serializa con él los documentos de
+    bundle_document; la API lo reutiliza como response_model.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    machine_name: str
+    tile_name: Optional[str] = None
+    tile_short_name: Optional[str] = None
+    tile_stamp: Optional[str] = None
+    category: Optional[str] = None
+    product_url: Optional[str] = None
+    start_date_datetime: Optional[datetime] = None
+    end_date_datetime: Optional[datetime] = None
+    duration_days: Optional[float] = None
+    is_active: Optional[bool] = None
+    price_tiers: Optional[List[Dict[str, Any]]] = None
+    book_list: Optional[List[Dict[str, Any]]] = None
+    featured_image: Optional[str] = None
+    tile_logo: Optional[str] = None
+    tile_image: Optional[str] = None
+    high_res_tile_image: Optional[str] = None
+    # Variantes locales (original, webp, thumbnail) de cada campo de imagen replicado
+    images: Optional[Dict[str, Dict[str, str]]] = None
+    msrp_total: Optional[float] = None
+    raw_html: Optional[str] = None
+    verification_date: datetime
+    # Versión de datos del último cambio del bundle (ver GET /bundles/changes)
+    row_version: Optional[int] = None
+
+
+class BundleSummaryResponse(BaseModel):
+    """Resumen de un bundle en cada entrada de un ranking."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    machine_name: str
+    tile_name: Optional[str] = None
+    tile_short_name: Optional[str] = None
+    tile_stamp: Optional[str] = None
+    category: Optional[str] = None
+    product_url: Optional[str] = None
+    start_date_datetime: Optional[datetime] = None
+    end_date_datetime: Optional[datetime] = None
+    is_active: Optional[bool] = None
+    featured_image: Optional[str] = None
+    tile_logo: Optional[str] = None
+    tile_image: Optional[str] = None
+    msrp_total: Optional[float] = None
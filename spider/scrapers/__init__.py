@@ -1,5 +1,6 @@
 """Módulos de scraping."""
 
-from .bundle_detail_scraper import BundleDetailScraper, BundleDetails
+from .bundle_detail_scraper import BundleDetailScraper, BundleDetails, parse_detail_html
+from .detail_pool import DetailParsePool
 
-__all__ = ['BundleDetailScraper', 'BundleDetails']
+__all__ = ['BundleDetailScraper', 'BundleDetails', 'DetailParsePool', 'parse_detail_html']
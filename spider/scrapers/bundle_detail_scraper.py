@@ -1,15 +1,21 @@
 from __future__ import annotations
 
-import json
 import logging
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from bs4 import BeautifulSoup
 from requests import Session, exceptions
 
+from ..core.http import retries_used
+from ..utils import json_codec
+from ..utils.transformers import BASE_URL
+
 logger = logging.getLogger(__name__)
 
+DETAIL_SCRIPT_ID = 'webpack-bundle-page-data'
+
 
 @dataclass
 class BundleDetails:
@@ -20,6 +26,52 @@ class BundleDetails:
     raw_html: Optional[str] = None  # HTML raw del bundle
 
 
+# Resultado de parsear una página: los detalles o el motivo del fallo
+ParseResult = Union[BundleDetails, str]
+
+
+def parse_detail_html(html: str) -> ParseResult:
+    """
+    Extrae los detalles de una página de bundle ya descargada.
+
+    No usa red ni estado compartido, así que puede ejecutarse en un proceso
+    del pool de parseo (DetailParsePool). El resultado no incluye raw_html:
+    quien descargó la página ya lo tiene y no se devuelve entre procesos.
+
+    Args:
+        html: HTML de la página de detalle.
+
+    Returns:
+        BundleDetails, o el motivo del fallo ('script_missing' o 'invalid_json').
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    script = soup.find('script', id=DETAIL_SCRIPT_ID, type='application/json')
+    if not script or not script.string:
+        return 'script_missing'
+
+    try:
+        data = json_codec.loads(script.string)
+        bundle_data = data['bundleData']
+    except (ValueError, KeyError, TypeError):
+        return 'invalid_json'
+    del soup, script, data
+
+    tier_pricing = bundle_data.get('tier_pricing_data', {})
+    tier_display = bundle_data.get('tier_display_data', {})
+    tier_items = bundle_data.get('tier_item_data', {})
+    basic_data = bundle_data.get('basic_data', {})
+    return BundleDetails(
+        price_tiers=BundleDetailScraper._extract_price_tiers(tier_pricing, tier_display),
+        book_list=BundleDetailScraper._extract_book_list(tier_items, tier_display),
+        msrp_total=BundleDetailScraper._safe_amount(basic_data.get('msrp|money')),
+    )
+
+
+def parse_detail_pages(pages: List[Optional[str]]) -> List[Optional[ParseResult]]:
+    """Parsea un bloque de páginas (tarea del pool); las páginas None dan None."""
+    return [parse_detail_html(html) if html is not None else None for html in pages]
+
+
 class BundleDetailScraper:
     """
     Scraper que extrae detalles de bundles desde el JSON embebido en la página.
@@ -27,21 +79,34 @@ class BundleDetailScraper:
     """
     BASE_URL = 'https://www.humblebundle.com'
 
-    def __init__(self, session: Session | None = None) -> None:
+    def __init__(
+        self,
+        session: Session | None = None,
+        instrumentation=None,
+        base_url: str | None = None,
+    ) -> None:
         """
         Inicializa el scraper de detalles de bundles.
         
         Args:
             session: Sesión de requests a usar. Si es None, se crea una nueva.
+            instrumentation: EtlInstrumentation opcional que recibe la latencia,
+                los bytes y los fallos de cada descarga.
+            base_url: Host desde el que se descargan los detalles (p. ej. un
+                mock local). Si es None, se usa BASE_URL.
         """
         self.session = session or Session()
+        self.instrumentation = instrumentation
+        if base_url:
+            self.BASE_URL = base_url.rstrip('/')
 
     def fetch_bundle_details(self, product_path: str | None) -> Optional[BundleDetails]:
         """
         Obtiene los detalles de un bundle desde su página.
         
         Extrae información del JSON embebido (webpack-bundle-page-data) sobre
-        precios, lista de libros y MSRP total. NO extrae imágenes.
+        precios, lista de libros y MSRP total. NO extrae imágenes. Equivale a
+        fetch_bundle_html() seguido de parse_detail_html() en este proceso.
         
         Args:
             product_path: Ruta o URL del producto. Puede ser relativa o absoluta.
@@ -49,49 +114,80 @@ class BundleDetailScraper:
         Returns:
             BundleDetails con la información extraída o None si hay un error.
         """
+        raw_html = self.fetch_bundle_html(product_path)
+        if raw_html is None:
+            return None
+        return self.resolve_details(parse_detail_html(raw_html), product_path, raw_html)
+
+    def fetch_bundle_html(self, product_path: str | None) -> Optional[str]:
+        """
+        Descarga la página de detalle de un bundle, sin parsearla.
+
+        Args:
+            product_path: Ruta o URL del producto. Puede ser relativa o absoluta.
+
+        Returns:
+            HTML de la página o None si no hay ruta o la descarga falla.
+        """
         if not product_path:
             return None
         
         url = product_path if product_path.startswith('http') else f'{self.BASE_URL}{product_path}'
+        if self.BASE_URL != BASE_URL and url.startswith(BASE_URL):
+            # Las URLs guardadas son canónicas; se descargan del host configurado
+            url = f'{self.BASE_URL}{url[len(BASE_URL):]}'
+        started = time.perf_counter()
         try:
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
         except exceptions.RequestException as exc:
+            self._record_fetch(started, None, 'http_error')
             logger.warning('No se pudo obtener detalle del bundle %s: %s', product_path, exc)
             return None
+        self._record_fetch(started, response)
+        return response.text
 
-        # Guardar HTML raw para tests
-        raw_html = response.text
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        script = soup.find('script', id='webpack-bundle-page-data', type='application/json')
-        if not script or not script.string:
-            logger.warning('Script webpack-bundle-page-data no encontrado para %s', product_path)
-            return None
+    def resolve_details(
+        self,
+        result: Optional[ParseResult],
+        product_path: str | None,
+        raw_html: Optional[str] = None,
+    ) -> Optional[BundleDetails]:
+        """
+        Convierte el resultado de parse_detail_html() en BundleDetails.
 
-        try:
-            data = json.loads(script.string)
-            bundle_data = data['bundleData']
-        except (json.JSONDecodeError, KeyError) as exc:
-            logger.warning('JSON inválido en detalle %s: %s', product_path, exc)
+        Los fallos se registran en la instrumentación y en el log.
+
+        Args:
+            result: Resultado del parseo (local o del pool), o None.
+            product_path: Ruta del producto, para los mensajes.
+            raw_html: HTML descargado, que se adjunta a los detalles.
+
+        Returns:
+            BundleDetails con raw_html, o None si el parseo falló.
+        """
+        if result is None:
             return None
-        
-        tier_pricing = bundle_data.get('tier_pricing_data', {})
-        tier_display = bundle_data.get('tier_display_data', {})
-        tier_items = bundle_data.get('tier_item_data', {})
-        
-        price_tiers = self._extract_price_tiers(tier_pricing, tier_display)
-        book_list = self._extract_book_list(tier_items, tier_display)
-        
-        basic_data = bundle_data.get('basic_data', {})
-        msrp_total = self._safe_amount(basic_data.get('msrp|money'))
-        
-        return BundleDetails(
-            price_tiers=price_tiers,
-            book_list=book_list,
-            msrp_total=msrp_total,
-            raw_html=raw_html,
-        )
+        if isinstance(result, str):
+            self._record_failure(result)
+            if result == 'script_missing':
+                logger.warning('Script webpack-bundle-page-data no encontrado para %s', product_path)
+            else:
+                logger.warning('JSON inválido en detalle %s', product_path)
+            return None
+        result.raw_html = raw_html
+        return result
+
+    def _record_fetch(self, started: float, response, failure: str | None = None) -> None:
+        if self.instrumentation is None:
+            return
+        size = len(response.content) if response is not None else 0
+        retries = retries_used(response) if response is not None else 0
+        self.instrumentation.record_fetch(time.perf_counter() - started, size, failure, retries)
+
+    def _record_failure(self, reason: str) -> None:
+        if self.instrumentation is not None:
+            self.instrumentation.fetch_failures[reason] += 1
 
     @staticmethod
     def _extract_price_tiers(pricing, display) -> List[Dict[str, Any]]:
@@ -119,7 +215,8 @@ class BundleDetailScraper:
             )
         return tiers
 
-    def _extract_book_list(self, tier_items, display) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _extract_book_list(tier_items, display) -> List[Dict[str, Any]]:
         """
         Extrae la lista de libros del bundle desde los datos del JSON.
         
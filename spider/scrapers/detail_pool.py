@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from .bundle_detail_scraper import ParseResult, parse_detail_html, parse_detail_pages
+
+K = TypeVar('K')
+
+
+class DetailParsePool:
+    """
+    Parsea páginas de detalle en un pool de procesos, en bloques.
+
+    El parseo (BeautifulSoup + extracción de tiers y libros) es CPU puro y
+    con el GIL solo usa un núcleo; aquí las páginas se envían a
+    ``workers`` procesos en bloques de ``chunk_size`` para amortizar el
+    coste de IPC, y cada proceso devuelve solo los detalles compactos (sin
+    el HTML). Como la entrada se consume de forma perezosa, quien la produce
+    (p. ej. el generador que descarga las páginas) sigue trabajando mientras
+    los procesos parsean los bloques anteriores.
+
+    Con ``workers <= 0`` no se crean procesos: cada página se parsea en el
+    proceso actual según llega, con el mismo resultado.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        chunk_size: int = 8,
+        max_pending_chunks: Optional[int] = None,
+        instrumentation=None,
+    ) -> None:
+        """
+        Inicializa el pool (los procesos se crean al primer bloque).
+
+        Args:
+            workers: Procesos de parseo; 0 parsea en el proceso actual.
+            chunk_size: Páginas por tarea enviada al pool.
+            max_pending_chunks: Bloques en vuelo como máximo (acota la memoria
+                de HTML retenido). Por defecto ``2 * workers``.
+            instrumentation: EtlInstrumentation opcional; el parseo local y la
+                espera de resultados se miden como la etapa 'parse'.
+        """
+        self.workers = max(0, workers)
+        self.chunk_size = max(1, chunk_size)
+        self.max_pending_chunks = max(1, max_pending_chunks or 2 * self.workers)
+        self.instrumentation = instrumentation
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> 'DetailParsePool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Detiene los procesos del pool, si se crearon."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def parse(self, pages: Iterable[Tuple[K, Optional[str]]]) -> Iterator[Tuple[K, Optional[str], Optional[ParseResult]]]:
+        """
+        Parsea las páginas conservando el orden de entrada.
+
+        Args:
+            pages: Pares (clave, html). La clave (p. ej. el producto) no sale
+                del proceso actual; un html None produce un resultado None.
+
+        Yields:
+            Tuplas (clave, html, resultado de parse_detail_html()).
+        """
+        if self.workers == 0:
+            for key, html in pages:
+                with self._stage():
+                    result = parse_detail_html(html) if html is not None else None
+                yield key, html, result
+            return
+
+        pending: Deque[Tuple[List[Tuple[K, Optional[str]]], Future]] = deque()
+        chunk: List[Tuple[K, Optional[str]]] = []
+        for entry in pages:
+            chunk.append(entry)
+            if len(chunk) >= self.chunk_size:
+                pending.append((chunk, self._submit(chunk)))
+                chunk = []
+                if len(pending) >= self.max_pending_chunks:
+                    yield from self._collect(*pending.popleft())
+        if chunk:
+            pending.append((chunk, self._submit(chunk)))
+        while pending:
+            yield from self._collect(*pending.popleft())
+
+    def _submit(self, chunk: List[Tuple[K, Optional[str]]]) -> Future:
+        if self._executor is None:
+            # spawn: el ETL puede correr en un hilo de la API y fork con hilos no es seguro
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._executor.submit(parse_detail_pages, [html for _, html in chunk])
+
+    def _collect(self, chunk: List[Tuple[K, Optional[str]]], future: Future):
+        with self._stage():
+            results = future.result()
+        for (key, html), result in zip(chunk, results):
+            yield key, html, result
+
+    def _stage(self):
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.stage('parse')
+
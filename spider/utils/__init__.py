@@ -10,6 +10,19 @@ from .transformers import (
     normalize_columns,
     BASE_URL,
 )
+from . import json_codec
+from .events import ChangeEvent, ChangeHub, change_hub
+from .minhash import (
+    LSH_BANDS,
+    LSH_ROWS,
+    NUM_PERM,
+    bundle_tokens,
+    estimate_jaccard,
+    minhash_signature,
+    normalize_title,
+    signature_values,
+    tokens_digest,
+)
 
 __all__ = [
     'normalize_text',
@@ -20,5 +33,18 @@ __all__ = [
     'compute_is_active',
     'normalize_columns',
     'BASE_URL',
+    'json_codec',
+    'ChangeEvent',
+    'ChangeHub',
+    'change_hub',
+    'NUM_PERM',
+    'LSH_BANDS',
+    'LSH_ROWS',
+    'normalize_title',
+    'bundle_tokens',
+    'tokens_digest',
+    'minhash_signature',
+    'signature_values',
+    'estimate_jaccard',
 ]
 
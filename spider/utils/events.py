@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """Evento de cambio publicado por la persistencia (inserted/updated/expired)."""
+    id: int
+    type: str
+    data: Dict[str, Any]
+
+
+@dataclass(eq=False)
+class Subscription:
+    """
+    Suscripción de un cliente al hub.
+
+    Cada suscriptor tiene su propia cola acotada; si se llena (cliente lento),
+    el hub lo marca como ``overflowed`` y lo cierra en lugar de bloquear al
+    publicador. El cliente puede reconectarse con Last-Event-ID para reanudar
+    desde el historial.
+    """
+    hub: 'ChangeHub'
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue
+    overflowed: bool = False
+    closed: bool = False
+    backlog: List[ChangeEvent] = field(default_factory=list)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[ChangeEvent]:
+        """
+        Espera el siguiente evento.
+
+        Returns:
+            El evento, o None si se agotó el timeout o la suscripción se cerró.
+        """
+        if self.backlog:
+            return self.backlog.pop(0)
+        if self.closed:
+            return None
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return event
+
+    def close(self) -> None:
+        """Da de baja la suscripción del hub."""
+        self.closed = True
+        self.hub.unsubscribe(self)
+
+
+class ChangeHub:
+    """
+    Hub de difusión en proceso para eventos de cambios de bundles.
+
+    ``publish`` es thread-safe y nunca bloquea: puede llamarse desde el hilo
+    del ETL y entrega los eventos a cada suscriptor en su event loop mediante
+    ``call_soon_threadsafe``. Mantiene un historial acotado para reanudar
+    suscripciones con Last-Event-ID.
+    """
+
+    def __init__(self, history_size: int = 1000, queue_size: int = 256) -> None:
+        self.queue_size = queue_size
+        self._history: Deque[ChangeEvent] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def last_event_id(self) -> int:
+        with self._lock:
+            return self._history[-1].id if self._history else 0
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> ChangeEvent:
+        """
+        Publica un evento a todos los suscriptores.
+
+        Args:
+            event_type: Tipo de evento ('inserted', 'updated', 'expired', ...).
+            data: Payload compacto del evento (machine_name, campos cambiados...).
+
+        Returns:
+            El ChangeEvent publicado con su id asignado.
+        """
+        with self._lock:
+            event = ChangeEvent(id=next(self._ids), type=event_type, data=data)
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(self._deliver, subscription, event)
+            except RuntimeError:
+                # El event loop del suscriptor ya se cerró
+                self.unsubscribe(subscription)
+        return event
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Crea una suscripción en el event loop actual.
+
+        Args:
+            last_event_id: Último id recibido por el cliente. Si se indica, los
+                eventos posteriores del historial se entregan primero. Si el
+                historial ya no los contiene (o el id es de otro proceso), se
+                entrega un evento 'reset' para que el cliente recargue todo.
+
+        Returns:
+            Subscription lista para consumir con ``get()``.
+        """
+        subscription = Subscription(
+            hub=self,
+            loop=asyncio.get_running_loop(),
+            queue=asyncio.Queue(maxsize=self.queue_size),
+        )
+        with self._lock:
+            if last_event_id is not None:
+                history = list(self._history)
+                oldest = history[0].id if history else None
+                latest = history[-1].id if history else 0
+                if last_event_id > latest or (oldest is not None and last_event_id < oldest - 1):
+                    subscription.backlog.append(ChangeEvent(id=latest, type='reset', data={}))
+                else:
+                    subscription.backlog.extend(event for event in history if event.id > last_event_id)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def _deliver(self, subscription: Subscription, event: ChangeEvent) -> None:
+        if subscription.closed:
+            return
+        try:
+            subscription.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning('Suscriptor de eventos saturado; se desconecta para que reanude con Last-Event-ID')
+            subscription.overflowed = True
+            subscription.close()
+
+
+# Hub global del proceso: la persistencia publica aquí y la API lo expone en /events
+change_hub = ChangeHub()
@@ -0,0 +1,143 @@
+"""
+Códec JSON intercambiable para el spider, las columnas JSON y la API.
+
+Usa orjson o msgspec si están instalados y la librería estándar si no. Las
+tres producen la misma salida compacta (sin espacios, UTF-8 sin escapar),
+así que los hashes y los documentos guardados no dependen del backend.
+Si el backend rápido no sabe serializar un valor (p. ej. enteros de más
+de 64 bits o claves no str), se reintenta con la librería estándar.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Union
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec es opcional
+    msgspec = None
+
+JsonInput = Union[str, bytes, bytearray, memoryview]
+
+
+@dataclass(frozen=True)
+class JsonBackend:
+    """Implementación de un backend: ``encode(valor, sort_keys) -> bytes`` y ``decode(datos)``."""
+    name: str
+    encode: Callable[[Any, bool], bytes]
+    decode: Callable[[JsonInput], Any]
+
+
+def _stdlib_encode(value: Any, sort_keys: bool = False) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), sort_keys=sort_keys).encode('utf-8')
+
+
+def _stdlib_decode(data: JsonInput) -> Any:
+    if isinstance(data, memoryview):
+        data = bytes(data)
+    return json.loads(data)
+
+
+BACKENDS: Dict[str, JsonBackend] = {'json': JsonBackend('json', _stdlib_encode, _stdlib_decode)}
+
+if orjson is not None:
+    def _orjson_encode(value: Any, sort_keys: bool = False) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+
+    BACKENDS['orjson'] = JsonBackend('orjson', _orjson_encode, orjson.loads)
+
+if msgspec is not None:
+    _msgspec_encoder = msgspec.json.Encoder()
+    _msgspec_sorted_encoder = msgspec.json.Encoder(order='sorted')
+
+    def _msgspec_encode(value: Any, sort_keys: bool = False) -> bytes:
+        return (_msgspec_sorted_encoder if sort_keys else _msgspec_encoder).encode(value)
+
+    def _msgspec_decode(data: JsonInput) -> Any:
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as exc:
+            # Mismo contrato que json/orjson: JSON inválido -> ValueError
+            raise ValueError(str(exc)) from exc
+
+    BACKENDS['msgspec'] = JsonBackend('msgspec', _msgspec_encode, _msgspec_decode)
+
+_FAST_ERRORS = tuple(
+    error for error in (
+        TypeError,
+        ValueError,
+        getattr(orjson, 'JSONEncodeError', None),
+        getattr(msgspec, 'EncodeError', None),
+    ) if error is not None
+)
+
+# Preferencia: orjson (más rápido en dumps) > msgspec > librería estándar
+_backend = next(BACKENDS[name] for name in ('orjson', 'msgspec', 'json') if name in BACKENDS)
+
+
+def get_backend() -> str:
+    """Nombre del backend activo ('orjson', 'msgspec' o 'json')."""
+    return _backend.name
+
+
+def set_backend(name: str) -> None:
+    """
+    Cambia el backend activo para todo el proceso (benchmarks y pruebas).
+
+    Args:
+        name: 'orjson', 'msgspec' o 'json'.
+
+    Raises:
+        ValueError: Si el backend no existe o su librería no está instalada.
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f'Backend JSON no disponible: {name} (disponibles: {", ".join(BACKENDS)})')
+    _backend = BACKENDS[name]
+
+
+def dumps_bytes(value: Any, sort_keys: bool = False) -> bytes:
+    """
+    Serializa ``value`` a JSON compacto en UTF-8.
+
+    Args:
+        value: Valor serializable a JSON.
+        sort_keys: Si True, ordena las claves (forma canónica para hashes).
+
+    Returns:
+        Bytes JSON.
+
+    Raises:
+        TypeError: Si el valor no es serializable ni con la librería estándar.
+    """
+    backend = _backend
+    if backend.encode is _stdlib_encode:
+        return _stdlib_encode(value, sort_keys)
+    try:
+        return backend.encode(value, sort_keys)
+    except _FAST_ERRORS:
+        return _stdlib_encode(value, sort_keys)
+
+
+def dumps(value: Any, sort_keys: bool = False) -> str:
+    """Como dumps_bytes() pero devuelve str (p. ej. ``json_serializer`` de SQLAlchemy)."""
+    return dumps_bytes(value, sort_keys).decode('utf-8')
+
+
+def loads(data: JsonInput) -> Any:
+    """
+    Decodifica un documento JSON (str o bytes).
+
+    Raises:
+        ValueError: Si el documento no es JSON válido, con cualquier backend.
+    """
+    if isinstance(data, str) and type(data) is not str:
+        # orjson rechaza subclases de str como NavigableString de BeautifulSoup
+        data = str(data)
+    return _backend.decode(data)
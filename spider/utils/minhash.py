@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import sys
+import unicodedata
+from array import array
+from typing import Any, Iterable, List, Optional, Set
+
+# 128 permutaciones: error estándar del Jaccard estimado ~ 1/sqrt(128) ≈ 0.09
+NUM_PERM = 128
+# 32 bandas de 4 filas: dos bundles son candidatos con probabilidad 50% a
+# partir de un Jaccard ~0.42 (umbral ≈ (1/32)^(1/4))
+LSH_BANDS = 32
+LSH_ROWS = NUM_PERM // LSH_BANDS
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Semilla fija: las firmas guardadas deben ser comparables entre ejecuciones
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_title(title: Optional[str]) -> Optional[str]:
+    """
+    Normaliza un título para comparar libros entre bundles.
+
+    Elimina acentos, pasa a minúsculas y reduce la puntuación y los espacios
+    a un único espacio ("Python Crash Course, 3rd Ed." -> "python crash course 3rd ed").
+
+    Args:
+        title: Título original. Puede ser None.
+
+    Returns:
+        Título normalizado o None si queda vacío.
+    """
+    if not title:
+        return None
+    decomposed = unicodedata.normalize('NFKD', title)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    cleaned = _NON_ALNUM.sub(' ', stripped.casefold()).strip()
+    return cleaned or None
+
+
+def bundle_tokens(book_list: Optional[Iterable[Any]]) -> Set[str]:
+    """
+    Conjunto de tokens de un bundle: machine_name y título normalizado de cada libro.
+
+    Args:
+        book_list: Lista de libros tal como se guarda en Bundle.book_list.
+
+    Returns:
+        Conjunto de tokens ``book:<machine_name>`` y ``title:<título>``.
+    """
+    tokens: Set[str] = set()
+    for book in book_list or []:
+        if not isinstance(book, dict):
+            continue
+        if book.get('machine_name'):
+            tokens.add(f'book:{book["machine_name"]}')
+        title = normalize_title(book.get('title'))
+        if title:
+            tokens.add(f'title:{title}')
+    return tokens
+
+
+def tokens_digest(tokens: Iterable[str]) -> str:
+    """Hash estable de un conjunto de tokens, para saber si la firma cambió."""
+    digest = hashlib.sha1()
+    for token in sorted(tokens):
+        digest.update(token.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def minhash_signature(tokens: Iterable[str]) -> Optional[bytes]:
+    """
+    Calcula la firma MinHash de un conjunto de tokens.
+
+    Cada token se reduce a un hash de 64 bits y se aplica la familia de
+    permutaciones ``(a * x + b) mod (2^61 - 1)``; la firma es el mínimo de
+    cada permutación truncado a 32 bits. La fracción de posiciones iguales
+    entre dos firmas estima el índice de Jaccard de los conjuntos.
+
+    Args:
+        tokens: Tokens del bundle (ver bundle_tokens()).
+
+    Returns:
+        Firma de NUM_PERM enteros uint32 little-endian (512 bytes), o None
+        si no hay tokens.
+    """
+    hashes = [
+        int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+        for token in set(tokens)
+    ]
+    if not hashes:
+        return None
+    signature = array('I', (
+        min((a * value + b) % _PRIME for value in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    ))
+    if sys.byteorder == 'big':
+        signature.byteswap()
+    return signature.tobytes()
+
+
+def signature_values(signature: bytes) -> List[int]:
+    """Decodifica una firma guardada en la lista de sus NUM_PERM valores."""
+    values = array('I')
+    values.frombytes(signature)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tolist()
+
+
+def estimate_jaccard(first: bytes, second: bytes) -> float:
+    """Jaccard estimado entre dos firmas: fracción de posiciones iguales."""
+    left, right = signature_values(first), signature_values(second)
+    return sum(1 for a, b in zip(left, right) if a == b) / NUM_PERM
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime, timezone
 from typing import Any, Iterable, Optional
 
+from . import json_codec
+
 
 BASE_URL = 'https://www.humblebundle.com'
 
@@ -44,7 +45,7 @@ def serialize_list(value: Any) -> Optional[str]:
     if isinstance(value, str):
         return value
     try:
-        return json.dumps(value, ensure_ascii=False)
+        return json_codec.dumps(value)
     except (TypeError, ValueError):
         return str(value)
 
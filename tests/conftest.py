@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import pytest
+
+from spider.config.settings import Settings
+from spider.database.session import dispose_engines, get_session_factory
+from spider.schemas.bundle import BundleRecord
+
+
+@pytest.fixture
+def settings(tmp_path):
+    """Settings on a fresh SQLite file; the engine registry is emptied afterwards."""
+    yield Settings(db_path=str(tmp_path / 'test.db'), etl_trace_memory=False, image_mirror_enabled=False)
+    dispose_engines()
+
+
+@pytest.fixture
+def session_factory(settings):
+    return get_session_factory(settings)
+
+
+@pytest.fixture
+def make_record():
+    """Builds a valid BundleRecord; keyword arguments override the defaults."""
+    def build(machine_name: str, **fields) -> BundleRecord:
+        payload = {
+            'machine_name': machine_name,
+            'tile_name': machine_name.replace('_', ' ').title(),
+            'start_date|datetime': datetime(2024, 1, 1),
+            'end_date|datetime': datetime(2030, 1, 1),
+            'tile_image': f'https://img.example.com/{machine_name}.png',
+        }
+        payload.update(fields)
+        return BundleRecord.model_validate(payload)
+    return build
@@ -0,0 +1,117 @@
+import threading
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from api.main import app, get_async_db
+from spider.database.documents import materialize_bundle_documents
+from spider.database.models import Bundle
+from spider.database.persistence import get_data_version, persist_bundles, remove_outdated_bundles
+from spider.database.session import get_async_session_factory
+
+
+@pytest.fixture
+def client(settings):
+    async def override():
+        async with get_async_session_factory(settings)() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override
+    # No lifespan: it would open the configured working database and build the read model
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def _changes(client, since):
+    response = client.get('/bundles/changes', params={'since': since})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_since_zero_returns_every_bundle_and_no_tombstones(session_factory, client, make_record):
+    with session_factory() as session:
+        persist_bundles([make_record('alpha_bundle'), make_record('beta_bundle')], session)
+        version = get_data_version(session)
+
+    body = _changes(client, 0)
+
+    assert body['since'] == 0
+    assert body['next_version'] == version
+    assert sorted(bundle['machine_name'] for bundle in body['changes']) == ['alpha_bundle', 'beta_bundle']
+    assert body['deleted'] == []
+
+
+def test_cursor_returns_only_later_changes_and_tombstones(session_factory, client, make_record):
+    with session_factory() as session:
+        persist_bundles([make_record('alpha_bundle'), make_record('beta_bundle'), make_record('gamma_bundle')], session)
+    cursor = _changes(client, 0)['next_version']
+
+    with session_factory() as session:
+        # alpha changes, beta is rewritten without visible changes, gamma expires
+        persist_bundles([
+            make_record('alpha_bundle', tile_name='Alpha Renamed'),
+            make_record('beta_bundle'),
+            make_record('gamma_bundle', **{'end_date|datetime': datetime(2020, 1, 1)}),
+        ], session)
+        remove_outdated_bundles(session)
+        version = get_data_version(session)
+
+    body = _changes(client, cursor)
+
+    assert body['next_version'] == version
+    assert [bundle['machine_name'] for bundle in body['changes']] == ['alpha_bundle']
+    assert body['changes'][0]['tile_name'] == 'Alpha Renamed'
+    assert [(row['machine_name'], row['reason']) for row in body['deleted']] == [('gamma_bundle', 'expired')]
+    assert all(cursor < row['version'] <= version for row in body['deleted'])
+
+    caught_up = _changes(client, body['next_version'])
+    assert caught_up['changes'] == [] and caught_up['deleted'] == []
+
+
+def test_stored_documents_and_orm_fallback_agree(session_factory, client, make_record):
+    with session_factory() as session:
+        persist_bundles([make_record('alpha_bundle'), make_record('beta_bundle')], session)
+    fallback = _changes(client, 0)
+
+    with session_factory() as session:
+        materialize_bundle_documents(session)
+    stored = _changes(client, 0)
+
+    assert stored == fallback
+
+
+def test_since_ahead_of_the_data_version_is_a_conflict(session_factory, client, make_record):
+    with session_factory() as session:
+        persist_bundles([make_record('alpha_bundle')], session)
+        version = get_data_version(session)
+
+    response = client.get('/bundles/changes', params={'since': version + 1})
+
+    assert response.status_code == 409
+    assert 'since=0' in response.json()['detail']
+
+
+def test_concurrent_writers_never_share_a_version(settings, session_factory, make_record):
+    with session_factory() as session:
+        persist_bundles([make_record('seed_bundle')], session)
+    barrier = threading.Barrier(6)
+
+    def write(index):
+        with session_factory() as session:
+            barrier.wait()
+            persist_bundles([make_record(f'writer_{index}_bundle')], session)
+
+    threads = [threading.Thread(target=write, args=(index,)) for index in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with session_factory() as session:
+        versions = session.execute(select(Bundle.row_version).where(Bundle.machine_name.like('writer_%'))).scalars().all()
+        current = get_data_version(session)
+
+    assert len(set(versions)) == 6
+    assert max(versions) == current
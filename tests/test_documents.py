@@ -0,0 +1,70 @@
+import json
+import subprocess
+import sys
+
+from sqlalchemy import select
+
+from spider.core.etl import materialize_response_documents
+from spider.database.documents import materialize_bundle_documents
+from spider.database.images import save_image_assets
+from spider.database.models import BundleDocument
+from spider.database.persistence import get_data_version, persist_bundles
+
+
+def _documents(session):
+    rows = session.execute(select(BundleDocument).order_by(BundleDocument.bundle_id, BundleDocument.kind)).scalars()
+    return {(row.bundle_id, row.kind): (row.data_version, json.loads(row.body)) for row in rows}
+
+
+def test_materialize_renders_both_kinds_for_the_current_version(session_factory, make_record):
+    with session_factory() as session:
+        persist_bundles([make_record('alpha_bundle'), make_record('beta_bundle')], session)
+        stats = materialize_bundle_documents(session)
+        version = get_data_version(session)
+        documents = _documents(session)
+
+    assert stats == {'data_version': version, 'documents': 4}
+    assert {kind for _, kind in documents} == {'full', 'summary'}
+    assert all(data_version == version for data_version, _ in documents.values())
+    full = next(body for (_, kind), (_, body) in documents.items() if kind == 'full')
+    summary = next(body for (_, kind), (_, body) in documents.items() if kind == 'summary')
+    assert 'verification_date' in full and 'row_version' in full
+    assert 'raw_html' not in summary
+
+
+def test_materialize_localizes_mirrored_images(session_factory, make_record):
+    with session_factory() as session:
+        persist_bundles([make_record('alpha_bundle')], session)
+        save_image_assets(session, [{
+            'source_url': 'https://img.example.com/alpha_bundle.png',
+            'path': 'bundles/ab/abcdef.png',
+            'content_hash': 'abcdef',
+            'variants': {'webp': 'bundles/ab/abcdef.webp'},
+        }])
+        materialize_bundle_documents(session)
+        documents = _documents(session)
+
+    full = next(body for (_, kind), (_, body) in documents.items() if kind == 'full')
+    assert full['tile_image'] == '/images/bundles/ab/abcdef.png'
+    assert full['images']['tile_image'] == {
+        'original': '/images/bundles/ab/abcdef.png',
+        'webp': '/images/bundles/ab/abcdef.webp',
+    }
+
+
+def test_materialize_replaces_previous_version(session_factory, make_record):
+    with session_factory() as session:
+        persist_bundles([make_record('alpha_bundle')], session)
+        materialize_bundle_documents(session)
+        persist_bundles([make_record('alpha_bundle', tile_name='Renamed')], session)
+        stats = materialize_response_documents(session)
+        documents = _documents(session)
+
+    assert {data_version for data_version, _ in documents.values()} == {stats['data_version']}
+    assert all(body['tile_name'] == 'Renamed' for _, body in documents.values())
+
+
+def test_etl_does_not_import_the_api():
+    code = 'import sys, spider.core.etl, spider.core.reparse; print(any(m == "api" or m.startswith(("api.", "fastapi")) for m in sys.modules))'
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == 'False'
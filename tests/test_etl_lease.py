@@ -0,0 +1,138 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+
+from spider.core.jobs import EtlJobRunner
+from spider.database.jobs import ETL_LEASE_NAME, release_etl_lease, renew_etl_lease, start_etl_job
+from spider.database.models import EtlJob, EtlLease
+
+
+def _lease(session) -> EtlLease:
+    """Current lease row, re-read from the database."""
+    return session.execute(
+        select(EtlLease).where(EtlLease.name == ETL_LEASE_NAME).execution_options(populate_existing=True)
+    ).scalar_one()
+
+
+def test_first_job_acquires_the_lease(session_factory):
+    with session_factory() as session:
+        job, joined = start_etl_job(session, 'worker-a', ttl_seconds=60)
+        lease = _lease(session)
+
+    assert not joined
+    assert job.status == 'running'
+    assert lease.job_id == job.id
+    assert lease.owner == 'worker-a'
+    assert lease.expires_at > datetime.utcnow() + timedelta(seconds=50)
+
+
+def test_second_job_joins_the_running_one(session_factory):
+    with session_factory() as session:
+        first, _ = start_etl_job(session, 'worker-a', ttl_seconds=60)
+    with session_factory() as session:
+        second, joined = start_etl_job(session, 'worker-b', ttl_seconds=60)
+        jobs = session.execute(select(func.count()).select_from(EtlJob)).scalar_one()
+        lease = _lease(session)
+
+    assert joined
+    assert second.id == first.id
+    # The job inserted by the worker that lost is rolled back with the lease attempt
+    assert jobs == 1
+    assert lease.owner == 'worker-a'
+
+
+def test_expired_lease_is_taken_over_and_its_job_failed(session_factory):
+    with session_factory() as session:
+        stale, _ = start_etl_job(session, 'worker-a', ttl_seconds=60)
+        session.execute(update(EtlLease).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        session.commit()
+    with session_factory() as session:
+        job, joined = start_etl_job(session, 'worker-b', ttl_seconds=60)
+        stale = session.get(EtlJob, stale.id)
+        lease = _lease(session)
+
+    assert not joined
+    assert job.id != stale.id
+    assert lease.job_id == job.id
+    assert stale.status == 'failed'
+    assert 'Lease expirado' in stale.error
+
+
+def test_released_lease_is_acquired_without_failing_the_previous_job(session_factory):
+    with session_factory() as session:
+        previous, _ = start_etl_job(session, 'worker-a', ttl_seconds=60)
+        session.execute(update(EtlJob).where(EtlJob.id == previous.id).values(status='succeeded'))
+        session.commit()
+        release_etl_lease(session, previous.id)
+    with session_factory() as session:
+        job, joined = start_etl_job(session, 'worker-b', ttl_seconds=60)
+        previous = session.get(EtlJob, previous.id)
+
+    assert not joined
+    assert job.id != previous.id
+    assert previous.status == 'succeeded'
+
+
+def test_only_the_holder_renews_or_releases(session_factory):
+    with session_factory() as session:
+        job, _ = start_etl_job(session, 'worker-a', ttl_seconds=60)
+        assert renew_etl_lease(session, job.id, ttl_seconds=120)
+        assert not renew_etl_lease(session, 'another-job', ttl_seconds=120)
+        release_etl_lease(session, 'another-job')
+        assert _lease(session).job_id == job.id
+        assert _lease(session).expires_at > datetime.utcnow() + timedelta(seconds=110)
+
+
+def test_concurrent_starts_acquire_the_lease_once(session_factory):
+    workers = 8
+    barrier = threading.Barrier(workers)
+    results = []
+
+    def start(index: int) -> None:
+        barrier.wait()
+        with session_factory() as session:
+            job, joined = start_etl_job(session, f'worker-{index}', ttl_seconds=60)
+            results.append((job.id, joined))
+
+    threads = [threading.Thread(target=start, args=(index,)) for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    acquired = [job_id for job_id, joined in results if not joined]
+    assert len(results) == workers
+    assert len(acquired) == 1
+    assert {job_id for job_id, _ in results} == set(acquired)
+
+
+def test_runner_joins_instead_of_running_a_second_etl(settings, session_factory):
+    with session_factory() as session:
+        running, _ = start_etl_job(session, 'other-worker', ttl_seconds=60)
+
+    job, joined = EtlJobRunner(settings, session_factory=session_factory).submit()
+
+    assert joined
+    assert job.id == running.id
+
+
+def test_heartbeat_keeps_extending_the_lease(settings, session_factory):
+    runner = EtlJobRunner(settings.model_copy(update={'etl_lease_ttl_seconds': 1}), session_factory=session_factory)
+    with session_factory() as session:
+        job, _ = start_etl_job(session, runner.owner, ttl_seconds=1)
+        first_expiry = _lease(session).expires_at
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=runner._heartbeat, args=(job.id, stop))
+    heartbeat.start()
+    time.sleep(2.3)
+    stop.set()
+    heartbeat.join()
+
+    with session_factory() as session:
+        lease = _lease(session)
+    # Without renewals the lease would have expired a second after it was taken
+    assert lease.job_id == job.id
+    assert lease.expires_at > first_expiry + timedelta(seconds=1)
@@ -0,0 +1,125 @@
+import asyncio
+
+from api.events import stream_change_events
+from api.publishing import PublishedDatabase
+from api.versioning import fetch_data_version
+from spider.database.persistence import persist_bundles
+from spider.database.publish import publish_snapshot
+from spider.database.session import release_read_engines
+from spider.utils.events import ChangeHub, change_hub
+
+
+class FakeRequest:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+def _versions(*values):
+    """fetch_version that returns ``values`` in order and then repeats the last one."""
+    remaining = list(values)
+
+    async def fetch() -> int:
+        return remaining.pop(0) if len(remaining) > 1 else remaining[0]
+
+    return fetch
+
+
+async def _frames(stream, count: int):
+    frames = []
+    async for frame in stream:
+        if not frame.startswith(b':'):
+            frames.append(frame.decode('utf-8'))
+        if len(frames) == count:
+            break
+    await stream.aclose()
+    return frames
+
+
+def test_version_bump_outside_the_process_sends_reset():
+    async def scenario():
+        stream = stream_change_events(ChangeHub(), FakeRequest(), fetch_version=_versions(3, 3, 4), poll_seconds=0.01)
+        return await _frames(stream, 2)
+
+    retry, reset = asyncio.run(scenario())
+    assert retry.startswith('retry:')
+    assert 'event: reset' in reset
+    assert '"data_version":4' in reset
+
+
+def test_bump_announced_by_hub_events_sends_no_reset():
+    async def scenario():
+        hub = ChangeHub()
+        stream = stream_change_events(hub, FakeRequest(), fetch_version=_versions(3, 4), poll_seconds=0.01)
+        frames = [await stream.__anext__()]
+        next_frame = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        hub.publish('updated', {'machine_name': 'a', 'data_version': 4})
+        frames.append((await next_frame).decode('utf-8'))
+        # Several polls see version 4, already announced by the event
+        pending = asyncio.ensure_future(stream.__anext__())
+        done, _ = await asyncio.wait({pending}, timeout=0.1)
+        pending.cancel()
+        await asyncio.gather(pending, return_exceptions=True)
+        await stream.aclose()
+        return frames, done
+
+    frames, done = asyncio.run(scenario())
+    assert 'event: updated' in frames[1]
+    assert not done
+
+
+def test_without_fetch_version_only_hub_events_are_sent():
+    async def scenario():
+        hub = ChangeHub()
+        hub.publish('expired', {'machine_name': 'b', 'data_version': 2})
+        stream = stream_change_events(hub, FakeRequest(), last_event_id=0)
+        return await _frames(stream, 2)
+
+    frames = asyncio.run(scenario())
+    assert 'event: expired' in frames[1]
+
+
+def test_with_publishing_only_pointer_moves_send_reset(settings, session_factory, make_record, tmp_path):
+    publish_dir = str(tmp_path / 'published')
+    published = PublishedDatabase(settings.model_copy(update={'publish_dir': publish_dir, 'publish_check_seconds': 0}))
+    with session_factory() as session:
+        persist_bundles([make_record('alpha_bundle')], session)
+        publish_snapshot(session, publish_dir)
+
+    async def published_version() -> int:
+        async with published.async_session_factory()() as session:
+            return await fetch_data_version(session)
+
+    async def scenario():
+        frames = []
+        stream = stream_change_events(
+            change_hub, FakeRequest(), fetch_version=published_version, poll_seconds=0.01, forward_events=False,
+        )
+
+        async def consume():
+            async for frame in stream:
+                if not frame.startswith((b':', b'retry:')):
+                    frames.append(frame.decode('utf-8'))
+
+        consumer = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.05)
+        # An in-process ETL persists rows: hub events, but nothing new is published
+        with session_factory() as session:
+            persist_bundles([make_record('beta_bundle')], session)
+            persist_bundles([make_record('gamma_bundle')], session)
+        await asyncio.sleep(0.2)
+        quiet = list(frames)
+        with session_factory() as session:
+            version = publish_snapshot(session, publish_dir)['data_version']
+        await asyncio.sleep(0.3)
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+        for engine in release_read_engines(published.current):
+            await engine.dispose()
+        return quiet, frames, version
+
+    quiet, frames, version = asyncio.run(scenario())
+    assert quiet == []
+    assert len(frames) == 1
+    assert 'event: reset' in frames[0]
+    assert f'"data_version":{version}' in frames[0]
@@ -0,0 +1,147 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import func, select
+
+from api.publishing import PublishedDatabase
+from spider.database.models import Bundle
+from spider.database.persistence import get_data_version, persist_bundles
+from spider.database.publish import (
+    CURRENT_LINK,
+    SnapshotValidationError,
+    publish_snapshot,
+    read_pointer,
+    resolve_published_db,
+    rollback_snapshot,
+    snapshot_name,
+)
+
+
+@pytest.fixture
+def publish_dir(tmp_path):
+    return str(tmp_path / 'published')
+
+
+def _bundles_in(path):
+    connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        return connection.execute('SELECT COUNT(*) FROM bundle').fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_publish_writes_snapshot_and_pointer(session_factory, publish_dir, make_record):
+    with session_factory() as session:
+        persist_bundles([make_record('alpha_bundle'), make_record('beta_bundle')], session)
+        version = get_data_version(session)
+        result = publish_snapshot(session, publish_dir)
+
+    pointer = read_pointer(publish_dir)
+    published = resolve_published_db(publish_dir)
+    assert result['skipped'] is False
+    assert result['data_version'] == version and result['bundles'] == 2
+    assert pointer['file'] == snapshot_name(version) and pointer['previous'] is None
+    assert published.name == snapshot_name(version)
+    assert (published.parent / CURRENT_LINK).resolve() == published.resolve()
+    assert _bundles_in(published) == 2
+    assert not list(published.parent.glob('.staging-*'))
+
+
+def test_publish_skips_an_already_published_version(session_factory, publish_dir, make_record):
+    with session_factory() as session:
+        persist_bundles([make_record('alpha_bundle')], session)
+        first = publish_snapshot(session, publish_dir)
+        second = publish_snapshot(session, publish_dir)
+
+    assert second['skipped'] is True
+    assert second['path'] == first['path']
+    assert read_pointer(publish_dir)['file'] == snapshot_name(first['data_version'])
+
+
+def test_invalid_snapshot_leaves_the_pointer_untouched(session_factory, publish_dir, make_record):
+    with session_factory() as session:
+        persist_bundles([make_record('alpha_bundle')], session)
+        published = publish_snapshot(session, publish_dir)
+        with pytest.raises(SnapshotValidationError):
+            publish_snapshot(session, publish_dir, min_bundles=5)
+
+    assert read_pointer(publish_dir)['file'] == snapshot_name(published['data_version'])
+    assert not list(resolve_published_db(publish_dir).parent.glob('.staging-*'))
+
+
+def test_rollback_and_rollback_of_rollback(session_factory, publish_dir, make_record):
+    with session_factory() as session:
+        persist_bundles([make_record('alpha_bundle')], session)
+        first = publish_snapshot(session, publish_dir)
+        persist_bundles([make_record('beta_bundle')], session)
+        second = publish_snapshot(session, publish_dir)
+
+    old, new = snapshot_name(first['data_version']), snapshot_name(second['data_version'])
+    assert read_pointer(publish_dir)['previous'] == old
+
+    rolled_back = rollback_snapshot(publish_dir)
+    assert (rolled_back['file'], rolled_back['previous']) == (old, new)
+    assert rolled_back['data_version'] == first['data_version']
+    assert _bundles_in(resolve_published_db(publish_dir)) == 1
+
+    restored = rollback_snapshot(publish_dir)
+    assert (restored['file'], restored['previous']) == (new, old)
+    assert _bundles_in(resolve_published_db(publish_dir)) == 2
+
+
+def test_rollback_without_previous_snapshot_fails(session_factory, publish_dir, make_record):
+    with session_factory() as session:
+        persist_bundles([make_record('alpha_bundle')], session)
+        publish_snapshot(session, publish_dir)
+
+    with pytest.raises(FileNotFoundError):
+        rollback_snapshot(publish_dir)
+
+
+def test_prune_keeps_current_previous_and_newest(session_factory, publish_dir, make_record):
+    versions = []
+    with session_factory() as session:
+        for index in range(4):
+            persist_bundles([make_record(f'bundle_{index}')], session)
+            versions.append(publish_snapshot(session, publish_dir, keep=2)['data_version'])
+
+    directory = resolve_published_db(publish_dir).parent
+    assert sorted(path.name for path in directory.glob('v*.db')) == sorted(snapshot_name(v) for v in versions[-2:])
+
+    # The previous snapshot survives pruning even when keep=1
+    with session_factory() as session:
+        persist_bundles([make_record('bundle_4')], session)
+        latest = publish_snapshot(session, publish_dir, keep=1)
+    assert sorted(path.name for path in directory.glob('v*.db')) == sorted(
+        [snapshot_name(versions[-1]), snapshot_name(latest['data_version'])]
+    )
+
+
+def test_published_database_follows_the_pointer(settings, session_factory, publish_dir, make_record):
+    published = PublishedDatabase(settings.model_copy(update={'publish_dir': publish_dir, 'publish_check_seconds': 0}))
+
+    def bundle_count():
+        with published.session_factory()() as session:
+            return session.execute(select(func.count()).select_from(Bundle)).scalar_one()
+
+    with session_factory() as session:
+        persist_bundles([make_record('alpha_bundle')], session)
+    # Nothing published yet: reads the working database
+    assert bundle_count() == 1
+    assert published.stats() == {'enabled': True, 'path': None, 'swaps': 0}
+
+    with session_factory() as session:
+        first = publish_snapshot(session, publish_dir)
+        persist_bundles([make_record('beta_bundle')], session)
+    # The working database moved on, the API keeps reading the snapshot
+    assert bundle_count() == 1
+    assert published.stats()['path'] == first['path']
+
+    with session_factory() as session:
+        second = publish_snapshot(session, publish_dir)
+    assert bundle_count() == 2
+    assert published.stats() == {'enabled': True, 'path': second['path'], 'swaps': 2}
+
+    rollback_snapshot(publish_dir)
+    assert bundle_count() == 1
+    assert published.stats()['path'] == first['path']